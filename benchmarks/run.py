@@ -0,0 +1,199 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmarks dos caminhos quentes do ETL, do dashboard e da carga
+
+Roda offline, sobre dados sintéticos (benchmarks/synthetic.py) gerados em
+uma pasta temporária: nada em data/ é lido ou alterado. Cada caso é
+executado uma vez para aquecer e depois --repeat vezes; o que se compara é
+a mediana.
+
+    python benchmarks/run.py                      # compara com o baseline
+    python benchmarks/run.py --save-baseline      # grava o baseline atual
+    python benchmarks/run.py --series 10 --anos 40 --only leitura
+
+O baseline (benchmarks/baseline.json) guarda parâmetros, ambiente e
+tempos. Um caso é marcado como regressão quando a mediana passa do
+baseline por mais de --tolerancia (padrão 25%) e por mais de 1 ms; com
+regressão o processo sai com código 1. Baselines só são comparáveis na
+mesma máquina e com os mesmos --series/--anos.
+
+A carga no PostgreSQL não é executada (exige banco): o caso "carga.copy"
+mede a serialização do stream do COPY, que é a parte do carregador que
+roda em Python.
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from benchmarks import synthetic  # noqa: E402
+
+BASELINE_PATH = ROOT / "benchmarks" / "baseline.json"
+NOISE_FLOOR_S = 0.001
+
+
+# ===================== Casos =====================
+def casos(raw: list[tuple], df: pd.DataFrame) -> dict:
+    """
+    {nome: (função sem argumentos, linhas processadas)}. Os imports ficam
+    aqui para que o tempo de import não entre na medição.
+    """
+    import streamlit.logger
+
+    streamlit.logger.set_log_level("error")  # sem runtime: avisos de cache em memória
+
+    from src.app.downsampling import downsample
+    from src.app.formatting import brl_array
+    from src.app.pipeline import kpi_metrics_daily
+    from src.db.cepea_load_postgres import _CsvStream, _prepare
+    from src.etl import cepea_diff
+    from src.etl.cepea_etl import _parse_file, _read_all
+    from src.etl.cepea_quality import validate
+    from src.etl.cepea_reader import read_streaming
+    from src.etl.cepea_rollups import resample_mean
+
+    planilhas = [next(pasta.glob("*.xlsx")) for pasta, _, _ in raw]
+    linhas = len(df)
+    milho = df[df["commodity"] == "MILHO"]
+    tasks = [(pasta, c, r) for pasta, c, r in raw]
+    # Snapshot anterior com uma revisão a cada 50 pregões e sem o último dia
+    anterior = df[df["data"] < df["data"].max()].copy()
+    anterior.loc[anterior.index[::50], "valor_brl"] += 0.01
+
+    return {
+        "leitura.pandas": (lambda: [_parse_file(p) for p in planilhas], linhas),
+        "leitura.streaming": (lambda: [read_streaming(p) for p in planilhas], linhas),
+        "leitura.read_all": (lambda: _read_all(tasks, workers=1, cache=None), linhas),
+        "rollups.semanal": (lambda: resample_mean(df, "W"), linhas),
+        "rollups.mensal": (lambda: resample_mean(df, "ME"), linhas),
+        "dashboard.kpis": (lambda: kpi_metrics_daily(milho, "valor_brl"), len(milho)),
+        "dashboard.brl_array": (lambda: brl_array(df["valor_brl"].to_numpy()), linhas),
+        "dashboard.downsample": (
+            lambda: downsample(df, "data", "valor_brl", ["commodity", "regiao"], 2000, "minmax"), linhas
+        ),
+        "qualidade.validate": (lambda: validate(df), linhas),
+        "etl.diff": (lambda: cepea_diff.diff(anterior, df), linhas),
+        "carga.copy": (lambda: _CsvStream(_prepare(df)).read(), linhas),
+    }
+
+
+def medir(fn, repeat: int) -> dict:
+    fn()  # aquecimento (imports tardios, caches do pandas)
+    tempos = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        tempos.append(time.perf_counter() - t0)
+    return {"mediana_s": statistics.median(tempos), "min_s": min(tempos), "max_s": max(tempos)}
+
+
+def ambiente() -> dict:
+    return {
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "numpy": np.__version__,
+        "plataforma": platform.platform(),
+        "cpus": os.cpu_count(),
+    }
+
+
+def executar(series: int, anos: int, repeat: int, seed: int, only: list[str] | None = None) -> dict:
+    with tempfile.TemporaryDirectory(prefix="cepea_bench_") as tmp:
+        t0 = time.perf_counter()
+        raw = synthetic.gerar_raw(Path(tmp), series, anos, seed)
+        df = synthetic.curated(series, anos, seed)
+        print(f"[BENCH] dados: {series} série(s) × {anos} ano(s) = {len(df)} linhas "
+              f"({time.perf_counter() - t0:.1f}s para gerar)")
+        resultados = {}
+        for nome, (fn, linhas) in casos(raw, df).items():
+            if only and not any(nome.startswith(o) for o in only):
+                continue
+            r = medir(fn, repeat)
+            r["linhas"] = linhas
+            r["linhas_por_s"] = round(linhas / r["mediana_s"]) if r["mediana_s"] else None
+            resultados[nome] = r
+            print(f"[BENCH] {nome:<22} mediana {r['mediana_s'] * 1000:9.2f} ms | "
+                  f"mín {r['min_s'] * 1000:9.2f} ms | {r['linhas_por_s'] or 0:>12,} linhas/s")
+    return {
+        "gerado_em": datetime.now().isoformat(timespec="seconds"),
+        "parametros": {"series": series, "anos": anos, "repeat": repeat, "seed": seed},
+        "ambiente": ambiente(),
+        "casos": resultados,
+    }
+
+
+# ===================== Baseline =====================
+def comparar(atual: dict, baseline: dict, tolerancia: float) -> list[str]:
+    """Imprime a comparação caso a caso e devolve os nomes com regressão."""
+    if atual["parametros"]["series"] != baseline["parametros"]["series"] or \
+            atual["parametros"]["anos"] != baseline["parametros"]["anos"]:
+        print("[AVISO] baseline gerado com outros --series/--anos; comparação ignorada")
+        return []
+    if atual["ambiente"] != baseline["ambiente"]:
+        print("[AVISO] ambiente diferente do baseline (versões/máquina); compare com cautela")
+
+    regressoes = []
+    for nome, r in atual["casos"].items():
+        base = baseline["casos"].get(nome)
+        if base is None:
+            print(f"[INFO] {nome}: sem baseline")
+            continue
+        razao = r["mediana_s"] / base["mediana_s"] if base["mediana_s"] else float("inf")
+        delta = r["mediana_s"] - base["mediana_s"]
+        if razao > 1 + tolerancia and delta > NOISE_FLOOR_S:
+            tag = "[REGRESSÃO]"
+            regressoes.append(nome)
+        elif razao < 1 - tolerancia and -delta > NOISE_FLOOR_S:
+            tag = "[MELHORA]"
+        else:
+            tag = "[OK]"
+        print(f"{tag} {nome}: {base['mediana_s'] * 1000:.2f} → {r['mediana_s'] * 1000:.2f} ms ({razao:.2f}×)")
+    return regressoes
+
+
+# =====================
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--series", type=int, default=3, help="nº de séries sintéticas")
+    parser.add_argument("--anos", type=int, default=20, help="anos de dias úteis por série")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--only", nargs="+", help="prefixos dos casos a rodar (ex.: leitura rollups)")
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH)
+    parser.add_argument("--save-baseline", action="store_true", help="grava o resultado como novo baseline")
+    parser.add_argument("--tolerancia", type=float, default=0.25, help="aumento relativo tolerado (0.25 = 25%%)")
+    parser.add_argument("--output", type=Path, help="grava o resultado desta execução em JSON")
+    args = parser.parse_args()
+
+    atual = executar(args.series, args.anos, args.repeat, args.seed, args.only)
+    texto = json.dumps(atual, indent=2, ensure_ascii=False)
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_text(texto, encoding="utf-8")
+        print(f"[OK] resultado → {args.output}")
+    if args.save_baseline:
+        args.baseline.write_text(texto, encoding="utf-8")
+        print(f"[OK] baseline → {args.baseline}")
+        sys.exit(0)
+    if not args.baseline.exists():
+        print(f"[INFO] sem baseline em {args.baseline}; rode com --save-baseline")
+        sys.exit(0)
+    regressoes = comparar(atual, json.loads(args.baseline.read_text(encoding="utf-8")), args.tolerancia)
+    if regressoes:
+        print(f"[ERRO] {len(regressoes)} regressão(ões): {', '.join(regressoes)}")
+        sys.exit(1)
+    print("[OK] nenhuma regressão acima da tolerância")
@@ -0,0 +1,122 @@
+# -*- coding: utf-8 -*-
+"""
+Gerador de dados sintéticos no formato CEPEA (para os benchmarks)
+
+- planilhas .xlsx com o layout baixado do CEPEA: 3 linhas de título,
+  cabeçalho "Data" / "À vista R$" / "À vista US$", datas dd/mm/aaaa em
+  texto e preços em texto pt-BR ("1.234,56") ou numéricos
+- frames no formato do curated (data, commodity, regiao, valor_brl,
+  valor_usd), para os estágios que não leem planilha
+
+Escala por N séries (as do series.toml primeiro) × M anos de dias úteis;
+mesma semente, mesmos dados.
+
+    python benchmarks/synthetic.py --series 3 --anos 20 --saida /tmp/cepea_raw
+"""
+
+import argparse
+import sys
+from datetime import date
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from src.series_registry import load_series  # noqa: E402
+
+# As séries do registro primeiro; as demais recebem nomes sintéticos
+SERIES_REAIS = [(s.commodity, s.regiao) for s in load_series()]
+INICIO = date(2006, 3, 13)
+TITULO = "INDICADOR SINTÉTICO ESALQ/BM&FBOVESPA"
+
+
+def series(n: int) -> list[tuple[str, str]]:
+    """(commodity, regiao) das n séries."""
+    extra = [(f"SINT{i:02d}", "BRASIL") for i in range(1, max(n - len(SERIES_REAIS), 0) + 1)]
+    return (SERIES_REAIS + extra)[:n]
+
+
+def _precos(n: int, rng: np.random.Generator) -> tuple[np.ndarray, np.ndarray]:
+    """Passeio aleatório geométrico para o preço em R$ e para o câmbio."""
+    brl = 30.0 * np.exp(np.cumsum(rng.normal(0.0002, 0.012, n)))
+    cambio = 2.2 * np.exp(np.cumsum(rng.normal(0.0001, 0.008, n)))
+    return np.round(brl, 2), np.round(brl / cambio, 2)
+
+
+def serie_diaria(anos: int, seed: int = 0) -> pd.DataFrame:
+    """Uma série diária (dias úteis) com data, valor_brl e valor_usd."""
+    datas = pd.bdate_range(INICIO, periods=int(anos * 252))
+    brl, usd = _precos(len(datas), np.random.default_rng(seed))
+    return pd.DataFrame({"data": datas, "valor_brl": brl, "valor_usd": usd})
+
+
+def curated(n_series: int, anos: int, seed: int = 0) -> pd.DataFrame:
+    """Frame no formato do cepea_curated.csv, ordenado por data."""
+    partes = [
+        serie_diaria(anos, seed + i).assign(commodity=c, regiao=r)
+        for i, (c, r) in enumerate(series(n_series))
+    ]
+    df = pd.concat(partes, ignore_index=True)
+    return df[["data", "commodity", "regiao", "valor_brl", "valor_usd"]].sort_values(
+        ["data", "commodity", "regiao"], ignore_index=True
+    )
+
+
+# ===================== Planilhas =====================
+def _pt_br(values: np.ndarray) -> list[str]:
+    return [f"{v:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".") for v in values]
+
+
+def escrever_planilha(df: pd.DataFrame, path: Path, texto: bool = True) -> Path:
+    """
+    Grava a série no layout CEPEA. texto=True escreve os preços como texto
+    pt-BR; False, como números do Excel (como no arquivo baixado hoje).
+    """
+    import openpyxl
+
+    wb = openpyxl.Workbook(write_only=True)
+    ws = wb.create_sheet("Plan 1")
+    ws.append([TITULO])
+    ws.append([])
+    ws.append(["Fonte: Cepea"])
+    ws.append(["Data", "À vista R$", "À vista US$"])
+    datas = df["data"].dt.strftime("%d/%m/%Y").tolist()
+    if texto:
+        brl, usd = _pt_br(df["valor_brl"].to_numpy()), _pt_br(df["valor_usd"].to_numpy())
+    else:
+        brl, usd = df["valor_brl"].tolist(), df["valor_usd"].tolist()
+    for row in zip(datas, brl, usd):
+        ws.append(row)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    wb.save(path)
+    return path
+
+
+def gerar_raw(root: Path, n_series: int, anos: int, seed: int = 0, texto: bool = True) -> list[tuple]:
+    """
+    Uma planilha por série em root/<commodity>_<regiao>/CEPEA_sintetico.xlsx.
+    Retorna [(pasta, commodity, regiao)], no formato de cepea_etl.SERIES.
+    """
+    saida = []
+    for i, (c, r) in enumerate(series(n_series)):
+        pasta = Path(root) / f"{c.lower()}_{r.lower()}"
+        escrever_planilha(serie_diaria(anos, seed + i), pasta / "CEPEA_sintetico.xlsx", texto=texto)
+        saida.append((pasta, c, r))
+    return saida
+
+
+# =====================
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--series", type=int, default=3)
+    parser.add_argument("--anos", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--numerico", action="store_true", help="preços como número do Excel, não texto pt-BR")
+    parser.add_argument("--saida", type=Path, required=True)
+    args = parser.parse_args()
+    for pasta, c, r in gerar_raw(args.saida, args.series, args.anos, args.seed, texto=not args.numerico):
+        print(f"[OK] {c}/{r} → {pasta}")
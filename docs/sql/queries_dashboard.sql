@@ -40,18 +40,15 @@ WHERE rn = 1
 ORDER BY valor_brl DESC;
 
 -- 04) Variação diária (%D-1)
+-- 04) a 06) leem os indicadores pré-calculados pelo ETL (cepea_indicadores)
 SELECT
     data,
     commodity,
     regiao,
     valor_brl,
-    LAG(valor_brl) OVER (PARTITION BY commodity, regiao ORDER BY data) AS valor_d1,
-    CASE
-        WHEN LAG(valor_brl) OVER (PARTITION BY commodity, regiao ORDER BY data) > 0
-        THEN (valor_brl / LAG(valor_brl) OVER (PARTITION BY commodity, regiao ORDER BY data) - 1.0) * 100
-        ELSE NULL
-    END AS variacao_pct_d1
-FROM cepea_preco_diario
+    valor_brl_d1 AS valor_d1,
+    variacao_pct_d1
+FROM cepea_indicadores
 WHERE commodity = :commodity
 ORDER BY regiao, data;
 
@@ -61,10 +58,10 @@ SELECT
     commodity,
     regiao,
     valor_brl,
-    AVG(valor_brl) OVER (PARTITION BY commodity, regiao ORDER BY data ROWS BETWEEN 6 PRECEDING  AND CURRENT ROW) AS mm7,
-    AVG(valor_brl) OVER (PARTITION BY commodity, regiao ORDER BY data ROWS BETWEEN 29 PRECEDING AND CURRENT ROW) AS mm30,
-    AVG(valor_brl) OVER (PARTITION BY commodity, regiao ORDER BY data ROWS BETWEEN 89 PRECEDING AND CURRENT ROW) AS mm90
-FROM cepea_preco_diario
+    mm7_brl  AS mm7,
+    mm30_brl AS mm30,
+    mm90_brl AS mm90
+FROM cepea_indicadores
 WHERE commodity = :commodity
 ORDER BY data;
 
@@ -74,7 +71,7 @@ SELECT
     commodity,
     regiao,
     valor_brl,
-    STDDEV(valor_brl) OVER (PARTITION BY commodity, regiao ORDER BY data ROWS BETWEEN 29 PRECEDING AND CURRENT ROW) AS vol30
-FROM cepea_preco_diario
+    vol30_brl AS vol30
+FROM cepea_indicadores
 WHERE commodity = :commodity
-ORDER BY data ASC;
\ No newline at end of file
+ORDER BY data ASC;
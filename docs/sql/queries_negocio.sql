@@ -42,18 +42,15 @@ FROM base
 ORDER BY commodity, regiao, data;
 
 -- 03) Variação diária % (D-1) por série
+-- Pré-calculada pelo ETL em cepea_indicadores (src/db/cepea_indicadores.py)
 SELECT
   data,
   commodity,
   regiao,
   valor_brl,
-  LAG(valor_brl) OVER (PARTITION BY commodity, regiao ORDER BY data) AS valor_brl_d1,
-  CASE
-    WHEN LAG(valor_brl) OVER (PARTITION BY commodity, regiao ORDER BY data) > 0
-    THEN (valor_brl / LAG(valor_brl) OVER (PARTITION BY commodity, regiao ORDER BY data) - 1.0) * 100
-    ELSE NULL
-  END AS variacao_pct_d1
-FROM cepea_preco_diario
+  valor_brl_d1,
+  variacao_pct_d1
+FROM cepea_indicadores
 ORDER BY commodity, regiao, data;
 
 -- 04) Tendência de longo prazo: média móvel de 90 dias (MM90)
@@ -62,8 +59,8 @@ SELECT
   commodity,
   regiao,
   valor_brl,
-  AVG(valor_brl) OVER (PARTITION BY commodity, regiao ORDER BY data ROWS BETWEEN 89 PRECEDING AND CURRENT ROW) AS mm90_brl
-FROM cepea_preco_diario
+  mm90_brl
+FROM cepea_indicadores
 ORDER BY commodity, regiao, data;
 
 -- ============================================
@@ -142,9 +139,9 @@ SELECT
   commodity,
   regiao,
   valor_brl,
-  AVG(valor_brl) OVER (PARTITION BY commodity, regiao ORDER BY data ROWS BETWEEN 6 PRECEDING AND CURRENT ROW)  AS mm7_brl,
-  AVG(valor_brl) OVER (PARTITION BY commodity, regiao ORDER BY data ROWS BETWEEN 29 PRECEDING AND CURRENT ROW) AS mm30_brl
-FROM cepea_preco_diario
+  mm7_brl,
+  mm30_brl
+FROM cepea_indicadores
 ORDER BY commodity, regiao, data;
 
 -- 09) Volatilidade 30 dias (desvio padrão móvel) por série
@@ -153,11 +150,12 @@ SELECT
   commodity,
   regiao,
   valor_brl,
-  STDDEV(valor_brl) OVER (PARTITION BY commodity, regiao ORDER BY data ROWS BETWEEN 29 PRECEDING AND CURRENT ROW) AS vol30_brl
-FROM cepea_preco_diario
+  vol30_brl
+FROM cepea_indicadores
 ORDER BY commodity, regiao, data;
 
 -- 10) Z-Score (normalização) por série (base histórica completa)
+-- Versão móvel (janela de 90 pregões) pré-calculada: cepea_indicadores.zscore90_brl
 WITH stats AS (
   SELECT
     commodity,
@@ -178,16 +176,6 @@ JOIN stats s USING (commodity, regiao)
 ORDER BY d.commodity, d.regiao, d.data;
 
 -- 11) Sinal de tendência (UP/DOWN/FLAT) via MM7 vs MM30
-WITH mov AS (
-  SELECT
-    data,
-    commodity,
-    regiao,
-    valor_brl,
-    AVG(valor_brl) OVER (PARTITION BY commodity, regiao ORDER BY data ROWS BETWEEN 6 PRECEDING AND CURRENT ROW)  AS mm7_brl,
-    AVG(valor_brl) OVER (PARTITION BY commodity, regiao ORDERBY data ROWS BETWEEN 29 PRECEDING AND CURRENT ROW) AS mm30_brl
-  FROM cepea_preco_diario
-)
 SELECT
   data,
   commodity,
@@ -195,13 +183,8 @@ SELECT
   valor_brl,
   mm7_brl,
   mm30_brl,
-  CASE
-    WHEN mm7_brl IS NULL OR mm30_brl IS NULL THEN NULL
-    WHEN mm7_brl > mm30_brl THEN 'UP'
-    WHEN mm7_brl < mm30_brl THEN 'DOWN'
-    ELSE 'FLAT'
-  END AS sinal_tendencia
-FROM mov
+  sinal_tendencia
+FROM cepea_indicadores
 ORDER BY commodity, regiao, data;
 
 -- ============================================
@@ -12,4 +12,46 @@ CREATE TABLE IF NOT EXISTS cepea_preco_diario (
     valor_brl   NUMERIC(12,4) NOT NULL,
     valor_usd   NUMERIC(12,4) NOT NULL,
     PRIMARY KEY (data, commodity, regiao)
-);
\ No newline at end of file
+);
+
+-- Indicadores derivados (mantidos pelo ETL: src/db/cepea_indicadores.py)
+-- Atualização incremental: só as datas novas de cada série são calculadas,
+-- usando os 89 pregões anteriores para fechar as janelas móveis.
+CREATE TABLE IF NOT EXISTS cepea_indicadores (
+    data             DATE        NOT NULL,
+    commodity        VARCHAR(20) NOT NULL,
+    regiao           VARCHAR(20) NOT NULL,
+    valor_brl        NUMERIC(12,4) NOT NULL,
+    valor_usd        NUMERIC(12,4) NOT NULL,
+    valor_brl_d1     NUMERIC(12,4),
+    variacao_pct_d1  NUMERIC(12,4),
+    mm7_brl          NUMERIC(12,4),
+    mm30_brl         NUMERIC(12,4),
+    mm90_brl         NUMERIC(12,4),
+    vol30_brl        NUMERIC(12,4),
+    zscore90_brl     NUMERIC(12,4),
+    sinal_tendencia  VARCHAR(4),
+    PRIMARY KEY (data, commodity, regiao),
+    FOREIGN KEY (data, commodity, regiao)
+        REFERENCES cepea_preco_diario (data, commodity, regiao) ON DELETE CASCADE
+);
+
+-- Auditoria das revisões do CEPEA (mantida pela carga: src/db/cepea_load_postgres.py)
+-- Cada preço corrigido (U) ou retirado da série (D) pelo CEPEA, com os
+-- valores anterior e novo e a versão do manifesto do ETL que o detectou.
+CREATE TABLE IF NOT EXISTS cepea_preco_revisao (
+    id             BIGSERIAL PRIMARY KEY,
+    data           DATE        NOT NULL,
+    commodity      VARCHAR(20) NOT NULL,
+    regiao         VARCHAR(20) NOT NULL,
+    operacao       CHAR(1)     NOT NULL,
+    valor_brl_ant  NUMERIC(12,4),
+    valor_usd_ant  NUMERIC(12,4),
+    valor_brl      NUMERIC(12,4),
+    valor_usd      NUMERIC(12,4),
+    execucao       TEXT,
+    detectado_em   TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+
+CREATE INDEX IF NOT EXISTS ix_cepea_preco_revisao_serie
+    ON cepea_preco_revisao (commodity, regiao, data);
@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+"""
+Armazenamento de anexos do dashboard (endereçado por conteúdo)
+
+Cada arquivo enviado vira um blob em data/attachments/<sha256>: o mesmo
+conteúdo enviado por várias sessões ocupa disco uma vez só. A sessão guarda
+apenas metadados (nome, mime, tamanho, hash); os bytes são lidos do disco
+só para pré-visualizar ou baixar. O total em disco é limitado por
+ATTACHMENTS_MAX_MB e os blobs menos usados recentemente (mtime) são
+removidos primeiro.
+"""
+
+import hashlib
+import mimetypes
+import os
+import threading
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[2]
+ATTACHMENTS_DIR = ROOT / os.getenv("ATTACHMENTS_DIR", "data/attachments")
+ATTACHMENTS_MAX_MB = float(os.getenv("ATTACHMENTS_MAX_MB", "512"))
+CHUNK = 1 << 20
+
+
+def guess_mime(name: str, fallback: str | None = None) -> str:
+    mime, _ = mimetypes.guess_type(name)
+    return mime or fallback or "application/octet-stream"
+
+
+class AttachmentStore:
+    def __init__(self, root: Path = ATTACHMENTS_DIR, max_mb: float = ATTACHMENTS_MAX_MB):
+        self.root = Path(root)
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def path(self, digest: str) -> Path:
+        return self.root / digest
+
+    def exists(self, digest: str) -> bool:
+        return self.path(digest).is_file()
+
+    def put(self, fileobj) -> tuple[str, int]:
+        """
+        Copia o arquivo em blocos para o armazenamento, calculando o SHA-256
+        no caminho. Retorna (hash, tamanho); conteúdo repetido não é regravado.
+        """
+        h = hashlib.sha256()
+        size = 0
+        tmp = self.root / f".upload-{os.getpid()}-{threading.get_ident()}.part"
+        fileobj.seek(0)
+        try:
+            with open(tmp, "wb") as out:
+                for block in iter(lambda: fileobj.read(CHUNK), b""):
+                    h.update(block)
+                    out.write(block)
+                    size += len(block)
+            digest = h.hexdigest()
+            if self.exists(digest):
+                os.utime(self.path(digest))
+            else:
+                os.replace(tmp, self.path(digest))
+        finally:
+            tmp.unlink(missing_ok=True)
+        self._evict(keep=digest)
+        return digest, size
+
+    def read(self, digest: str) -> bytes | None:
+        """Bytes do blob (None se já foi descartado pela cota)."""
+        path = self.path(digest)
+        try:
+            data = path.read_bytes()
+        except FileNotFoundError:
+            return None
+        os.utime(path)  # marca como usado recentemente (LRU)
+        return data
+
+    def _evict(self, keep: str | None = None):
+        """Remove os blobs menos usados até caber no limite."""
+        files = [(p, p.stat()) for p in self.root.iterdir() if p.is_file() and not p.name.startswith(".")]
+        total = sum(st.st_size for _, st in files)
+        for p, st in sorted(files, key=lambda item: item[1].st_mtime):
+            if total <= self.max_bytes:
+                break
+            if p.name == keep:
+                continue
+            try:
+                p.unlink()
+                total -= st.st_size
+            except OSError:
+                pass
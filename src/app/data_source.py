@@ -0,0 +1,263 @@
+# -*- coding: utf-8 -*-
+"""
+Fontes de dados do dashboard
+
+Duas implementações com a mesma interface:
+- ArquivoSource: dataset Parquet do ETL (ou o CSV curated, sem pyarrow)
+- PostgresSource: tabela cepea_preco_diario via engine SQLAlchemy com pool
+
+Os filtros da barra lateral (período, commodities, regiões e colunas de
+preço) são aplicados na origem — predicados no SQL, ou busca binária no
+índice em memória (compartilhado entre sessões) para os arquivos —, então
+cada sessão só materializa a seleção.
+
+Cada fonte expõe version(): a versão do manifesto do ETL (arquivos) ou um
+resumo da tabela e da última revisão auditada (PostgreSQL). Ela entra na
+chave dos caches do dashboard, que assim só recarregam quando os dados
+publicados mudam.
+
+A escolha vem de DASHBOARD_SOURCE: "auto" (PostgreSQL se acessível, senão
+arquivo), "postgres" ou "arquivo".
+"""
+
+import os
+import sys
+from datetime import date
+from pathlib import Path
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.dataset as pads
+
+    DICT_STRING = pa.dictionary(pa.int32(), pa.string())
+except ImportError:  # sem pyarrow a fonte de arquivo lê o CSV curated
+    pads = None
+
+ROOT = Path(__file__).resolve().parents[2]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from src.app.series_index import SeriesIndex  # noqa: E402
+from src.etl.cepea_manifest import manifest_version  # noqa: E402
+from src.series_registry import regioes_nomes  # noqa: E402
+
+CURATED_PATH = ROOT / "data" / "curated" / "cepea" / "cepea_curated.csv"
+PARQUET_DIR = ROOT / "data" / "curated" / "cepea" / "parquet"
+PRICE_COLUMNS = ("valor_brl", "valor_usd")
+PRICE_DTYPE = "float32"
+
+DASHBOARD_SOURCE = os.getenv("DASHBOARD_SOURCE", "auto")
+
+# Siglas gravadas pelo ETL → nomes exibidos no dashboard (series.toml)
+REGIOES_NOMES = regioes_nomes()
+REGIOES_SIGLAS = {v: k for k, v in REGIOES_NOMES.items()}
+
+
+def _to_codes(regioes) -> list[str]:
+    return [REGIOES_SIGLAS.get(r, r) for r in regioes]
+
+
+def _dimension(values) -> pd.Categorical:
+    """Coluna de dimensão → categórica com categorias em ordem alfabética."""
+    cat = pd.Categorical(values)
+    return cat.reorder_categories(sorted(cat.categories))
+
+
+def _finish(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Normalização comum (representação canônica do dashboard): data em
+    datetime64, dimensões categóricas (códigos int8 + dicionário) e preços
+    float32 — suficientes para valores com 2 casas decimais.
+    """
+    df["data"] = pd.to_datetime(df["data"], errors="coerce").astype("datetime64[ns]")
+    df = df.dropna(subset=["data"])
+    df = df.sort_values("data")
+
+    df["commodity"] = _dimension(df["commodity"])
+    # Substitui siglas por nomes completos (só no dicionário, não por linha)
+    regiao = pd.Categorical(df["regiao"])
+    df["regiao"] = _dimension(regiao.rename_categories(
+        [REGIOES_NOMES.get(c, c) for c in regiao.categories]
+    ))
+    for col in PRICE_COLUMNS:
+        if col in df:
+            df[col] = df[col].astype(PRICE_DTYPE)
+    columns = ["data", "commodity", "regiao", *(c for c in PRICE_COLUMNS if c in df)]
+    return df[columns].reset_index(drop=True)
+
+
+# ===================== Arquivo (Parquet / CSV) =====================
+class ArquivoSource:
+    """
+    Carrega o curated uma vez por processo em um SeriesIndex (datas ordenadas
+    por série) e atende cada filtro com busca binária. O índice é refeito
+    quando a versão do manifesto do ETL muda (sem manifesto, quando o mtime
+    dos arquivos muda).
+    """
+
+    key = "arquivo"
+
+    def __init__(self):
+        self._index = None
+        self._version = None
+
+    @property
+    def _use_parquet(self) -> bool:
+        return pads is not None and PARQUET_DIR.exists()
+
+    def _files(self) -> list[Path]:
+        return sorted(PARQUET_DIR.rglob("*.parquet")) if self._use_parquet else [CURATED_PATH]
+
+    def _current_signature(self) -> tuple:
+        return tuple((str(p), p.stat().st_mtime_ns) for p in self._files() if p.exists())
+
+    def version(self) -> str:
+        version = manifest_version()
+        if version is None:
+            signature = self._current_signature()
+            version = f"mtime-{len(signature)}-{max((m for _, m in signature), default=0)}"
+        return version
+
+    def _read_all(self) -> pd.DataFrame:
+        columns = ["data", "commodity", "regiao", *PRICE_COLUMNS]
+        if self._use_parquet:
+            partitioning = pads.partitioning(
+                pa.schema([("commodity", DICT_STRING), ("regiao", DICT_STRING)]),
+                flavor="hive", dictionaries="infer",
+            )
+            dataset = pads.dataset(PARQUET_DIR, format="parquet", partitioning=partitioning)
+            table = dataset.to_table(columns=columns)
+            table = table.set_column(0, "data", table.column("data").cast(pa.timestamp("ns")))
+            for col in PRICE_COLUMNS:
+                i = table.schema.get_field_index(col)
+                table = table.set_column(i, col, table.column(col).cast(pa.float32()))
+            df = table.to_pandas()
+        else:
+            df = pd.read_csv(CURATED_PATH, encoding="utf-8", usecols=columns, parse_dates=["data"],
+                             dtype={"commodity": "category", "regiao": "category",
+                                    **{col: PRICE_DTYPE for col in PRICE_COLUMNS}})
+        return _finish(df)
+
+    @property
+    def index(self) -> SeriesIndex:
+        version = self.version()
+        if self._index is None or version != self._version:
+            self._index = SeriesIndex(self._read_all(), PRICE_COLUMNS)
+            self._version = version
+        return self._index
+
+    def meta(self) -> dict:
+        idx = self.index
+        ini, fim = idx.period
+        return {
+            "min": ini.date(),
+            "max": fim.date(),
+            "commodities": idx.commodities,
+            "regioes": idx.regioes,
+        }
+
+    def fetch(self, din: date, dfi: date, commodities, regioes, cols=PRICE_COLUMNS) -> pd.DataFrame:
+        return self.index.slice(din, dfi, commodities, regioes, cols)
+
+
+# ===================== PostgreSQL =====================
+class PostgresSource:
+    key = "postgres"
+
+    def __init__(self, engine):
+        self.engine = engine
+
+    def version(self) -> str:
+        from sqlalchemy import text
+
+        # Contagem e última data não mudam quando o CEPEA revisa preços
+        # antigos: a última revisão auditada pela carga entra na versão
+        sql = text("""
+            SELECT COUNT(*), MAX(data), to_regclass('cepea_preco_revisao') IS NOT NULL
+            FROM cepea_preco_diario
+        """)
+        with self.engine.connect() as conn:
+            count, last, auditada = conn.execute(sql).one()
+            revisao = conn.execute(text("SELECT MAX(id) FROM cepea_preco_revisao")).scalar() if auditada else None
+        return f"pg-{count}-{last}-{revisao or 0}"
+
+    def has_rows(self) -> bool:
+        from sqlalchemy import text
+
+        with self.engine.connect() as conn:
+            return bool(conn.execute(text("SELECT EXISTS (SELECT 1 FROM cepea_preco_diario)")).scalar())
+
+    def meta(self) -> dict:
+        from sqlalchemy import text
+
+        sql = text("""
+            SELECT commodity, regiao, MIN(data) AS data_min, MAX(data) AS data_max
+            FROM cepea_preco_diario
+            GROUP BY commodity, regiao
+        """)
+        with self.engine.connect() as conn:
+            rows = pd.DataFrame(conn.execute(sql).all(), columns=["commodity", "regiao", "min", "max"])
+        if rows.empty:  # banco acessível, mas o ETL ainda não carregou nada
+            return {"min": None, "max": None, "commodities": [], "regioes": []}
+        return {
+            "min": min(rows["min"]),
+            "max": max(rows["max"]),
+            "commodities": sorted(rows["commodity"].unique().tolist()),
+            "regioes": sorted(rows["regiao"].replace(REGIOES_NOMES).unique().tolist()),
+        }
+
+    def fetch(self, din: date, dfi: date, commodities, regioes, cols=PRICE_COLUMNS) -> pd.DataFrame:
+        from sqlalchemy import bindparam, text
+
+        if not commodities or not regioes:
+            return _finish(pd.DataFrame(columns=["data", "commodity", "regiao", *cols]))
+        projection = ", ".join(["data", "commodity", "regiao",
+                                *(f"{c}::float8 AS {c}" for c in cols if c in PRICE_COLUMNS)])
+        sql = text(f"""
+            SELECT {projection}
+            FROM cepea_preco_diario
+            WHERE data BETWEEN :din AND :dfi
+              AND commodity IN :commodities
+              AND regiao IN :regioes
+            ORDER BY data
+        """).bindparams(bindparam("commodities", expanding=True), bindparam("regioes", expanding=True))
+        params = {"din": din, "dfi": dfi, "commodities": list(commodities), "regioes": _to_codes(regioes)}
+        with self.engine.connect() as conn:
+            df = pd.read_sql(sql, conn, params=params)
+        return _finish(df)
+
+
+# ===================== Seleção =====================
+def create_engine_pool():
+    from sqlalchemy import create_engine
+    from src.config import SETTINGS
+
+    return create_engine(
+        SETTINGS.sqlalchemy_url,
+        pool_size=5,
+        max_overflow=5,
+        pool_pre_ping=True,
+        pool_recycle=1800,
+    )
+
+
+def get_source(kind: str = DASHBOARD_SOURCE):
+    """
+    Instancia a fonte configurada; em "auto" testa a conexão antes e usa os
+    arquivos curated se o banco estiver fora do ar ou ainda vazio.
+    """
+    if kind == "arquivo":
+        return ArquivoSource()
+    try:
+        source = PostgresSource(create_engine_pool())
+        if not source.has_rows() and kind != "postgres":
+            print("[AVISO] cepea_preco_diario vazia; usando arquivos curated")
+            return ArquivoSource()
+        return source
+    except Exception as exc:
+        if kind == "postgres":
+            raise
+        print(f"[AVISO] PostgreSQL indisponível ({exc.__class__.__name__}); usando arquivos curated")
+        return ArquivoSource()
@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+"""
+Redução de pontos dos gráficos (downsampling por série)
+
+Uma série diária de 20 anos tem ~5 mil pontos; com várias séries por
+gráfico, o payload do Plotly passa de dezenas de milhares de pontos por
+execução. Aqui cada traço é limitado a `max_points`, preservando a forma:
+- "minmax": divide a série em baldes e mantém o mínimo e o máximo de cada
+  um — picos e vales nunca somem (padrão)
+- "lttb": Largest-Triangle-Three-Buckets, escolhe por balde o ponto que
+  forma o maior triângulo com os vizinhos — melhor fidelidade visual
+
+Séries com até `max_points` pontos (ex.: período filtrado estreito) passam
+intactas, em resolução total.
+"""
+
+import numpy as np
+import pandas as pd
+
+METHODS = ("minmax", "lttb")
+
+
+# ===================== Seleção de índices =====================
+def minmax_indices(y: np.ndarray, max_points: int) -> np.ndarray:
+    """Índices (ordenados) do mínimo e do máximo de cada balde, mais as pontas."""
+    n = len(y)
+    if n <= max_points:
+        return np.arange(n)
+    n_buckets = max(1, (max_points - 2) // 2)
+    bucket = np.arange(n) * n_buckets // n
+    y = np.asarray(y, dtype=np.float64)
+    # NaN vai para o fim de cada balde e nunca é escolhido como mínimo/máximo
+    order = np.lexsort((np.where(np.isnan(y), np.inf, y), bucket))
+    starts = np.searchsorted(bucket[order], np.arange(n_buckets), side="left")
+    counts = np.bincount(bucket, weights=~np.isnan(y), minlength=n_buckets).astype(np.int64)
+    ends = starts + np.maximum(counts, 1) - 1
+    keep = np.concatenate([[0, n - 1], order[starts], order[ends]])
+    return np.unique(keep)
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, max_points: int) -> np.ndarray:
+    """Índices escolhidos pelo Largest-Triangle-Three-Buckets."""
+    n = len(y)
+    if n <= max_points or max_points < 3:
+        return np.arange(n)
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    y = np.where(np.isnan(y), np.nanmean(y), y)
+
+    # Baldes do miolo (o primeiro e o último ponto são sempre mantidos)
+    edges = np.linspace(1, n - 1, max_points - 1).astype(np.int64)
+    out = np.empty(max_points, dtype=np.int64)
+    out[0], out[-1] = 0, n - 1
+    a = 0
+    for i in range(max_points - 2):
+        lo, hi = edges[i], edges[i + 1]
+        nxt_lo, nxt_hi = hi, edges[i + 2] if i + 2 < len(edges) else n
+        cx = x[nxt_lo:nxt_hi].mean() if nxt_hi > nxt_lo else x[-1]
+        cy = y[nxt_lo:nxt_hi].mean() if nxt_hi > nxt_lo else y[-1]
+        area = np.abs((x[a] - cx) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (cy - y[a]))
+        a = lo + int(area.argmax())
+        out[i + 1] = a
+    return out
+
+
+# ===================== DataFrame =====================
+def downsample(df: pd.DataFrame, x: str, y: str, by=(), max_points: int = 2000,
+               method: str = "minmax") -> pd.DataFrame:
+    """
+    Limita cada traço (grupo `by`) a `max_points` pontos. O DataFrame deve
+    estar ordenado por `x` dentro de cada grupo; as demais colunas seguem as
+    linhas escolhidas.
+    """
+    if method not in METHODS:
+        raise ValueError(f"método de downsampling desconhecido: {method}")
+    if df.empty or max_points <= 0:
+        return df
+
+    groups = df.groupby(list(by), sort=False, observed=True).indices if by else {None: np.arange(len(df))}
+    if all(len(pos) <= max_points for pos in groups.values()):
+        return df
+
+    xs = df[x].to_numpy()
+    if np.issubdtype(xs.dtype, np.datetime64):
+        xs = xs.astype("datetime64[ns]").astype(np.int64)
+    ys = df[y].to_numpy(dtype=np.float64)
+
+    keep = []
+    for pos in groups.values():
+        if method == "lttb":
+            keep.append(pos[lttb_indices(xs[pos], ys[pos], max_points)])
+        else:
+            keep.append(pos[minmax_indices(ys[pos], max_points)])
+    return df.iloc[np.sort(np.concatenate(keep))]
@@ -0,0 +1,155 @@
+# -*- coding: utf-8 -*-
+"""
+Exportação da seleção do dashboard (CSV, Parquet, Excel)
+
+O arquivo só é gerado quando alguém clica em baixar (o botão recebe uma
+função, não bytes) e é escrito em disco em blocos de EXPORT_CHUNK_ROWS
+linhas — nenhuma cópia inteira em texto/bytes da tabela fica em memória
+durante a serialização. O resultado fica em data/cache/exports, chaveado
+pela tupla de filtros (que inclui a versão dos dados) + periodicidade +
+formato — uma nova carga do ETL gera chaves novas — e limitado por
+EXPORT_MAX_MB (os mais antigos são removidos primeiro).
+
+Na entrega, o st.download_button converte o retorno da função em bytes
+(mesmo um arquivo aberto é lido por inteiro, e SpooledTemporaryFile nem é
+aceito), então o conteúdo final existe uma vez em memória, só no clique.
+Quem não usa o Streamlit pode usar export_file e servir o caminho em disco.
+"""
+
+import hashlib
+import os
+import threading
+from pathlib import Path
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # sem pyarrow o formato Parquet fica indisponível
+    pq = None
+
+ROOT = Path(__file__).resolve().parents[2]
+EXPORT_DIR = ROOT / os.getenv("EXPORT_DIR", "data/cache/exports")
+EXPORT_CHUNK_ROWS = int(os.getenv("EXPORT_CHUNK_ROWS", "50000"))
+EXPORT_MAX_MB = float(os.getenv("EXPORT_MAX_MB", "256"))
+EXCEL_MAX_ROWS = 1_048_575  # limite de linhas da planilha, sem o cabeçalho
+
+COLUMNS = {
+    "data": "Data",
+    "commodity": "Commodity",
+    "regiao": "Região",
+    "valor_brl": "Preço (R$)",
+    "valor_usd": "Preço (US$)",
+}
+
+FORMATS = {
+    "CSV": (".csv", "text/csv"),
+    "Parquet": (".parquet", "application/vnd.apache.parquet"),
+    "Excel": (".xlsx", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"),
+}
+
+
+def available_formats() -> list[str]:
+    return [f for f in FORMATS if f != "Parquet" or pq is not None]
+
+
+def _export_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """Ordem cronológica; preços float32 do dashboard voltam a float64 com 2 casas."""
+    out = df.sort_values(["data", "commodity", "regiao"], ignore_index=True)[list(COLUMNS)]
+    return out.astype({"valor_brl": "float64", "valor_usd": "float64"}).round({"valor_brl": 2, "valor_usd": 2})
+
+
+def _chunks(df: pd.DataFrame, rows: int = EXPORT_CHUNK_ROWS):
+    for start in range(0, len(df), rows):
+        yield start, df.iloc[start:start + rows]
+
+
+# ===================== Escritores (em blocos) =====================
+def _write_csv(df: pd.DataFrame, path: Path):
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        for start, part in _chunks(df):
+            part.rename(columns=COLUMNS).to_csv(
+                f, header=start == 0, index=False, float_format="%.2f"
+            )
+
+
+def _write_parquet(df: pd.DataFrame, path: Path):
+    writer = None
+    try:
+        for _, part in _chunks(df):
+            table = pa.Table.from_pandas(part.rename(columns=COLUMNS), preserve_index=False)
+            if writer is None:
+                writer = pq.ParquetWriter(path, table.schema)
+            writer.write_table(table)
+    finally:
+        if writer is not None:
+            writer.close()
+
+
+def _write_excel(df: pd.DataFrame, path: Path):
+    import openpyxl
+
+    if len(df) > EXCEL_MAX_ROWS:
+        raise ValueError(f"{len(df)} linhas excedem o limite do Excel; use CSV ou Parquet")
+    wb = openpyxl.Workbook(write_only=True)  # linhas vão direto para o arquivo
+    ws = wb.create_sheet("CEPEA")
+    ws.append(list(COLUMNS.values()))
+    for _, part in _chunks(df):
+        datas = part["data"].dt.date.to_numpy()
+        outros = part.drop(columns="data").astype(object).to_numpy()
+        for d, row in zip(datas, outros):
+            ws.append([d, *(None if pd.isna(v) else v for v in row)])
+    wb.save(path)
+
+
+WRITERS = {"CSV": _write_csv, "Parquet": _write_parquet, "Excel": _write_excel}
+
+
+# ===================== Cache em disco =====================
+def export_path(key: tuple, fmt: str) -> Path:
+    digest = hashlib.sha256(repr(key).encode("utf-8")).hexdigest()[:20]
+    return EXPORT_DIR / f"cepea_{digest}{FORMATS[fmt][0]}"
+
+
+def _evict(max_bytes: int = int(EXPORT_MAX_MB * 1024 * 1024)):
+    """Remove as exportações mais antigas até caber no limite."""
+    files = [(p, p.stat()) for p in EXPORT_DIR.glob("cepea_*")]
+    total = sum(st.st_size for _, st in files)
+    for p, st in sorted(files, key=lambda item: item[1].st_mtime):
+        if total <= max_bytes:
+            break
+        try:
+            p.unlink()
+            total -= st.st_size
+        except OSError:
+            pass
+
+
+def export_file(df: pd.DataFrame, key: tuple, fmt: str) -> Path:
+    """
+    Caminho do arquivo exportado para `key` (tupla de filtros com a versão
+    dos dados); gera em blocos se ainda não existir.
+    """
+    path = export_path(key, fmt)
+    if path.exists():
+        os.utime(path)  # reaproveitado: mais recente na fila de remoção
+    else:
+        EXPORT_DIR.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f".{path.name}.{os.getpid()}-{threading.get_ident()}.part")
+        try:
+            WRITERS[fmt](_export_frame(df), tmp)
+            os.replace(tmp, path)
+        finally:
+            tmp.unlink(missing_ok=True)
+        _evict()
+    return path
+
+
+def export_bytes(df: pd.DataFrame, key: tuple, fmt: str) -> bytes:
+    """
+    Conteúdo para o st.download_button (chamado só no clique). O Streamlit
+    materializa o download em bytes de qualquer forma; a serialização em
+    blocos continua em disco, via export_file.
+    """
+    return export_file(df, key, fmt).read_bytes()
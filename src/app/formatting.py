@@ -0,0 +1,124 @@
+# -*- coding: utf-8 -*-
+"""
+Formatação pt-BR vetorizada (moeda e rótulos de data)
+
+Trabalha sobre arrays inteiros com operações NumPy, sem `.map`/`.apply` por
+linha nem cadeias de `.replace`:
+- números: "1.234,56" (milhar com ponto, decimal com vírgula; NaN → "")
+- datas: "dd/mm/aaaa", "1ª semana Jan/2024", "Jan/2024"
+
+As versões escalares (`fmt_brl`, `fmt_int`, `fmt_pct`) servem aos KPIs e usam o mesmo
+caminho vetorizado.
+"""
+
+import numpy as np
+import pandas as pd
+
+# Mês abreviado (pt-BR)
+PT_BR_MONTH_ABBR = np.array(["Jan", "Fev", "Mar", "Abr", "Mai", "Jun",
+                             "Jul", "Ago", "Set", "Out", "Nov", "Dez"])
+
+
+# ===================== Números =====================
+# Tabelas de consulta: cada grupo de milhar/centavos vira um índice (np.take)
+_GRUPO = np.array([str(i) for i in range(1000)])
+_GRUPO3 = np.array([f"{i:03d}" for i in range(1000)])
+_DIA2 = np.array([f"{i:02d}" for i in range(100)])
+
+
+def _frac_table(decimals: int) -> np.ndarray:
+    return np.array([f"{i:0{decimals}d}" for i in range(10 ** decimals)])
+
+
+_FRAC = {2: _frac_table(2)}
+
+
+def brl_array(values, decimals: int = 2) -> np.ndarray:
+    """Array numérico → array de strings pt-BR ("1.234,56"); NaN/inf viram ""."""
+    v = np.asarray(values, dtype=np.float64)
+    invalid = ~np.isfinite(v)
+    scale = 10 ** decimals
+    scaled = np.abs(np.where(invalid, 0.0, v)) * scale
+    units = np.floor(scaled + 0.5)
+    # Empates exatos em ",5" no produto em ponto flutuante: decide pelo valor
+    # decimal exato, como o format() do Python (ex.: 64,905 → "64,91")
+    for i in np.flatnonzero(scaled - np.floor(scaled) == 0.5):
+        units[i] = int(f"{abs(v[i]):.{decimals}f}".replace(".", ""))
+    units = units.astype(np.int64)
+    inteiro, frac = np.divmod(units, scale)
+
+    # Grupos de milhar do menos para o mais significativo
+    groups, rest = [], inteiro
+    while True:
+        groups.append(rest % 1000)
+        rest = rest // 1000
+        if not rest.any():
+            break
+
+    # Do grupo mais alto para o mais baixo: o primeiro não-zero sai sem zeros
+    # à esquerda, os seguintes com 3 dígitos e separador "."
+    out = np.full(v.shape, "", dtype="U1")
+    started = np.zeros(v.shape, dtype=bool)
+    for k, g in enumerate(reversed(groups)):
+        is_units = k == len(groups) - 1
+        piece = np.where(started, np.char.add(".", _GRUPO3[g]),
+                         np.where((g > 0) | is_units, _GRUPO[g], ""))
+        out = np.char.add(out, piece)
+        started |= g > 0
+
+    if decimals:
+        table = _FRAC.setdefault(decimals, _frac_table(decimals))
+        out = np.char.add(np.char.add(out, ","), table[frac])
+    out = np.where((v < 0) & (units > 0), np.char.add("-", out), out)
+    return np.where(invalid, "", out)
+
+
+def fmt_brl(x: float) -> str:
+    """Escalar → "1.234,56" ("" para NaN)."""
+    return str(brl_array([x])[0])
+
+
+def fmt_int(x: int) -> str:
+    """Escalar → "14.664"."""
+    return str(brl_array([x], decimals=0)[0])
+
+
+def fmt_pct(x: float) -> str:
+    """Escalar → "1,23%" ("—" para NaN, ex.: sem dia anterior)."""
+    s = fmt_brl(x)
+    return f"{s}%" if s else "—"
+
+
+# ===================== Datas =====================
+def _parts(dates) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    idx = pd.DatetimeIndex(dates)
+    return idx.day.to_numpy(), idx.month.to_numpy(), idx.year.to_numpy().astype(str)
+
+
+def date_labels(dates) -> np.ndarray:
+    """Datas → "dd/mm/aaaa"."""
+    d, m, y = _parts(dates)
+    out = np.char.add(np.char.add(_DIA2[d], "/"), _DIA2[m])
+    return np.char.add(np.char.add(out, "/"), y)
+
+
+def month_labels(dates) -> np.ndarray:
+    """Datas → "Jan/2024"."""
+    _, m, y = _parts(dates)
+    return np.char.add(np.char.add(PT_BR_MONTH_ABBR[m - 1], "/"), y)
+
+
+def week_labels(dates) -> np.ndarray:
+    """Datas → "1ª semana Jan/2024" (semana do mês = 1 + (dia - 1) // 7)."""
+    d, _, _ = _parts(dates)
+    n_sem = _GRUPO[1 + (d - 1) // 7]
+    return np.char.add(np.char.add(n_sem, "ª semana "), month_labels(dates))
+
+
+def period_labels(dates, freq: str) -> np.ndarray:
+    """Rótulo de exibição conforme a periodicidade do dashboard."""
+    if freq == "Semanal":
+        return week_labels(dates)
+    if freq == "Mensal":
+        return month_labels(dates)
+    return date_labels(dates)
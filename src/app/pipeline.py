@@ -0,0 +1,298 @@
+# -*- coding: utf-8 -*-
+"""
+Estágios de cálculo do dashboard
+
+Cada estágio é uma função pura memoizada com st.cache_data, chaveada apenas
+pelas entradas de que depende (filtros, periodicidade, moeda, commodity do
+gráfico R$ × US$). Um widget que não afeta um estágio não o recalcula:
+trocar a commodity do gráfico R$ × US$, por exemplo, só executa esse
+estágio. O cache é compartilhado entre sessões, limitado por max_entries
+e expõe contadores de acertos/erros (cache_stats()).
+
+`filtros` é sempre a tupla (source_key, versao, din, dfi, commodities,
+regioes). A versão dos dados (manifesto do ETL) faz parte da chave: os
+estágios só recalculam quando uma nova carga é publicada, em vez de expirar
+por tempo.
+"""
+
+import functools
+import os
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import plotly.express as px
+import streamlit as st
+
+ROOT = Path(__file__).resolve().parents[2]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from src.app.data_source import DASHBOARD_SOURCE, PRICE_COLUMNS, get_source  # noqa: E402
+from src.app.downsampling import downsample  # noqa: E402
+from src.app.formatting import brl_array, period_labels  # noqa: E402
+from src.etl.cepea_rollups import RULES, resample_mean  # noqa: E402
+
+# Cache das consultas por combinação de filtros (segundos / entradas);
+# TTL 0 = sem expiração, a invalidação vem da versão dos dados
+DATA_TTL = int(os.getenv("DASHBOARD_DATA_TTL", "0")) or None
+# Intervalo entre consultas da versão (manifesto / tabela) em segundos
+VERSION_TTL = int(os.getenv("DASHBOARD_VERSION_TTL", "30"))
+CACHE_ENTRIES = int(os.getenv("DASHBOARD_CACHE_ENTRIES", "64"))
+# Linhas por página da tabela (só a página exibida é formatada)
+TABLE_PAGE_SIZE = int(os.getenv("DASHBOARD_TABLE_PAGE_SIZE", "500"))
+# Pontos por traço nos gráficos: ~2 por pixel de largura (mín/máx por coluna)
+CHART_WIDTH_PX = int(os.getenv("DASHBOARD_CHART_WIDTH_PX", "1000"))
+CHART_MAX_POINTS = int(os.getenv("DASHBOARD_CHART_MAX_POINTS", str(2 * CHART_WIDTH_PX)))
+CHART_METHOD = os.getenv("DASHBOARD_CHART_METHOD", "minmax")  # minmax | lttb
+
+MOEDAS = {"valor_brl": "R$ (BRL)", "valor_usd": "US$ (USD)"}
+HOVER = "<br>".join([
+    "Data: %{x|%d/%m/%Y}",
+    "Preço: %{y:.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
+])
+
+
+# ===================== Cache com contadores =====================
+@st.cache_resource(show_spinner=False)
+def _counters() -> dict:
+    """Contadores globais (todas as sessões) por estágio."""
+    return {}
+
+
+def cached_stage(**cache_kwargs):
+    """st.cache_data com contagem de chamadas e execuções reais (misses)."""
+    cache_kwargs.setdefault("ttl", DATA_TTL)
+    cache_kwargs.setdefault("max_entries", CACHE_ENTRIES)
+    cache_kwargs.setdefault("show_spinner", False)
+
+    def deco(fn):
+        name = fn.__name__
+
+        @functools.wraps(fn)
+        def compute(*args, **kwargs):
+            _counters().setdefault(name, {"chamadas": 0, "misses": 0})["misses"] += 1
+            return fn(*args, **kwargs)
+
+        cached = st.cache_data(**cache_kwargs)(compute)
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            _counters().setdefault(name, {"chamadas": 0, "misses": 0})["chamadas"] += 1
+            return cached(*args, **kwargs)
+
+        wrapper.clear = cached.clear
+        return wrapper
+
+    return deco
+
+
+def cache_stats() -> pd.DataFrame:
+    rows = [
+        {"estágio": k, "chamadas": v["chamadas"], "hits": v["chamadas"] - v["misses"], "misses": v["misses"]}
+        for k, v in sorted(_counters().items())
+    ]
+    return pd.DataFrame(rows, columns=["estágio", "chamadas", "hits", "misses"])
+
+
+# ===================== Dados =====================
+@st.cache_resource(show_spinner=False)
+def data_source():
+    """Fonte de dados compartilhada entre sessões (engine com pool de conexões)."""
+    return get_source(DASHBOARD_SOURCE)
+
+
+@cached_stage(ttl=VERSION_TTL)
+def data_version(source_key: str) -> str:
+    """Versão dos dados publicados (lida de novo a cada VERSION_TTL segundos)."""
+    return data_source().version()
+
+
+@cached_stage()
+def load_meta(source_key: str, versao: str) -> dict:
+    """Período disponível e dimensões filtráveis."""
+    return data_source().meta()
+
+
+@cached_stage(show_spinner=True)
+def load_data(filtros: tuple) -> pd.DataFrame:
+    """Consulta só a seleção: os filtros são aplicados na origem (SQL/Parquet)."""
+    _, _, din, dfi, commodities, regioes = filtros
+    return data_source().fetch(din, dfi, commodities, regioes)
+
+
+def exact_prices(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Preços float32 → float64 com 2 casas (valor exato de origem) para
+    médias/agregações, sem acumular o erro de representação do float32.
+    """
+    cols = [c for c in PRICE_COLUMNS if c in df]
+    return df.assign(**{c: df[c].astype("float64").round(2) for c in cols})
+
+
+@cached_stage()
+def load_series(filtros: tuple, freq: str) -> pd.DataFrame:
+    """Série na periodicidade escolhida (diária ou agregada)."""
+    daily = load_data(filtros)
+    if freq in RULES:
+        return resample_mean(exact_prices(daily), RULES[freq])
+    return daily
+
+
+# ===================== KPIs =====================
+def kpi_metrics_daily(_df: pd.DataFrame, col: str):
+    if _df.empty:
+        return None
+
+    g = _df.sort_values("data")
+
+    last_day = g["data"].max()
+    g_last = g[g["data"] == last_day]
+    ult = g_last[col].mean()
+
+    prev = g[g["data"] < last_day]
+    if not prev.empty:
+        prev_day = prev["data"].max()
+        d1 = prev[prev["data"] == prev_day][col].mean()
+        var_d1 = (ult / d1 - 1.0) * 100 if d1 != 0 else np.nan
+    else:
+        d1 = np.nan
+        var_d1 = np.nan
+
+    media_30 = g.tail(30)[col].mean()
+    max_p = g[col].max()
+    min_p = g[col].min()
+
+    return {
+        "ultimo": ult,
+        "var_d1": var_d1,
+        "media_30": media_30,
+        "max": max_p,
+        "min": min_p,
+        "data_ult": last_day.date()
+    }
+
+
+@cached_stage()
+def kpis(filtros: tuple, col: str):
+    """KPIs — sempre com base DIÁRIA real."""
+    return kpi_metrics_daily(exact_prices(load_data(filtros)), col)
+
+
+# ===================== Gráficos =====================
+def zoom_filtros(filtros: tuple, zoom: tuple | None) -> tuple:
+    """
+    Filtros dos gráficos com o intervalo do zoom no lugar do período: a
+    janela é consultada de novo na origem, então um zoom curto volta a
+    caber em CHART_MAX_POINTS e é desenhado em resolução total.
+    """
+    if not zoom:
+        return filtros
+    source_key, versao, din, dfi, commodities, regioes = filtros
+    zin, zfi = max(zoom[0], din), min(zoom[1], dfi)
+    return (source_key, versao, zin, zfi, commodities, regioes)
+
+
+def _reduce(df: pd.DataFrame, y: str, by) -> pd.DataFrame:
+    """Limita os pontos de cada traço; períodos curtos seguem em resolução total."""
+    return downsample(df, "data", y, by=by, max_points=CHART_MAX_POINTS, method=CHART_METHOD)
+
+
+@cached_stage()
+def fig_tendencia(filtros: tuple, freq: str, col: str):
+    plot_df = load_series(filtros, freq).sort_values("data")
+    if plot_df.empty:
+        return None
+    plot_df = _reduce(plot_df, col, ["commodity", "regiao"])
+    fig = px.line(
+        plot_df,
+        x="data",
+        y=col,
+        color="commodity",
+        line_dash="regiao",
+        labels={"data": "Data", col: f"Preço ({MOEDAS[col]})", "commodity": "Commodity", "regiao": "Região"},
+    )
+    fig.update_traces(hovertemplate=HOVER)
+    fig.update_xaxes(rangeslider_visible=False)
+    return fig
+
+
+@cached_stage()
+def fig_comparacao(filtros: tuple, freq: str, col: str):
+    dff = load_series(filtros, freq)
+    if dff.empty:
+        return None
+    cmp = dff.groupby(["data", "commodity"], as_index=False, observed=True)[col].mean()
+    cmp = _reduce(cmp.sort_values("data"), col, ["commodity"])
+    fig = px.line(
+        cmp,
+        x="data",
+        y=col,
+        color="commodity",
+        labels={"data": "Data", col: f"Preço Médio ({MOEDAS[col]})", "commodity": "Commodity"},
+    )
+    fig.update_traces(hovertemplate=HOVER)
+    fig.update_xaxes(rangeslider_visible=False)
+    return fig
+
+
+@cached_stage()
+def commodities_disponiveis(filtros: tuple, freq: str) -> list[str]:
+    return sorted(load_series(filtros, freq)["commodity"].unique().tolist())
+
+
+@cached_stage()
+def fig_brl_usd(filtros: tuple, freq: str, commodity: str):
+    dff = load_series(filtros, freq)
+    base = dff[dff["commodity"] == commodity]
+    if base.empty:
+        return None
+    g3 = base.groupby("data", as_index=False).agg({
+        "valor_brl": "mean",
+        "valor_usd": "mean"
+    })
+    long = g3.melt(id_vars="data", var_name="moeda", value_name="preco")
+    long["moeda"] = long["moeda"].map(MOEDAS)
+    long = _reduce(long.sort_values("data", kind="stable"), "preco", ["moeda"])
+
+    fig = px.line(
+        long,
+        x="data",
+        y="preco",
+        color="moeda",
+        labels={"data": "Data", "preco": "Preço", "moeda": "Moeda"},
+    )
+    fig.update_traces(hovertemplate=HOVER)
+    fig.update_xaxes(rangeslider_visible=False)
+    return fig
+
+
+# ===================== Tabela =====================
+TABLE_COLUMNS = ["Data", "Data Formatada", "Commodity", "Região", "Preço (R$)", "Preço (US$)"]
+
+
+@cached_stage()
+def table_frame(filtros: tuple, freq: str) -> pd.DataFrame:
+    """Base da tabela, ainda numérica: mais recente primeiro."""
+    dff = load_series(filtros, freq)
+    return dff.sort_values(["data", "commodity", "regiao"], ascending=[False, True, True], ignore_index=True)
+
+
+def table_pages(filtros: tuple, freq: str, page_size: int = TABLE_PAGE_SIZE) -> int:
+    return max(1, -(-len(table_frame(filtros, freq)) // page_size))
+
+
+@cached_stage()
+def table_page(filtros: tuple, freq: str, page: int, page_size: int = TABLE_PAGE_SIZE) -> pd.DataFrame:
+    """Só a página exibida é formatada (pt-BR, vetorizado)."""
+    base = table_frame(filtros, freq)
+    part = base.iloc[(page - 1) * page_size: page * page_size]
+    return pd.DataFrame({
+        "Data": part["data"].to_numpy(),
+        "Data Formatada": period_labels(part["data"], freq),
+        "Commodity": part["commodity"].to_numpy(),
+        "Região": part["regiao"].to_numpy(),
+        "Preço (R$)": brl_array(part["valor_brl"]),
+        "Preço (US$)": brl_array(part["valor_usd"]),
+    }, columns=TABLE_COLUMNS)
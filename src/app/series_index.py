@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+"""
+Índice em memória das séries CEPEA
+
+Guarda, por (commodity, regiao), o vetor de datas ordenado (datetime64) e os
+vetores de preço correspondentes. O filtro de período vira duas buscas
+binárias (np.searchsorted) por série selecionada: O(log n + k), sem criar
+objetos Python por linha nem varrer o histórico inteiro com isin.
+
+As fatias saem na representação canônica do dashboard: commodity/regiao
+categóricas (montadas direto dos códigos) e preços no dtype original.
+"""
+
+import numpy as np
+import pandas as pd
+
+PRICE_COLUMNS = ("valor_brl", "valor_usd")
+ONE_DAY = np.timedelta64(1, "D")
+
+
+class SeriesIndex:
+    def __init__(self, df: pd.DataFrame, cols=PRICE_COLUMNS):
+        self.cols = tuple(cols)
+        self.series: dict[tuple[str, str], tuple[np.ndarray, dict[str, np.ndarray]]] = {}
+        self.dtypes = {col: df[col].dtype for col in self.cols}
+        df = df.sort_values(["commodity", "regiao", "data"], kind="stable")
+        for (c, r), g in df.groupby(["commodity", "regiao"], sort=True, observed=True):
+            dates = g["data"].to_numpy(dtype="datetime64[ns]")
+            self.series[(str(c), str(r))] = (dates, {col: g[col].to_numpy() for col in self.cols})
+
+    def __len__(self) -> int:
+        return sum(len(d) for d, _ in self.series.values())
+
+    @property
+    def commodities(self) -> list[str]:
+        return sorted({c for c, _ in self.series})
+
+    @property
+    def regioes(self) -> list[str]:
+        return sorted({r for _, r in self.series})
+
+    @property
+    def period(self) -> tuple[pd.Timestamp, pd.Timestamp]:
+        firsts = [d[0] for d, _ in self.series.values() if len(d)]
+        lasts = [d[-1] for d, _ in self.series.values() if len(d)]
+        return pd.Timestamp(min(firsts)), pd.Timestamp(max(lasts))
+
+    def slice(self, din, dfi, commodities, regioes, cols=None) -> pd.DataFrame:
+        """Linhas com din <= data <= dfi das séries selecionadas, ordenadas por data."""
+        cols = tuple(cols or self.cols)
+        lo = np.datetime64(pd.Timestamp(din), "ns")
+        hi = np.datetime64(pd.Timestamp(dfi), "ns") + ONE_DAY  # dfi inclusivo
+        commodities, regioes = set(commodities), set(regioes)
+
+        parts = []
+        for (c, r), (dates, values) in self.series.items():
+            if c not in commodities or r not in regioes:
+                continue
+            i, j = np.searchsorted(dates, [lo, hi], side="left")
+            if j > i:
+                parts.append((c, r, dates[i:j], {col: values[col][i:j] for col in cols}))
+
+        commodity_cats, regiao_cats = self.commodities, self.regioes
+        if not parts:
+            return pd.DataFrame({"data": pd.Series(dtype="datetime64[ns]"),
+                                 "commodity": pd.Categorical([], categories=commodity_cats),
+                                 "regiao": pd.Categorical([], categories=regiao_cats),
+                                 **{col: pd.Series(dtype=self.dtypes[col]) for col in cols}})
+
+        sizes = [len(d) for _, _, d, _ in parts]
+        c_codes = np.repeat([commodity_cats.index(c) for c, _, _, _ in parts], sizes)
+        r_codes = np.repeat([regiao_cats.index(r) for _, r, _, _ in parts], sizes)
+        out = pd.DataFrame({
+            "data": np.concatenate([d for _, _, d, _ in parts]),
+            "commodity": pd.Categorical.from_codes(c_codes, categories=commodity_cats),
+            "regiao": pd.Categorical.from_codes(r_codes, categories=regiao_cats),
+            **{col: np.concatenate([v[col] for _, _, _, v in parts]) for col in cols},
+        })
+        # Cada fatia já está ordenada; o sort estável só intercala as séries (k linhas)
+        return out.sort_values("data", kind="stable", ignore_index=True)
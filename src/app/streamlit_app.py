@@ -1,17 +1,36 @@
 # -*- coding: utf-8 -*-
 import os
+import sys
 from pathlib import Path
 from datetime import date, timedelta
 import base64
-import mimetypes
-import re
-import hashlib
 
-import numpy as np
-import pandas as pd
-import plotly.express as px
 import streamlit as st
 
+ROOT = Path(__file__).resolve().parents[2]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from src.app.pipeline import (  # noqa: E402
+    cache_stats,
+    commodities_disponiveis,
+    data_source,
+    data_version,
+    fig_brl_usd,
+    fig_comparacao,
+    fig_tendencia,
+    kpis,
+    load_meta,
+    load_series,
+    table_frame,
+    table_page,
+    table_pages,
+    zoom_filtros,
+)
+from src.app.attachments import AttachmentStore, guess_mime  # noqa: E402
+from src.app.export import FORMATS, available_formats, export_bytes  # noqa: E402
+from src.app.formatting import fmt_brl, fmt_int, fmt_pct  # noqa: E402
+
 # =========================================================
 # CONFIGURAÇÃO DO APP
 # =========================================================
@@ -25,134 +44,67 @@ st.title("🌾 Indicadores CEPEA — Milho & Soja")
 st.caption("Inteligência de Mercado para Decisão Estratégica no Agronegócio")
 
 # =========================================================
-# LOCALIZAÇÃO DO CSV CURATED
+# ANEXOS (blobs por SHA-256 em disco; a sessão guarda só metadados)
 # =========================================================
-ROOT = Path(__file__).resolve().parents[2]
-CURATED_PATH = ROOT / "data" / "curated" / "cepea" / "cepea_curated.csv"
-ATTACHMENTS_DIR = ROOT / "data" / "attachments"
-# Limpa anexos em disco para evitar duplicações históricas
-try:
-    if ATTACHMENTS_DIR.exists():
-        for _p in ATTACHMENTS_DIR.glob("*"):
-            if _p.is_file():
-                _p.unlink(missing_ok=True)
-    else:
-        ATTACHMENTS_DIR.mkdir(parents=True, exist_ok=True)
-except Exception:
-    pass
-
-# =============================
-# Anexos: utilitários
-# =============================
-def _safe_filename(name: str) -> str:
-    name = name.strip().replace("\\", "/").split("/")[-1]
-    safe = re.sub(r"[^A-Za-z0-9._-]+", "_", name)
-    return safe[:150] if len(safe) > 150 else safe
-
-def _guess_mime(path: Path) -> str:
-    mt, _ = mimetypes.guess_type(str(path))
-    return mt or "application/octet-stream"
-
-def save_uploaded_files(files) -> list[dict]:
-    saved = []
-    for f in files:
-        fname = _safe_filename(f.name)
-        dest = ATTACHMENTS_DIR / fname
-        if dest.exists():
-            stem, ext = dest.stem, dest.suffix
-            i = 1
-            while (ATTACHMENTS_DIR / f"{stem}_{i}{ext}").exists():
-                i += 1
-            dest = ATTACHMENTS_DIR / f"{stem}_{i}{ext}"
-        dest.write_bytes(f.getbuffer())
-        saved.append({
-            "name": dest.name,
-            "path": str(dest),
-            "mime": _guess_mime(dest),
-            "size": dest.stat().st_size,
-        })
-    return saved
-
-def list_attachments() -> list[dict]:
-    items = []
-    for p in sorted(ATTACHMENTS_DIR.glob("*")):
-        if p.is_file():
-            items.append({
-                "name": p.name,
-                "path": str(p),
-                "mime": _guess_mime(p),
-                "size": p.stat().st_size,
-            })
-    return items
+@st.cache_resource(show_spinner=False)
+def attachment_store() -> AttachmentStore:
+    return AttachmentStore()
 
 def render_attachments(items: list[dict]):
     if not items:
         st.info("Nenhum anexo disponível.")
         return
     st.subheader("📁 Anexos do Projeto")
+    store = attachment_store()
     for it in items:
         mime = it.get("mime")
         size_mb = it["size"] / (1024 * 1024)
         with st.expander(f"📎 {it['name']} — {mime} — {size_mb:.1f} MB", expanded=False):
-            if "bytes" in it:
-                data_bytes = it["bytes"]
-            else:
-                # fallback para compatibilidade antiga
-                p = Path(it.get("path", ""))
-                data_bytes = p.read_bytes() if p.is_file() else b""
-            if mime and mime.startswith("image/"):
-                st.image(data_bytes, use_column_width=True)
-            elif mime and mime.startswith("audio/"):
-                st.audio(data_bytes, format=mime)
-            elif mime and mime.startswith("video/"):
-                st.video(data_bytes, format=mime)
-            elif mime == "application/pdf":
-                if it["size"] <= 8 * 1024 * 1024:
-                    b64 = base64.b64encode(data_bytes).decode("utf-8")
-                    html = f"""
-                    <iframe src='data:application/pdf;base64,{b64}' width='100%' height='700' style='border:1px solid #ddd;border-radius:6px;'></iframe>
-                    """
-                    st.components.v1.html(html, height=720)
+            if not store.exists(it["hash"]):
+                st.warning("Anexo removido do armazenamento (limite de espaço). Envie novamente.")
+                continue
+            # Bytes lidos do disco só quando o usuário pede a pré-visualização
+            if st.toggle("Pré-visualizar", key=f"preview_{it['hash']}"):
+                data_bytes = store.read(it["hash"]) or b""
+                if mime and mime.startswith("image/"):
+                    st.image(data_bytes, use_column_width=True)
+                elif mime and mime.startswith("audio/"):
+                    st.audio(data_bytes, format=mime)
+                elif mime and mime.startswith("video/"):
+                    st.video(data_bytes, format=mime)
+                elif mime == "application/pdf":
+                    if it["size"] <= 8 * 1024 * 1024:
+                        b64 = base64.b64encode(data_bytes).decode("utf-8")
+                        html = f"""
+                        <iframe src='data:application/pdf;base64,{b64}' width='100%' height='700' style='border:1px solid #ddd;border-radius:6px;'></iframe>
+                        """
+                        st.components.v1.html(html, height=720)
+                    else:
+                        st.warning("PDF grande para pré-visualização. Utilize o botão de download.")
                 else:
-                    st.warning("PDF grande para pré-visualização. Utilize o botão de download.")
-            else:
-                st.write("Pré-visualização não suportada. Faça o download abaixo.")
+                    st.write("Pré-visualização não suportada. Faça o download abaixo.")
             st.download_button(
                 label="⬇️ Baixar",
-                data=data_bytes,
+                data=lambda h=it["hash"]: store.read(h) or b"",
                 file_name=it["name"],
-                mime=mime or "application/octet-stream"
+                mime=mime or "application/octet-stream",
+                key=f"download_{it['hash']}",
+                on_click="ignore",
             )
 
 # =========================================================
 # FUNÇÃO PARA CARREGAR DADOS
 # =========================================================
-@st.cache_data(show_spinner=True)
-def load_data():
-    df = pd.read_csv(CURATED_PATH, encoding="utf-8")
-
-    # normalização e ordenação
-    df.columns = [c.lower().strip() for c in df.columns]
-    df["data"] = pd.to_datetime(df["data"], errors="coerce")
-    df = df.dropna(subset=["data"])
-    df = df.sort_values("data")
-
-    df["regiao"] = df["regiao"].astype(str)
-    df["commodity"] = df["commodity"].astype(str)
-    
-    # Substitui siglas por nomes completos
-    df["regiao"] = df["regiao"].replace({"PR": "PARANÁ", "PRG": "PARANAGUÁ"})
-
-    return df.reset_index(drop=True)
-
-df = load_data()
+source = data_source()
+versao = data_version(source.key)
+meta = load_meta(source.key, versao)
 
 # =========================================================
 # SIDEBAR – FILTROS
 # =========================================================
 st.sidebar.header("Filtros")
 
-# Upload de anexos (somente sessão; não salva em disco)
+# Upload de anexos (conteúdo em disco, endereçado por hash; sessão guarda metadados)
 uploaded = st.sidebar.file_uploader(
     "Anexar arquivos (PDF, áudio, vídeo, imagens, Office)",
     type=[
@@ -162,29 +114,30 @@ uploaded = st.sidebar.file_uploader(
         "png","jpg","jpeg","gif","webp","bmp","tif","tiff",
     ],
     accept_multiple_files=True,
-    help="Os arquivos ficam apenas nesta sessão (não são salvos no disco)"
+    help="Arquivos idênticos são armazenados uma única vez; os menos usados são descartados ao atingir o limite de espaço"
 )
 
-# Sessão: mantém anexos em memória e evita duplicatas
-ss_key = "attachments_mem"
+# Sessão: só metadados dos anexos (nome, mime, tamanho, hash)
+ss_key = "attachments_meta"
 if ss_key not in st.session_state:
     st.session_state[ss_key] = []
+    st.session_state["attachments_seen"] = set()  # file_ids do uploader já gravados
 
 if uploaded:
     current = st.session_state[ss_key]
-    existing_hashes = {it.get("hash") for it in current}
+    seen = st.session_state["attachments_seen"]
+    existing_hashes = {it["hash"] for it in current}
     added = 0
     for f in uploaded:
-        data_bytes = f.getvalue()
-        file_hash = hashlib.sha256(data_bytes).hexdigest()
+        if f.file_id in seen:
+            continue
+        seen.add(f.file_id)
+        file_hash, size = attachment_store().put(f)
         if file_hash in existing_hashes:
             continue
-        size = len(data_bytes)
-        mime, _ = mimetypes.guess_type(f.name)
         current.append({
             "name": f.name,
-            "bytes": data_bytes,
-            "mime": mime or getattr(f, "type", None) or "application/octet-stream",
+            "mime": guess_mime(f.name, getattr(f, "type", None)),
             "size": size,
             "hash": file_hash,
         })
@@ -198,7 +151,10 @@ if st.sidebar.button("🧹 Limpar anexos desta sessão", use_container_width=Tru
     st.sidebar.info("Anexos da sessão removidos.")
 
 # intervalo real do dataset
-min_d, max_d = df["data"].min().date(), df["data"].max().date()
+min_d, max_d = meta["min"], meta["max"]
+if min_d is None:
+    st.warning("Nenhum preço carregado ainda. Rode o ETL (src/etl/cepea_etl.py) e recarregue a página.")
+    st.stop()
 # Define período padrão: início = menor data do dataset (13/03/2006)
 default_ini = min_d  # Sempre começa da menor data disponível
 
@@ -216,11 +172,11 @@ else:
     din, dfi = min_d, max_d
 
 # commodities filtráveis
-commodities = sorted(df["commodity"].unique().tolist())
+commodities = meta["commodities"]
 sel_commodities = st.sidebar.multiselect("Commodity", commodities, default=commodities)
 
 # regiões filtráveis
-regioes = sorted(df["regiao"].unique().tolist())
+regioes = meta["regioes"]
 sel_regioes = st.sidebar.multiselect("Região", regioes, default=regioes)
 
 # seleção da moeda
@@ -230,111 +186,47 @@ col_valor = "valor_brl" if moeda.startswith("R$") else "valor_usd"
 # periodicidade (granularidade)
 freq = st.sidebar.selectbox("Periodicidade", ["Diária", "Semanal", "Mensal"], index=0)
 
-# aplica filtros
-mask = (
-    (df["data"].dt.date >= din) &
-    (df["data"].dt.date <= dfi) &
-    (df["commodity"].isin(sel_commodities)) &
-    (df["regiao"].isin(sel_regioes))
-)
-dff_daily = df.loc[mask].copy()
+# aplica filtros (na origem); cada estágio abaixo é memoizado pelas
+# entradas que usa — widgets não relacionados não disparam recálculo
+filtros = (source.key, versao, din, dfi, tuple(sorted(sel_commodities)), tuple(sorted(sel_regioes)))
+
 # =========================================================
 # KPI's — sempre com base DIÁRIA real
 # =========================================================
-def kpi_metrics_daily(_df: pd.DataFrame, col: str):
-    if _df.empty:
-        return None
-
-    g = _df.sort_values("data")
-
-    last_day = g["data"].max()
-    g_last = g[g["data"] == last_day]
-    ult = g_last[col].mean()
-
-    prev = g[g["data"] < last_day]
-    if not prev.empty:
-        prev_day = prev["data"].max()
-        d1 = prev[prev["data"] == prev_day][col].mean()
-        var_d1 = (ult / d1 - 1.0) * 100 if d1 != 0 else np.nan
-    else:
-        d1 = np.nan
-        var_d1 = np.nan
-
-    media_30 = g.tail(30)[col].mean()
-    max_p = g[col].max()
-    min_p = g[col].min()
-
-    return {
-        "ultimo": ult,
-        "var_d1": var_d1,
-        "media_30": media_30,
-        "max": max_p,
-        "min": min_p,
-        "data_ult": last_day.date()
-    }
-
 col1, col2, col3, col4, col5 = st.columns(5)
-kpi = kpi_metrics_daily(dff_daily, col_valor)
+kpi = kpis(filtros, col_valor)
 if kpi:
-    col1.metric("Último Preço", f"{kpi['ultimo']:,.2f}".replace(",", "X").replace(".", ",").replace("X", "."))
-    col2.metric("Variação D-1 (%)", f"{kpi['var_d1']:,.2f}%".replace(",", "X").replace(".", ",").replace("X", "."))
-    col3.metric("Média 30 dias", f"{kpi['media_30']:,.2f}".replace(",", "X").replace(".", ",").replace("X", "."))
-    col4.metric("Máximo", f"{kpi['max']:,.2f}".replace(",", "X").replace(".", ",").replace("X", "."))
-    col5.metric("Mínimo", f"{kpi['min']:,.2f}".replace(",", "X").replace(".", ",").replace("X", "."))
+    col1.metric("Último Preço", fmt_brl(kpi['ultimo']))
+    col2.metric("Variação D-1 (%)", fmt_pct(kpi['var_d1']))
+    col3.metric("Média 30 dias", fmt_brl(kpi['media_30']))
+    col4.metric("Máximo", fmt_brl(kpi['max']))
+    col5.metric("Mínimo", fmt_brl(kpi['min']))
 
 st.write(f"**Período exibido:** {din} → {dfi} | **Moeda:** {moeda}")
-st.divider()
 
-# =========================================================
-# AGREGAÇÃO PARA GRÁFICOS (SEMANAL/MENSAL)
-# =========================================================
-def resample_mean(_df: pd.DataFrame, rule: str):
-    if _df.empty:
-        return _df
-    out = []
-    for (c, r), g in _df.groupby(["commodity", "regiao"]):
-        g = g.sort_values("data").set_index("data")
-        # Reamostra mantendo todas as colunas necessárias
-        agg = g[["valor_brl", "valor_usd"]].resample(rule).mean().dropna()
-        agg = agg.reset_index()
-        agg["commodity"] = c
-        agg["regiao"] = r
-        out.append(agg)
-    return pd.concat(out, ignore_index=True) if out else _df
-
-if freq == "Semanal":
-    dff = resample_mean(dff_daily, "W")
-elif freq == "Mensal":
-    dff = resample_mean(dff_daily, "M")
-else:
-    dff = dff_daily.copy()
+# zoom dos gráficos: reconsulta só a janela escolhida (resolução total
+# quando couber), sem mudar KPIs, tabela e exportação
+zoom = None
+if din < dfi:
+    zoom = st.slider(
+        "Zoom dos gráficos",
+        min_value=din,
+        max_value=dfi,
+        value=(din, dfi),
+        format="DD/MM/YYYY",
+        key=f"zoom-{din}-{dfi}",
+    )
+filtros_graf = zoom_filtros(filtros, zoom)
+st.divider()
 
 # =========================================================
 # Gráfico 1 — Tendência Histórica
 # =========================================================
 st.subheader("Tendência Histórica (Linha)")
-if dff.empty:
+fig = fig_tendencia(filtros_graf, freq, col_valor)
+if fig is None:
     st.info("Nenhum dado para exibir no gráfico.")
 else:
-    plot_df = dff.copy().sort_values("data")
-
-    fig = px.line(
-        plot_df,
-        x="data",
-        y=col_valor,
-        color="commodity",
-        line_dash="regiao",
-        labels={"data": "Data", col_valor: f"Preço ({moeda})", "commodity": "Commodity", "regiao": "Região"},
-    )
-
-    fig.update_traces(
-    hovertemplate="<br>".join([
-        "Data: %{x|%d/%m/%Y}",
-        "Preço: %{y:.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
-    ])
-)
-
-    fig.update_xaxes(rangeslider_visible=False)
     st.plotly_chart(fig, use_container_width=True)
 
 st.divider()
@@ -343,24 +235,10 @@ st.divider()
 # Gráfico 2 — Comparação entre Commodities
 # =========================================================
 st.subheader("Comparação entre Commodities (Média por Data)")
-if dff.empty:
+fig2 = fig_comparacao(filtros_graf, freq, col_valor)
+if fig2 is None:
     st.info("Sem dados para comparação.")
 else:
-    cmp = dff.groupby(["data", "commodity"], as_index=False)[col_valor].mean()
-    fig2 = px.line(
-        cmp,
-        x="data",
-        y=col_valor,
-        color="commodity",
-        labels={"data": "Data", col_valor: f"Preço Médio ({moeda})", "commodity": "Commodity"},
-    )
-    fig2.update_traces(
-        hovertemplate="<br>".join([
-            "Data: %{x|%d/%m/%Y}",
-            "Preço: %{y:.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
-        ])
-    )
-    fig2.update_xaxes(rangeslider_visible=False)
     st.plotly_chart(fig2, use_container_width=True)
 
 st.divider()
@@ -369,84 +247,27 @@ st.divider()
 # Gráfico 3 — BRL x USD
 # =========================================================
 st.subheader("Preço em R&#36; × US&#36; (Média por Data)")
-if dff.empty:
+c_opts = commodities_disponiveis(filtros_graf, freq)
+if not c_opts:
     st.info("Sem dados.")
 else:
-    c_opts = sorted(dff["commodity"].unique().tolist())
     c_sel = st.selectbox("Escolha a Commodity", c_opts, index=0)
-
-    base = dff[dff["commodity"] == c_sel]
-    if not base.empty:
-        # Garante que temos as colunas necessárias
-        g3 = base.groupby("data", as_index=False).agg({
-            "valor_brl": "mean",
-            "valor_usd": "mean"
-        })
-        long = g3.melt(id_vars="data", var_name="moeda", value_name="preco")
-
-        long["moeda"] = long["moeda"].map({"valor_brl": "R$ (BRL)", "valor_usd": "US$ (USD)"})
-
-        fig3 = px.line(
-            long,
-            x="data",
-            y="preco",
-            color="moeda",
-            labels={"data": "Data", "preco": "Preço", "moeda": "Moeda"},
-        )
-        fig3.update_traces(
-            hovertemplate="<br>".join([
-                "Data: %{x|%d/%m/%Y}",
-                "Preço: %{y:.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
-            ])
-        )
-        fig3.update_xaxes(rangeslider_visible=False)
+    fig3 = fig_brl_usd(filtros_graf, freq, c_sel)
+    if fig3 is not None:
         st.plotly_chart(fig3, use_container_width=True)
 
 st.divider()
 # =========================================================
 # TABELA + DOWNLOAD
 # =========================================================
-
-# Função para formatar moeda pt-BR
-def fmt_brl(x: float):
-    if pd.isna(x):
-        return ""
-    return f"{x:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
-
-# Mês abreviado (pt-BR)
-PT_BR_MONTH_ABBR = ["Jan","Fev","Mar","Abr","Mai","Jun","Jul","Ago","Set","Out","Nov","Dez"]
-
-def semana_label(dt: pd.Timestamp):
-    n_sem = 1 + (dt.day - 1) // 7
-    mes_lbl = PT_BR_MONTH_ABBR[dt.month - 1]
-    return f"{n_sem}ª semana {mes_lbl}/{dt.year}"
-
-def data_display_column(df_in: pd.DataFrame, freq: str):
-    if freq == "Diária":
-        return df_in["data"].dt.strftime("%d/%m/%Y")
-    elif freq == "Semanal":
-        return df_in["data"].apply(lambda d: semana_label(pd.to_datetime(d)))
-    else:
-        return df_in["data"].apply(lambda d: f"{PT_BR_MONTH_ABBR[pd.to_datetime(d).month-1]}/{pd.to_datetime(d).year}")
-
-# TABELA
 st.subheader("Tabela Segmentada por Período e Região")
-
-# Ordena em ordem decrescente (mais recente primeiro)
-table_base = dff.sort_values(["data","commodity","regiao"], ascending=[False, True, True]).copy()
-table_base["Data Formatada"] = data_display_column(table_base, freq)
-
-table_df = table_base.rename(columns={
-    "data": "Data",
-    "commodity": "Commodity",
-    "regiao": "Região",
-}).copy()
-
-table_df["Preço (R$)"] = table_base["valor_brl"].map(fmt_brl)
-table_df["Preço (US$)"] = table_base["valor_usd"].map(fmt_brl)
-
-# Seleciona colunas na ordem desejada, usando Data (datetime) e Data Formatada (string)
-table_df = table_df[["Data", "Data Formatada", "Commodity", "Região", "Preço (R$)", "Preço (US$)"]]
+# Paginação: só a página exibida é formatada e enviada ao navegador
+n_paginas = table_pages(filtros, freq)
+c_pag, c_info = st.columns([1, 4])
+pagina = c_pag.number_input("Página", min_value=1, max_value=n_paginas, value=1, step=1)
+c_info.caption(f"{fmt_int(len(table_frame(filtros, freq)))} linhas · página {pagina} de {n_paginas}")
+table_df = table_page(filtros, freq, int(pagina))
+dff = load_series(filtros, freq)
 
 st.dataframe(
     table_df,
@@ -467,31 +288,28 @@ st.dataframe(
     }
 )
 
-# DOWNLOAD CSV
-@st.cache_data
-def to_csv_bytes(_df: pd.DataFrame) -> bytes:
-    export_df = dff.sort_values(["data","commodity","regiao"]).rename(columns={
-        "data": "Data",
-        "commodity": "Commodity",
-        "regiao": "Região",
-        "valor_brl": "Preço (R$)",
-        "valor_usd": "Preço (US$)"
-    })
-    return export_df.to_csv(index=False, encoding="utf-8").encode("utf-8")
-
-st.download_button(
-    label="⬇️ Baixar CSV filtrado",
-    data=to_csv_bytes(dff),
-    file_name=f"cepea_filtrado_{date.today().isoformat()}.csv",
-    mime="text/csv"
+# DOWNLOAD — gerado só no clique, em blocos, e reaproveitado por filtro
+c_fmt, c_btn = st.columns([1, 3])
+formato = c_fmt.selectbox("Formato", available_formats(), index=0, label_visibility="collapsed")
+ext, mime = FORMATS[formato]
+c_btn.download_button(
+    label=f"⬇️ Baixar {formato} filtrado",
+    data=lambda: export_bytes(dff, (filtros, freq), formato),
+    file_name=f"cepea_filtrado_{date.today().isoformat()}{ext}",
+    mime=mime,
+    on_click="ignore",
 )
 
 # =============================
-# Seção de Anexos (somente sessão)
+# Seção de Anexos (metadados da sessão; conteúdo lido sob demanda)
 # =============================
 st.divider()
 render_attachments(st.session_state.get(ss_key, []))
 
+# Contadores do cache (após todos os estágios desta execução)
+with st.sidebar.expander("⚙️ Cache do dashboard", expanded=False):
+    st.dataframe(cache_stats(), hide_index=True, use_container_width=True)
+
 # =========================================================
 # Rodapé
 # =========================================================
@@ -0,0 +1,159 @@
+# -*- coding: utf-8 -*-
+"""
+Indicadores CEPEA pré-calculados (cepea_indicadores)
+
+Mantém, por (data, commodity, regiao), as métricas que o dashboard e as
+queries de negócio calculavam com funções de janela sobre toda a tabela:
+- variação D-1 (%)
+- médias móveis MM7 / MM30 / MM90
+- volatilidade 30 dias (desvio padrão móvel)
+- z-score sobre a janela de 90 pregões (média e desvio da MM90)
+- sinal de tendência MM7 × MM30 (UP / DOWN / FLAT)
+
+A atualização é incremental: para cada série só as datas posteriores ao
+último indicador gravado (ou a partir de `desde`, quando houver revisão de
+preços passados) são calculadas, lendo apenas os 89 pregões anteriores
+necessários para as janelas.
+"""
+
+import argparse
+import sys
+import time
+from datetime import date
+from pathlib import Path
+
+from sqlalchemy import text
+
+ROOT = Path(__file__).resolve().parents[2]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from src.db.cepea_load_postgres import get_engine  # noqa: E402
+
+LOOKBACK = 89  # pregões anteriores necessários para a MM90
+
+DDL = """
+    CREATE TABLE IF NOT EXISTS cepea_indicadores (
+        data             DATE        NOT NULL,
+        commodity        VARCHAR(20) NOT NULL,
+        regiao           VARCHAR(20) NOT NULL,
+        valor_brl        NUMERIC(12,4) NOT NULL,
+        valor_usd        NUMERIC(12,4) NOT NULL,
+        valor_brl_d1     NUMERIC(12,4),
+        variacao_pct_d1  NUMERIC(12,4),
+        mm7_brl          NUMERIC(12,4),
+        mm30_brl         NUMERIC(12,4),
+        mm90_brl         NUMERIC(12,4),
+        vol30_brl        NUMERIC(12,4),
+        zscore90_brl     NUMERIC(12,4),
+        sinal_tendencia  VARCHAR(4),
+        PRIMARY KEY (data, commodity, regiao),
+        FOREIGN KEY (data, commodity, regiao)
+            REFERENCES cepea_preco_diario (data, commodity, regiao) ON DELETE CASCADE
+    );
+"""
+
+REFRESH_SQL = f"""
+    WITH ultimos AS (
+        SELECT commodity, regiao, MAX(data) AS ult
+        FROM cepea_indicadores
+        GROUP BY commodity, regiao
+    ),
+    novas AS (  -- primeira data a (re)calcular por série
+        SELECT p.commodity, p.regiao, MIN(p.data) AS inicio
+        FROM cepea_preco_diario p
+        LEFT JOIN ultimos u USING (commodity, regiao)
+        WHERE u.ult IS NULL
+           OR p.data > u.ult
+           OR p.data >= CAST(:desde AS DATE)
+        GROUP BY p.commodity, p.regiao
+    ),
+    limites AS (  -- recua {LOOKBACK} pregões para fechar as janelas móveis
+        SELECT
+            n.commodity, n.regiao, n.inicio,
+            COALESCE((
+                SELECT q.data
+                FROM cepea_preco_diario q
+                WHERE q.commodity = n.commodity
+                  AND q.regiao = n.regiao
+                  AND q.data < n.inicio
+                ORDER BY q.data DESC
+                OFFSET {LOOKBACK - 1} LIMIT 1
+            ), '-infinity'::date) AS desde_janela
+        FROM novas n
+    ),
+    janela AS (
+        SELECT p.data, p.commodity, p.regiao, p.valor_brl, p.valor_usd, l.inicio
+        FROM cepea_preco_diario p
+        JOIN limites l USING (commodity, regiao)
+        WHERE p.data >= l.desde_janela
+    ),
+    calc AS (
+        SELECT
+            data, commodity, regiao, valor_brl, valor_usd, inicio,
+            LAG(valor_brl)    OVER w                                              AS valor_brl_d1,
+            AVG(valor_brl)    OVER (w ROWS BETWEEN 6  PRECEDING AND CURRENT ROW) AS mm7_brl,
+            AVG(valor_brl)    OVER (w ROWS BETWEEN 29 PRECEDING AND CURRENT ROW) AS mm30_brl,
+            AVG(valor_brl)    OVER (w ROWS BETWEEN 89 PRECEDING AND CURRENT ROW) AS mm90_brl,
+            STDDEV(valor_brl) OVER (w ROWS BETWEEN 29 PRECEDING AND CURRENT ROW) AS vol30_brl,
+            STDDEV(valor_brl) OVER (w ROWS BETWEEN 89 PRECEDING AND CURRENT ROW) AS vol90_brl
+        FROM janela
+        WINDOW w AS (PARTITION BY commodity, regiao ORDER BY data)
+    ),
+    upsert AS (
+        INSERT INTO cepea_indicadores AS t (
+            data, commodity, regiao, valor_brl, valor_usd,
+            valor_brl_d1, variacao_pct_d1, mm7_brl, mm30_brl, mm90_brl,
+            vol30_brl, zscore90_brl, sinal_tendencia
+        )
+        SELECT
+            data, commodity, regiao, valor_brl, valor_usd,
+            valor_brl_d1,
+            CASE WHEN valor_brl_d1 > 0 THEN (valor_brl / valor_brl_d1 - 1.0) * 100 END,
+            mm7_brl, mm30_brl, mm90_brl, vol30_brl,
+            (valor_brl - mm90_brl) / NULLIF(vol90_brl, 0),
+            CASE
+                WHEN mm7_brl > mm30_brl THEN 'UP'
+                WHEN mm7_brl < mm30_brl THEN 'DOWN'
+                ELSE 'FLAT'
+            END
+        FROM calc
+        WHERE data >= inicio
+        ON CONFLICT (data, commodity, regiao) DO UPDATE SET
+            valor_brl       = EXCLUDED.valor_brl,
+            valor_usd       = EXCLUDED.valor_usd,
+            valor_brl_d1    = EXCLUDED.valor_brl_d1,
+            variacao_pct_d1 = EXCLUDED.variacao_pct_d1,
+            mm7_brl         = EXCLUDED.mm7_brl,
+            mm30_brl        = EXCLUDED.mm30_brl,
+            mm90_brl        = EXCLUDED.mm90_brl,
+            vol30_brl       = EXCLUDED.vol30_brl,
+            zscore90_brl    = EXCLUDED.zscore90_brl,
+            sinal_tendencia = EXCLUDED.sinal_tendencia
+        RETURNING 1
+    )
+    SELECT COUNT(*) FROM upsert;
+"""
+
+
+def atualizar_indicadores(engine=None, desde: date | None = None) -> int:
+    """
+    Calcula os indicadores das datas ainda não processadas (ou a partir de
+    `desde`) e grava em cepea_indicadores. Retorna o nº de linhas gravadas.
+    """
+    engine = engine or get_engine()
+    t0 = time.perf_counter()
+    with engine.begin() as conn:
+        conn.execute(text(DDL))
+        linhas = conn.execute(text(REFRESH_SQL), {"desde": desde}).scalar_one()
+    print(f"[INFO] Indicadores atualizados: {linhas} linha(s) em {time.perf_counter() - t0:.2f}s")
+    return linhas
+
+
+# =====================
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--desde", type=date.fromisoformat, default=None,
+                        help="recalcula a partir desta data (AAAA-MM-DD)")
+    args = parser.parse_args()
+    atualizar_indicadores(desde=args.desde)
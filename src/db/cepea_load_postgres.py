@@ -1,31 +1,265 @@
-import psycopg2
-import pandas as pd
+# -*- coding: utf-8 -*-
+"""
+Carga CEPEA → PostgreSQL (bulk)
+
+Responsabilidades:
+- Ler o curated (cepea_curated.csv) ou receber um DataFrame pronto
+- Enviar as linhas via COPY FROM STDIN para uma tabela de staging temporária
+- Aplicar inserções, atualizações e remoções (coluna operacao: I/U/D,
+  vinda do diff do ETL; sem ela, tudo é upsert) num único statement
+  set-based em cepea_preco_diario
+- Registrar cada preço revisado ou removido em cepea_preco_revisao
+- Reportar linhas inseridas / atualizadas / removidas / ignoradas e
+  throughput da carga
+"""
+
+import argparse
+import io
+import sys
+import time
 from pathlib import Path
 
+import pandas as pd
+from sqlalchemy import create_engine
+
 ROOT = Path(__file__).resolve().parents[2]
-CURATED = ROOT / "data" / "curated" / "preco_diario_curated.csv"
-
-conn = psycopg2.connect(
-    host="localhost",
-    port=5432,
-    dbname="agromercantil",
-    user="postgres",
-    password="123456"
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from src.config import SETTINGS  # noqa: E402
+
+CURATED = ROOT / "data" / "curated" / "cepea" / "cepea_curated.csv"
+
+COLS = ["data", "commodity", "regiao", "valor_brl", "valor_usd"]
+CHUNK_ROWS = 50_000  # linhas serializadas por bloco no stream do COPY
+
+STAGING_DDL = """
+    CREATE TEMP TABLE stg_cepea_preco_diario (
+        data        DATE,
+        commodity   VARCHAR(20),
+        regiao      VARCHAR(20),
+        valor_brl   NUMERIC(12,4),
+        valor_usd   NUMERIC(12,4),
+        operacao    CHAR(1)
+    ) ON COMMIT DROP;
+"""
+
+# Histórico das revisões do CEPEA: valor anterior e novo de cada preço
+# corrigido (U) ou retirado da série (D)
+AUDIT_DDL = """
+    CREATE TABLE IF NOT EXISTS cepea_preco_revisao (
+        id             BIGSERIAL PRIMARY KEY,
+        data           DATE        NOT NULL,
+        commodity      VARCHAR(20) NOT NULL,
+        regiao         VARCHAR(20) NOT NULL,
+        operacao       CHAR(1)     NOT NULL,
+        valor_brl_ant  NUMERIC(12,4),
+        valor_usd_ant  NUMERIC(12,4),
+        valor_brl      NUMERIC(12,4),
+        valor_usd      NUMERIC(12,4),
+        execucao       TEXT,
+        detectado_em   TIMESTAMPTZ NOT NULL DEFAULT now()
+    )
+"""
+
+# comandos separados: cada execute envia um único comando
+AUDIT_INDEX_DDL = """
+    CREATE INDEX IF NOT EXISTS ix_cepea_preco_revisao_serie
+        ON cepea_preco_revisao (commodity, regiao, data)
+"""
+
+COPY_SQL = (
+    "COPY stg_cepea_preco_diario (data, commodity, regiao, valor_brl, valor_usd, operacao) "
+    "FROM STDIN WITH (FORMAT csv, NULL '')"
 )
 
-df = pd.read_csv(CURATED)
+# Um único statement: todas as CTEs veem o mesmo snapshot, então
+# "anteriores" lê os valores de antes do upsert/delete
+APPLY_SQL = """
+    WITH params AS (
+        SELECT %s::text AS execucao
+    ),
+    entrada AS (
+        SELECT DISTINCT ON (data, commodity, regiao)
+               data, commodity, regiao, valor_brl, valor_usd, COALESCE(operacao, 'U') AS operacao
+        FROM stg_cepea_preco_diario
+        WHERE data IS NOT NULL
+        ORDER BY data, commodity, regiao
+    ),
+    anteriores AS (
+        SELECT t.data, t.commodity, t.regiao, t.valor_brl, t.valor_usd
+        FROM cepea_preco_diario t
+        JOIN entrada e USING (data, commodity, regiao)
+        WHERE e.operacao <> 'D'
+    ),
+    removidas AS (
+        DELETE FROM cepea_preco_diario t
+        USING entrada e
+        WHERE e.operacao = 'D'
+          AND (t.data, t.commodity, t.regiao) = (e.data, e.commodity, e.regiao)
+        RETURNING t.data, t.commodity, t.regiao, t.valor_brl, t.valor_usd
+    ),
+    gravadas AS (
+        INSERT INTO cepea_preco_diario AS t (data, commodity, regiao, valor_brl, valor_usd)
+        SELECT data, commodity, regiao, valor_brl, valor_usd
+        FROM entrada
+        WHERE operacao <> 'D'
+          AND valor_brl IS NOT NULL
+          AND valor_usd IS NOT NULL
+        ON CONFLICT (data, commodity, regiao) DO UPDATE
+           SET valor_brl = EXCLUDED.valor_brl,
+               valor_usd = EXCLUDED.valor_usd
+         WHERE (t.valor_brl, t.valor_usd) IS DISTINCT FROM (EXCLUDED.valor_brl, EXCLUDED.valor_usd)
+        RETURNING t.data, t.commodity, t.regiao, t.valor_brl, t.valor_usd, (xmax = 0) AS inserido
+    ),
+    auditoria AS (
+        INSERT INTO cepea_preco_revisao
+               (data, commodity, regiao, operacao, valor_brl_ant, valor_usd_ant, valor_brl, valor_usd, execucao)
+        SELECT g.data, g.commodity, g.regiao, 'U', a.valor_brl, a.valor_usd, g.valor_brl, g.valor_usd, p.execucao
+        FROM gravadas g
+        JOIN anteriores a USING (data, commodity, regiao)
+        CROSS JOIN params p
+        WHERE NOT g.inserido
+        UNION ALL
+        SELECT r.data, r.commodity, r.regiao, 'D', r.valor_brl, r.valor_usd, NULL, NULL, p.execucao
+        FROM removidas r
+        CROSS JOIN params p
+    )
+    SELECT
+        (SELECT COUNT(*) FILTER (WHERE inserido)     FROM gravadas) AS inseridas,
+        (SELECT COUNT(*) FILTER (WHERE NOT inserido) FROM gravadas) AS atualizadas,
+        (SELECT COUNT(*) FROM removidas)                            AS removidas;
+"""
+
+
+# ===================== Helpers =====================
+class _CsvStream(io.RawIOBase):
+    """
+    File-like somente leitura que serializa o DataFrame em CSV sob demanda,
+    bloco a bloco, para alimentar o COPY sem materializar o arquivo inteiro.
+    """
+
+    def __init__(self, df: pd.DataFrame, chunk_rows: int = CHUNK_ROWS):
+        self._df = df
+        self._chunk_rows = chunk_rows
+        self._pos = 0
+        self._buf = b""
+
+    def readable(self) -> bool:
+        return True
+
+    def _next_chunk(self) -> bytes:
+        if self._pos >= len(self._df):
+            return b""
+        part = self._df.iloc[self._pos:self._pos + self._chunk_rows]
+        self._pos += self._chunk_rows
+        return part.to_csv(
+            index=False, header=False, date_format="%Y-%m-%d", float_format="%.4f"
+        ).encode("utf-8")
+
+    def read(self, size: int = -1) -> bytes:
+        if size is None or size < 0:
+            out = [self._buf] + list(iter(self._next_chunk, b""))
+            self._buf = b""
+            return b"".join(out)
+        while len(self._buf) < size:
+            chunk = self._next_chunk()
+            if not chunk:
+                break
+            self._buf += chunk
+        out, self._buf = self._buf[:size], self._buf[size:]
+        return out
+
+    def readinto(self, b) -> int:
+        """Usado pelo COPY do pg8000, que lê o stream em um buffer fixo."""
+        data = self.read(len(b))
+        b[:len(data)] = data
+        return len(data)
+
+
+def _copy_from(cursor, sql: str, stream: _CsvStream):
+    """COPY FROM STDIN independente do driver (psycopg2 ou pg8000)."""
+    if hasattr(cursor, "copy_expert"):  # psycopg2
+        cursor.copy_expert(sql, stream)
+    else:  # pg8000
+        cursor.execute(sql, stream=stream)
+
+
+def _prepare(df: pd.DataFrame) -> pd.DataFrame:
+    """Seleciona/ordena as colunas da staging e normaliza a data."""
+    out = df[COLS].copy()
+    out["data"] = pd.to_datetime(out["data"], errors="coerce")
+    out["operacao"] = df["operacao"] if "operacao" in df.columns else "U"
+    return out
+
+
+def get_engine():
+    return create_engine(SETTINGS.sqlalchemy_url, pool_pre_ping=True)
+
+
+# ===================== Carga =====================
+def carregar_precos(df: pd.DataFrame, engine=None, execucao: str | None = None) -> dict:
+    """
+    Carrega o DataFrame em cepea_preco_diario (COPY → staging → upsert e
+    delete). `execucao` (versão do manifesto) identifica as revisões na
+    auditoria. Retorna um dicionário com as estatísticas da carga.
+    """
+    engine = engine or get_engine()
+    df = _prepare(df)
+    total = len(df)
+
+    t0 = time.perf_counter()
+    raw = engine.raw_connection()
+    try:
+        cur = raw.cursor()
+        cur.execute(AUDIT_DDL)
+        cur.execute(AUDIT_INDEX_DDL)
+        cur.execute(STAGING_DDL)
+        _copy_from(cur, COPY_SQL, _CsvStream(df))
+        t_copy = time.perf_counter() - t0
+
+        cur.execute(APPLY_SQL, (execucao,))
+        inseridas, atualizadas, removidas = (int(n or 0) for n in cur.fetchone())
+        raw.commit()
+        cur.close()
+    except Exception:
+        raw.rollback()
+        raise
+    finally:
+        raw.close()
+
+    elapsed = time.perf_counter() - t0
+    stats = {
+        "linhas": total,
+        "inseridas": inseridas,
+        "atualizadas": atualizadas,
+        "removidas": removidas,
+        "ignoradas": total - inseridas - atualizadas - removidas,
+        "tempo_copy_s": round(t_copy, 3),
+        "tempo_total_s": round(elapsed, 3),
+        "linhas_por_s": round(total / elapsed, 1) if elapsed > 0 else None,
+    }
+    print(
+        f"[INFO] Carga: {stats['linhas']} linhas | inseridas={stats['inseridas']} "
+        f"atualizadas={stats['atualizadas']} removidas={stats['removidas']} ignoradas={stats['ignoradas']}"
+    )
+    print(
+        f"[INFO] Tempo: COPY {stats['tempo_copy_s']}s | total {stats['tempo_total_s']}s "
+        f"| {stats['linhas_por_s']} linhas/s"
+    )
+    return stats
 
-cursor = conn.cursor()
 
-for _, row in df.iterrows():
-    cursor.execute("""
-        INSERT INTO cepea_preco_diario (data, commodity, regiao, valor_brl, valor_usd)
-        VALUES (%s, %s, %s, %s, %s)
-        ON CONFLICT (data, commodity, regiao) DO NOTHING;
-    """, (row["data"], row["commodity"], row["regiao"], row["valor_brl"], row["valor_usd"]))
+def main(csv_path: Path = CURATED) -> dict:
+    df = pd.read_csv(csv_path, encoding="utf-8")
+    stats = carregar_precos(df)
+    print("\n✅ CARGA FINALIZADA COM SUCESSO NO POSTGRESQL!\n")
+    return stats
 
-conn.commit()
-cursor.close()
-conn.close()
 
-print("\n✅ CARGA FINALIZADA COM SUCESSO NO POSTGRESQL!\n")
\ No newline at end of file
+# =====================
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--csv", type=Path, default=CURATED)
+    args = parser.parse_args()
+    main(args.csv)
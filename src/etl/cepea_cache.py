@@ -0,0 +1,123 @@
+# -*- coding: utf-8 -*-
+"""
+Cache de parsing das planilhas CEPEA
+
+Cada planilha bruta é identificada pelo SHA-256 do seu conteúdo, junto com
+o leitor usado e PARSER_VERSION; o DataFrame normalizado (data, valor_brl,
+valor_usd) fica salvo em Parquet. Se o arquivo
+baixado for idêntico ao da execução anterior, o ETL reaproveita o resultado
+sem abrir o Excel. O tamanho total é limitado e os arquivos menos usados
+recentemente (mtime) são removidos primeiro.
+
+WarmParseCache mantém também os DataFrames em memória, para processos de
+longa duração (agendador) que reprocessam as mesmas planilhas.
+"""
+
+import hashlib
+import importlib.util
+import os
+from collections import OrderedDict
+from pathlib import Path
+
+import pandas as pd
+
+# pyarrow é necessário para to_parquet/read_parquet
+HAS_PARQUET = importlib.util.find_spec("pyarrow") is not None
+
+ROOT = Path(__file__).resolve().parents[2]
+CACHE_DIR = ROOT / os.getenv("ETL_CACHE_DIR", "data/cache/cepea")
+CACHE_MAX_MB = float(os.getenv("ETL_CACHE_MAX_MB", "256"))
+CACHE_MEMORY_ENTRIES = int(os.getenv("ETL_CACHE_MEMORY_ENTRIES", "32"))
+
+# Incrementar sempre que a saída de um leitor mudar (correção de parsing):
+# as entradas gravadas pela versão anterior deixam de ser usadas e saem
+# pelo descarte LRU
+PARSER_VERSION = 2
+
+
+def file_hash(path: Path, chunk_size: int = 1 << 20) -> str:
+    """SHA-256 do conteúdo do arquivo, lido em blocos."""
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(chunk_size), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def cache_key(digest: str, reader: str) -> str:
+    """Chave do cache: leitor + versão do parser + SHA-256 da planilha."""
+    return f"{reader}-v{PARSER_VERSION}-{digest}"
+
+
+class ParseCache:
+    def __init__(self, root: Path = CACHE_DIR, max_mb: float = CACHE_MAX_MB):
+        self.root = Path(root)
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self.enabled = HAS_PARQUET and self.max_bytes > 0
+        if self.enabled:
+            self.root.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, key: str) -> Path:
+        return self.root / f"{key}.parquet"
+
+    def get(self, key: str) -> pd.DataFrame | None:
+        if not self.enabled:
+            return None
+        path = self._path(key)
+        try:
+            df = pd.read_parquet(path)
+        except (FileNotFoundError, OSError, ValueError):
+            return None
+        os.utime(path)  # marca como usado recentemente (LRU)
+        return df
+
+    def put(self, key: str, df: pd.DataFrame):
+        if not self.enabled:
+            return
+        path = self._path(key)
+        tmp = path.with_suffix(".tmp")
+        df.to_parquet(tmp, index=False)
+        os.replace(tmp, path)
+        self._evict()
+
+    def _evict(self):
+        """Remove os arquivos menos usados até caber no limite."""
+        files = [(p, p.stat()) for p in self.root.glob("*.parquet")]
+        total = sum(st.st_size for _, st in files)
+        for p, st in sorted(files, key=lambda item: item[1].st_mtime):
+            if total <= self.max_bytes:
+                break
+            try:
+                p.unlink()
+                total -= st.st_size
+            except OSError:
+                pass
+
+
+class WarmParseCache(ParseCache):
+    """ParseCache com uma camada LRU em memória na frente do disco."""
+
+    def __init__(self, root: Path = CACHE_DIR, max_mb: float = CACHE_MAX_MB,
+                 max_entries: int = CACHE_MEMORY_ENTRIES):
+        super().__init__(root, max_mb)
+        self.max_entries = max_entries
+        self._memory: OrderedDict[str, pd.DataFrame] = OrderedDict()
+
+    def _remember(self, key: str, df: pd.DataFrame):
+        self._memory[key] = df
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def get(self, key: str) -> pd.DataFrame | None:
+        if key in self._memory:
+            self._memory.move_to_end(key)
+            return self._memory[key]
+        df = super().get(key)
+        if df is not None:
+            self._remember(key, df)
+        return df
+
+    def put(self, key: str, df: pd.DataFrame):
+        super().put(key, df)
+        self._remember(key, df)
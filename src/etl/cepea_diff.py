@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+"""
+Diff de revisões das séries CEPEA
+
+O CEPEA às vezes corrige preços passados, então o ETL incremental relê
+cada série inteira (planilhas inalteradas vêm do cache de parsing) e a
+compara com o snapshot publicado anteriormente (curated) por um merge
+vetorizado na chave (data, commodity, regiao):
+- I: chave nova
+- U: chave existente com valor_brl/valor_usd diferente (comparados em
+  centavos; NaN = NaN)
+- D: chave que sumiu da planilha de uma série relida
+Séries que não foram relidas nesta execução ficam intactas no snapshot.
+"""
+
+import numpy as np
+import pandas as pd
+
+KEYS = ["data", "commodity", "regiao"]
+VALUES = ["valor_brl", "valor_usd"]
+CHANGE_COLUMNS = [*KEYS, "operacao", *VALUES, "valor_brl_ant", "valor_usd_ant"]
+
+
+def _in_series(df: pd.DataFrame, series: pd.DataFrame) -> np.ndarray:
+    keys = df["commodity"].astype(str) + "|" + df["regiao"].astype(str)
+    wanted = series["commodity"].astype(str) + "|" + series["regiao"].astype(str)
+    return keys.isin(set(wanted)).to_numpy()
+
+
+def _cents(s: pd.Series) -> np.ndarray:
+    return np.round(s.to_numpy(dtype=np.float64) * 100)
+
+
+def _series_of(new: pd.DataFrame) -> pd.DataFrame:
+    return new[["commodity", "regiao"]].drop_duplicates()
+
+
+def diff(old: pd.DataFrame, new: pd.DataFrame, series: pd.DataFrame | None = None) -> pd.DataFrame:
+    """
+    Linhas alteradas entre o snapshot `old` e as séries relidas `new`, com
+    a coluna operacao (I/U/D) e os valores anteriores (*_ant). `series`
+    (commodity, regiao) delimita o que foi relido; padrão: as séries de `new`.
+    """
+    series = _series_of(new) if series is None else series
+    before = old.loc[_in_series(old, series), [*KEYS, *VALUES]]
+    m = before.merge(new[[*KEYS, *VALUES]], on=KEYS, how="outer", suffixes=("_ant", ""), indicator=True)
+
+    both = (m["_merge"] == "both").to_numpy()
+    changed = np.zeros(len(m), dtype=bool)
+    for col in VALUES:
+        a, b = _cents(m[f"{col}_ant"]), _cents(m[col])
+        changed |= ~((a == b) | (np.isnan(a) & np.isnan(b)))
+    op = np.select(
+        [(m["_merge"] == "right_only").to_numpy(), (m["_merge"] == "left_only").to_numpy(), both & changed],
+        ["I", "D", "U"],
+        default="",
+    )
+    out = m.assign(operacao=op)[op != ""]
+    return out[CHANGE_COLUMNS].sort_values(KEYS, ignore_index=True)
+
+
+def apply(old: pd.DataFrame, new: pd.DataFrame, series: pd.DataFrame | None = None) -> pd.DataFrame:
+    """Novo snapshot: séries relidas vêm de `new`, as demais continuam de `old`."""
+    series = _series_of(new) if series is None else series
+    kept = old.loc[~_in_series(old, series), [*KEYS, *VALUES]]
+    return pd.concat([kept, new[[*KEYS, *VALUES]]], ignore_index=True).sort_values(KEYS, ignore_index=True)
+
+
+def summarize(changes: pd.DataFrame) -> dict:
+    """Contagem por operação e por série (para logs e manifesto)."""
+    ops = {"I": "inseridas", "U": "atualizadas", "D": "removidas"}
+    total = changes["operacao"].value_counts()
+    resumo = {nome: int(total.get(op, 0)) for op, nome in ops.items()}
+    if not changes.empty:
+        por_serie = changes.groupby(
+            [changes["commodity"].astype(str) + "|" + changes["regiao"].astype(str), "operacao"]
+        ).size()
+        resumo["series"] = {
+            key: {ops[op]: int(n) for op, n in grupo.droplevel(0).items()}
+            for key, grupo in por_serie.groupby(level=0)
+        }
+        revisadas = changes.loc[changes["operacao"] != "I", "data"]
+        if not revisadas.empty:
+            resumo["revisado_desde"] = str(revisadas.min().date())
+    return resumo
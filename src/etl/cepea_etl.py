@@ -3,168 +3,522 @@
 ETL CEPEA — versão final
 
 Responsabilidades:
-- Ler arquivos .xlsx do scraper
+- Ler arquivos .xls/.xlsx do scraper (leitor em streaming ou pandas) de
+  todas as séries do registro series.toml, em paralelo
 - Padronizar colunas
 - Converter valores numéricos
 - Cortar histórico anterior a 13/03/2006
+- Validar a qualidade (duplicatas, nulos, câmbio, saltos, lacunas) e
+  gravar _quality_report.json; reprovação bloqueia gravação e carga
 - Exportar cepea_processed.csv e cepea_curated.csv
   com ponto decimal e 2 casas decimais
+- Exportar rollups semanal/mensal (cepea_semanal.csv, cepea_mensal.csv)
+- Exportar dataset Parquet tipado (particionado por commodity/regiao)
+  para leitura rápida no Streamlit
+- Gravar as saídas de forma atômica (temporário + os.replace) e publicar
+  _manifest.json (linhas, período, hashes das entradas, tempos)
+- Instrumentar cada etapa (--metrics): tempo, CPU, pico de RSS e linhas
+  em JSON lines, com dump opcional no formato do Prometheus
+- Modo incremental (--incremental): compara as séries com o snapshot
+  publicado (cepea_diff) e grava/carrega só as linhas novas, revisadas
+  pelo CEPEA ou removidas
 - Manter compatibilidade total com o Streamlit
 """
 
 import argparse
 import os
+import shutil
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 import pandas as pd
-from dotenv import load_dotenv
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.parquet as pq
+except ImportError:  # Parquet é opcional; o CSV continua sendo gerado
+    pa = None
 
 # ===================== Config =====================
 ROOT = Path(__file__).resolve().parents[2]
-RAW_DIR = ROOT / "data" / "raw" / "cepea"
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from src.etl import cepea_diff  # noqa: E402
+from src.etl.cepea_cache import ParseCache, cache_key, file_hash  # noqa: E402
+from src.etl.cepea_manifest import (  # noqa: E402
+    build_manifest,
+    publish,
+    temp_path,
+    write_manifest,
+)
+from src.etl.cepea_metrics import ETL_METRICS, ETL_METRICS_PROM, NULL_METRICS, Metrics  # noqa: E402
+from src.etl.cepea_quality import REPORT_PATH, QualityError, summarize, validate, write_report  # noqa: E402
+from src.etl.cepea_reader import read_streaming  # noqa: E402
+from src.etl.cepea_rollups import rollups  # noqa: E402
+from src.series_registry import RAW_DIR, load_series  # noqa: E402
+
 PROC_DIR = ROOT / "data" / "processed" / "cepea"
 CURATED_DIR = ROOT / "data" / "curated" / "cepea"
 
 PROC_DIR.mkdir(parents=True, exist_ok=True)
 CURATED_DIR.mkdir(parents=True, exist_ok=True)
 
-MILHO_DIR = RAW_DIR / "milho"
-SOJA_PARANA_DIR = RAW_DIR / "soja" / "parana"
-SOJA_PARANAGUA_DIR = RAW_DIR / "soja" / "paranagua"
-
 MIN_DATE = pd.to_datetime("2006-03-13")  # corte padronizado
 
+# Dataset colunar consumido pelo dashboard (CSV fica só como exportação)
+PARQUET_DIR = CURATED_DIR / "parquet"
+
+# Processos usados na leitura das planilhas (0/None = nº de CPUs)
+ETL_WORKERS = int(os.getenv("ETL_WORKERS", "0")) or None
+
+# Leitor das planilhas: "streaming" (uma passada, baixa memória) ou "pandas"
+ETL_READER = os.getenv("ETL_READER", "streaming")
+
+# Data quality: "block" (reprovação impede gravação/carga), "warn" ou "off"
+ETL_DQ = os.getenv("ETL_DQ", "block")
+
+EMPTY_COLUMNS = ["data","commodity","regiao","valor_brl","valor_usd"]
+
+# Coluna constante: só existe no CSV exportado (compatibilidade), não em memória
+FONTE = "CEPEA"
+
 # ===================== Helpers =====================
-def _read_folder(folder: Path, commodity: str, regiao: str) -> pd.DataFrame:
-    dfs = []
-    for xlsx in sorted(folder.glob("*.xlsx")):
-        df = pd.read_excel(
-            xlsx,
-            skiprows=3,
-            header=0,
-            sheet_name=0,
-            engine="openpyxl",
-            dtype={"Data": "string"}
+def _parse_file(xlsx: Path) -> pd.DataFrame:
+    """Planilha CEPEA → DataFrame normalizado (data, valor_brl, valor_usd)."""
+    df = pd.read_excel(
+        xlsx,
+        skiprows=3,
+        header=0,
+        sheet_name=0,
+        engine="xlrd" if xlsx.suffix.lower() == ".xls" else "openpyxl",
+        dtype={"Data": "string"}
+    )
+    df.columns = [c.strip() for c in df.columns]
+    df = df.rename(columns={
+        "Data": "data",
+        "À vista R$": "valor_brl",
+        "À vista US$": "valor_usd"
+    })
+    df["data"] = pd.to_datetime(df["data"], errors="coerce", dayfirst=True)
+
+    # Conversão melhorada para preservar decimais
+    # Se já vier como número do Excel, mantém; se vier como string, converte
+    if not pd.api.types.is_numeric_dtype(df["valor_brl"]):
+        df["valor_brl"] = (
+            df["valor_brl"].astype(str)
+            .str.replace(".", "", regex=False)
+            .str.replace(",", ".", regex=False)
         )
-        df.columns = [c.strip() for c in df.columns]
-        df = df.rename(columns={
-            "Data": "data",
-            "À vista R$": "valor_brl",
-            "À vista US$": "valor_usd"
-        })
-        df["data"] = pd.to_datetime(df["data"], errors="coerce", dayfirst=True)
-        
-        # Conversão melhorada para preservar decimais
-        # Se já vier como número do Excel, mantém; se vier como string, converte
-        if df["valor_brl"].dtype == 'object':
-            df["valor_brl"] = (
-                df["valor_brl"].astype(str)
-                .str.replace(".", "", regex=False)
-                .str.replace(",", ".", regex=False)
-            )
-        df["valor_brl"] = pd.to_numeric(df["valor_brl"], errors="coerce")
-        
-        if df["valor_usd"].dtype == 'object':
-            df["valor_usd"] = (
-                df["valor_usd"].astype(str)
-                .str.replace(".", "", regex=False)
-                .str.replace(",", ".", regex=False)
-            )
-        df["valor_usd"] = pd.to_numeric(df["valor_usd"], errors="coerce")
-        
-        # Arredonda explicitamente para 2 casas decimais mantendo precisão
-        df["valor_brl"] = df["valor_brl"].round(2)
-        df["valor_usd"] = df["valor_usd"].round(2)
-
-        df = df.dropna(subset=["data"]).copy()
-        df["commodity"] = commodity
-        df["regiao"] = regiao
-        df["__fonte__"] = "CEPEA"
-        dfs.append(df)
+    df["valor_brl"] = pd.to_numeric(df["valor_brl"], errors="coerce")
+
+    if not pd.api.types.is_numeric_dtype(df["valor_usd"]):
+        df["valor_usd"] = (
+            df["valor_usd"].astype(str)
+            .str.replace(".", "", regex=False)
+            .str.replace(",", ".", regex=False)
+        )
+    df["valor_usd"] = pd.to_numeric(df["valor_usd"], errors="coerce")
 
+    # Arredonda explicitamente para 2 casas decimais mantendo precisão
+    df["valor_brl"] = df["valor_brl"].round(2)
+    df["valor_usd"] = df["valor_usd"].round(2)
+
+    df = df.dropna(subset=["data"])
+    return df[["data", "valor_brl", "valor_usd"]].reset_index(drop=True)
+
+def _tag(df: pd.DataFrame, commodity: str, regiao: str) -> pd.DataFrame:
+    """Identifica a série."""
+    df = df.copy()
+    df["commodity"] = commodity
+    df["regiao"] = regiao
+    return df
+
+READERS = {"pandas": _parse_file, "streaming": read_streaming}
+
+def _timed_parse(xlsx: Path, reader: str = ETL_READER) -> tuple[pd.DataFrame, float, float]:
+    """Executado no processo filho: lê a planilha e mede o tempo e a CPU gastos."""
+    t0, cpu0 = time.perf_counter(), time.process_time()
+    df = READERS[reader](xlsx)
+    return df, time.perf_counter() - t0, time.process_time() - cpu0
+
+def _concat(dfs: list[pd.DataFrame]) -> pd.DataFrame:
     if not dfs:
-        return pd.DataFrame(columns=["data","commodity","regiao","valor_brl","valor_usd","__fonte__"])
+        return pd.DataFrame(columns=EMPTY_COLUMNS)
     return pd.concat(dfs, ignore_index=True)
 
-def _clean_csvs(dirpath: Path):
-    """Remove arquivos CSV antigos, ignorando se estiverem abertos"""
-    for f in dirpath.glob("*.csv"):
-        try:
-            f.unlink(missing_ok=True)
-        except PermissionError:
-            print(f"[AVISO] Arquivo {f.name} está em uso, será sobrescrito")
+def _relpath(xlsx: Path) -> str:
+    """Caminho relativo a data/raw/cepea (ou o absoluto, para pastas de fora)."""
+    return (xlsx.relative_to(RAW_DIR) if xlsx.is_relative_to(RAW_DIR) else xlsx).as_posix()
 
-# ===================== Pipeline =====================
-def main(to_postgres: bool):
-    df_milho = _read_folder(MILHO_DIR, "MILHO", "BRASIL")
-    df_soja_pr = _read_folder(SOJA_PARANA_DIR, "SOJA", "PR")
-    df_soja_prg = _read_folder(SOJA_PARANAGUA_DIR, "SOJA", "PRG")
+def _raw_files(folder: Path) -> list[Path]:
+    """Planilhas CEPEA da pasta: .xls (download direto) e .xlsx, indistintamente."""
+    return sorted(p for p in folder.glob("*.xls*") if p.suffix.lower() in (".xls", ".xlsx"))
 
-    df_all = pd.concat([df_milho, df_soja_pr, df_soja_prg], ignore_index=True)
-    df_all = df_all.dropna(subset=["data"]).sort_values(["data","commodity","regiao"])
+def _read_all(tasks: list[tuple], workers: int | None = ETL_WORKERS,
+              cache: ParseCache | None = None, reader: str = ETL_READER,
+              inputs: dict | None = None, metrics: Metrics = NULL_METRICS) -> pd.DataFrame:
+    """
+    Lê em paralelo (pool de processos) todas as planilhas de todas as séries.
+    tasks: lista de (pasta, commodity, regiao). workers=1 lê em série.
+    Planilhas já vistas (mesmo SHA-256, leitor e versão do parser) vêm do
+    cache, sem abrir o Excel.
+    inputs, se informado, recebe {arquivo: {sha256, bytes, linhas, tempo_s, cache}}
+    para o manifesto; metrics recebe um span por planilha parseada.
+    """
+    jobs = [
+        (xlsx, commodity, regiao)
+        for folder, commodity, regiao in tasks
+        for xlsx in _raw_files(folder)
+    ]
+    if not jobs:
+        return _concat([])
 
-    # CORTE
-    df_all = df_all[df_all["data"] >= MIN_DATE].reset_index(drop=True)
+    t0 = time.perf_counter()
+    with metrics.span("leitura.hash") as s:
+        keys = [file_hash(xlsx) for xlsx, *_ in jobs] if cache or inputs is not None else [None] * len(jobs)
+        s.linhas = len(jobs)
+    parsed = {}
+    for (xlsx, *_), key in zip(jobs, keys):
+        hit = cache.get(cache_key(key, reader)) if cache else None
+        if hit is not None:
+            parsed[xlsx] = hit
+            print(f"[CACHE] {_relpath(xlsx)}: inalterado ({len(hit)} linhas)")
 
-    _clean_csvs(PROC_DIR)
-    _clean_csvs(CURATED_DIR)
+    pending = [(xlsx, key) for (xlsx, *_), key in zip(jobs, keys) if xlsx not in parsed]
+    workers = min(workers or os.cpu_count() or 1, len(pending)) or 1
+    if len(pending) <= 1 or workers == 1:
+        results = [_timed_parse(xlsx, reader) for xlsx, _ in pending]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(_timed_parse, [xlsx for xlsx, _ in pending],
+                                    [reader] * len(pending)))
 
-    processed_path = PROC_DIR / "cepea_processed.csv"
-    curated_path = CURATED_DIR / "cepea_curated.csv"
+    elapsed_by_file = {}
+    serie = {xlsx: _series_key(commodity, regiao) for xlsx, commodity, regiao in jobs}
+    for (xlsx, key), (df, elapsed, cpu) in zip(pending, results):
+        parsed[xlsx] = df
+        elapsed_by_file[xlsx] = elapsed
+        if cache:
+            cache.put(cache_key(key, reader), df)
+        # rótulo pela série (o nome do arquivo muda a cada download)
+        metrics.record("leitura.arquivo", elapsed, cpu, len(df),
+                       labels={"serie": serie[xlsx], "leitor": reader},
+                       arquivo=_relpath(xlsx))
+        print(f"[TEMPO] {_relpath(xlsx)}: {elapsed:.2f}s ({len(df)} linhas)")
+    if inputs is not None:
+        for (xlsx, *_), key in zip(jobs, keys):
+            inputs[_relpath(xlsx)] = {
+                "sha256": key,
+                "bytes": xlsx.stat().st_size,
+                "linhas": len(parsed[xlsx]),
+                "tempo_s": round(elapsed_by_file.get(xlsx, 0.0), 3),
+                "cache": xlsx not in elapsed_by_file,
+            }
+    print(f"[TEMPO] Leitura de {len(jobs)} arquivo(s) ({len(pending)} parseado(s), "
+          f"{workers} processo(s)): {time.perf_counter() - t0:.2f}s")
+    with metrics.span("leitura.concat") as s:
+        df = _concat([
+            _tag(parsed[xlsx], commodity, regiao)
+            for xlsx, commodity, regiao in jobs
+        ])
+        s.linhas = len(df)
+    return df
+
+def _series_key(commodity: str, regiao: str) -> str:
+    return f"{commodity}|{regiao}"
+
+def _db_watermarks(engine=None) -> dict | None:
+    """
+    Última data por (commodity, regiao) em cepea_preco_diario. O que é
+    gravado vem do diff; o watermark só faz a carga alcançar datas que uma
+    execução anterior publicou nos arquivos sem conseguir carregar no banco.
+    None se o banco estiver indisponível.
+    """
+    from sqlalchemy import text
+    from src.db.cepea_load_postgres import get_engine
 
-    # Garante arredondamento final antes de salvar
-    df_all["valor_brl"] = df_all["valor_brl"].round(2)
-    df_all["valor_usd"] = df_all["valor_usd"].round(2)
-    
-    # Salva com formato decimal correto (ponto como separador, 2 casas)
     try:
-        df_all.to_csv(
-            processed_path, 
-            index=False, 
-            encoding="utf-8", 
-            float_format="%.2f",
-            decimal='.'  # Garante ponto como separador decimal
-        )
-        print(f"[OK] processed → {processed_path}")
-    except PermissionError:
-        # Se o arquivo estiver aberto, tenta salvar com novo nome
-        processed_path_temp = PROC_DIR / f"cepea_processed_{pd.Timestamp.now().strftime('%Y%m%d_%H%M%S')}.csv"
-        df_all.to_csv(
-            processed_path_temp, 
-            index=False, 
-            encoding="utf-8", 
-            float_format="%.2f",
-            decimal='.'
-        )
-        print(f"[AVISO] Arquivo original em uso, salvo como: {processed_path_temp}")
-    
+        with (engine or get_engine()).connect() as conn:
+            rows = conn.execute(text(
+                "SELECT commodity, regiao, MAX(data) FROM cepea_preco_diario GROUP BY commodity, regiao"
+            )).all()
+    except Exception as exc:
+        print(f"[AVISO] Banco indisponível ({exc.__class__.__name__}); carga só das mudanças do diff")
+        return None
+    print(f"[INFO] Watermarks lidos do PostgreSQL ({len(rows)} séries)")
+    return {_series_key(c, r): pd.Timestamp(d) for c, r, d in rows if d is not None}
+
+def _newer_than(df: pd.DataFrame, watermarks: dict) -> pd.DataFrame:
+    keys = df["commodity"].astype(str) + "|" + df["regiao"].astype(str)
+    limit = pd.to_datetime(keys.map(watermarks))
+    return df[limit.isna() | (df["data"] > limit)]
+
+def _pending_db(df_all: pd.DataFrame, changes: pd.DataFrame, watermarks: dict | None) -> pd.DataFrame:
+    """Mudanças do diff + datas que o banco ainda não tem (carga anterior que falhou)."""
+    if watermarks is None:
+        return changes
+    atrasadas = _newer_than(df_all, watermarks)
+    ja = atrasadas.set_index(cepea_diff.KEYS).index.isin(changes.set_index(cepea_diff.KEYS).index)
+    extra = atrasadas.loc[~ja, EMPTY_COLUMNS].assign(operacao="I")
+    return pd.concat([changes, extra], ignore_index=True) if not extra.empty else changes
+
+def _write_csv(df: pd.DataFrame, path: Path, append: bool = False, fonte: bool = True):
+    """
+    Grava (ou acrescenta) o CSV com ponto decimal e 2 casas, de forma
+    atômica: escreve um temporário (no append, cópia do atual + linhas novas)
+    e publica com os.replace.
+    """
+    append = append and path.exists()
+    if fonte:
+        df = df.assign(__fonte__=FONTE)
+    tmp = temp_path(path)
     try:
-        df_all.to_csv(
-            curated_path, 
-            index=False, 
-            encoding="utf-8", 
+        if append:
+            shutil.copyfile(path, tmp)
+        df.to_csv(
+            tmp,
+            mode="a" if append else "w",
+            header=not append,
+            index=False,
+            encoding="utf-8",
             float_format="%.2f",
             decimal='.'  # Garante ponto como separador decimal
         )
-        print(f"[OK] curated → {curated_path}")
-    except PermissionError:
-        # Se o arquivo estiver aberto, tenta salvar com novo nome
-        curated_path_temp = CURATED_DIR / f"cepea_curated_{pd.Timestamp.now().strftime('%Y%m%d_%H%M%S')}.csv"
-        df_all.to_csv(
-            curated_path_temp, 
-            index=False, 
-            encoding="utf-8", 
-            float_format="%.2f",
-            decimal='.'
+        publish(tmp, path)
+    finally:
+        tmp.unlink(missing_ok=True)
+    print(f"[OK] {'append' if append else 'write'} → {path}")
+
+def _write_parquet(df: pd.DataFrame, root: Path, append: bool = False):
+    """
+    Grava o dataset Parquet particionado por commodity/regiao:
+    data como date32, dimensões dictionary-encoded e preços decimal(12,2).
+    No modo incremental cada execução acrescenta um arquivo por partição.
+    """
+    if pa is None:
+        print("[AVISO] pyarrow não instalado — dataset Parquet não gerado")
+        return
+    price = pa.decimal128(12, 2)
+    table = pa.table({
+        "data": pa.array(df["data"].dt.date, type=pa.date32()),
+        "commodity": pa.array(df["commodity"].astype(str)).dictionary_encode(),
+        "regiao": pa.array(df["regiao"].astype(str)).dictionary_encode(),
+        "valor_brl": pc.round(pa.array(df["valor_brl"], type=pa.float64()), 2).cast(price),
+        "valor_usd": pc.round(pa.array(df["valor_usd"], type=pa.float64()), 2).cast(price),
+    })
+    stamp = pd.Timestamp.now().strftime("%Y%m%d%H%M%S")
+    staging = root.with_name(f".{root.name}.staging")
+    shutil.rmtree(staging, ignore_errors=True)
+    pq.write_to_dataset(
+        table,
+        staging,
+        partition_cols=["commodity", "regiao"],
+        basename_template=f"part-{stamp}-{{i}}.parquet",
+    )
+    if append and root.exists():
+        # Cada arquivo novo entra no dataset com um rename atômico
+        for part in sorted(staging.rglob("*.parquet")):
+            dest = root / part.relative_to(staging)
+            dest.parent.mkdir(parents=True, exist_ok=True)
+            publish(part, dest)
+        shutil.rmtree(staging, ignore_errors=True)
+    else:
+        # Carga completa: troca o diretório inteiro (sem partições órfãs)
+        old = root.with_name(f".{root.name}.old")
+        shutil.rmtree(old, ignore_errors=True)
+        if root.exists():
+            os.replace(root, old)
+        os.replace(staging, root)
+        shutil.rmtree(old, ignore_errors=True)
+    print(f"[OK] parquet → {root}")
+
+# ===================== Pipeline =====================
+# (pasta, commodity, regiao) de cada série ativa do registro
+SERIES = [(s.raw_dir, s.commodity, s.regiao) for s in load_series()]
+
+def main(to_postgres: bool, incremental: bool = False, workers: int | None = ETL_WORKERS,
+         use_cache: bool = True, reader: str = ETL_READER, dq: str = ETL_DQ,
+         metrics: Metrics = NULL_METRICS, cache: ParseCache | None = None, engine=None) -> dict | None:
+    """
+    Executa o ETL e retorna o manifesto publicado (None se nada mudou).
+    cache/engine permitem a um processo de longa duração (agendador)
+    reaproveitar planilhas já parseadas e o pool de conexões.
+    """
+    processed_path = PROC_DIR / "cepea_processed.csv"
+    curated_path = CURATED_DIR / "cepea_curated.csv"
+
+    # Sem saída anterior não há o que complementar: faz carga completa
+    incremental = incremental and curated_path.exists()
+    wm_db = _db_watermarks(engine) if incremental and to_postgres else None
+    modo = "incremental" if incremental else "completo"
+    t_inicio = time.perf_counter()
+    tempos, entradas = {}, {}
+
+    with metrics.span("leitura", modo=modo) as s:
+        # Sempre a série inteira: o diff precisa dela para achar revisões de
+        # datas passadas (planilhas inalteradas saem do cache por SHA-256)
+        df_all = _read_all(
+            SERIES,
+            workers=workers,
+            cache=(cache or ParseCache()) if use_cache else None,
+            reader=reader,
+            inputs=entradas,
+            metrics=metrics,
         )
-        print(f"[AVISO] Arquivo original em uso, salvo como: {curated_path_temp}")
+        s.linhas = len(df_all)
+    tempos["leitura"] = time.perf_counter() - t_inicio
+
+    with metrics.span("normalizacao", modo=modo) as s:
+        lidas = len(df_all)
+        df_all = df_all.dropna(subset=["data"]).sort_values(["data","commodity","regiao"])
+        sem_data = lidas - len(df_all)
+
+        # CORTE
+        df_all = df_all[df_all["data"] >= MIN_DATE].reset_index(drop=True)
+        descartadas = {"sem_data": sem_data, "antes_de_min_date": lidas - sem_data - len(df_all)}
+
+        # Garante arredondamento final antes de salvar
+        df_all["valor_brl"] = df_all["valor_brl"].round(2)
+        df_all["valor_usd"] = df_all["valor_usd"].round(2)
+        s.linhas = len(df_all)
+
+    # Diff contra o snapshot publicado: novas (I), revisadas (U) e removidas (D)
+    if incremental:
+        with metrics.span("diff") as s:
+            snapshot = pd.read_csv(curated_path, usecols=EMPTY_COLUMNS, parse_dates=["data"])
+            changes = cepea_diff.diff(snapshot, df_all)
+            s.linhas = len(changes)
+        revisoes = cepea_diff.summarize(changes)
+        print(
+            f"[DIFF] {revisoes['inseridas']} novas, {revisoes['atualizadas']} revisadas, "
+            f"{revisoes['removidas']} removidas"
+        )
+        pendentes = _pending_db(df_all, changes, wm_db) if to_postgres else changes
+        if pendentes.empty:
+            print("[INFO] Nenhuma alteração desde a última execução.")
+            metrics.finish()
+            return None
+
+    # Data quality: relatório sempre; checagens bloqueantes impedem gravação/carga
+    if dq != "off":
+        with metrics.span("validacao", modo=modo) as s:
+            report = validate(df_all, descartadas, modo=modo)
+            s.linhas = report["linhas"]
+        tempos["validacao"] = report["tempo_s"]
+        print(f"[OK] relatório de qualidade → {write_report(report)}")
+        summarize(report)
+        if report["status"] == "reprovado" and dq == "block":
+            metrics.finish()
+            raise QualityError(
+                f"Validação reprovada; nada foi gravado. Detalhes em {REPORT_PATH} "
+                "(use --dq warn para gravar mesmo assim)"
+            )
+
+    # Só datas novas: acrescenta aos arquivos; com revisão ou remoção, o
+    # snapshot é regravado inteiro (de forma atômica, como na carga completa)
+    if incremental:
+        # Mesma ordem de colunas do df_all (o append não reordena pelo cabeçalho)
+        base = cepea_diff.apply(snapshot, df_all)[df_all.columns]
+        append = not (changes["operacao"] != "I").any()
+        df_csv = changes.loc[changes["operacao"] == "I", df_all.columns] if append else base
+    else:
+        base, append, df_csv = df_all, False, df_all
+
+    # Salva com formato decimal correto (ponto como separador, 2 casas)
+    manifest = None
+    if not df_csv.empty:
+        t0 = time.perf_counter()
+        for path in (processed_path, curated_path):
+            with metrics.span("escrita.csv", arquivo=path.name) as s:
+                _write_csv(df_csv, path, append=append)
+                s.linhas = len(df_csv)
+        with metrics.span("escrita.parquet", arquivo=PARQUET_DIR.name) as s:
+            _write_parquet(df_csv, PARQUET_DIR, append=append)
+            s.linhas = len(df_csv)
+
+        # Rollups: a última semana/mês muda com cada dia novo, então são
+        # recalculados sobre o snapshot completo
+        with metrics.span("rollups") as s:
+            tabelas = rollups(base)
+            s.linhas = len(base)
+        saidas = {processed_path.name: len(base), curated_path.name: len(base), PARQUET_DIR.name: len(base)}
+        for nome, agg in tabelas.items():
+            rollup_path = CURATED_DIR / f"cepea_{nome.lower()}.csv"
+            with metrics.span("escrita.csv", arquivo=rollup_path.name) as s:
+                _write_csv(agg, rollup_path, fonte=False)
+                s.linhas = len(agg)
+            saidas[rollup_path.name] = len(agg)
+        tempos["escrita"] = time.perf_counter() - t0
+
+        # Manifesto por último: é o que sinaliza aos leitores que os dados mudaram
+        manifest = build_manifest(base, modo, entradas, saidas, tempos)
+        if incremental:
+            manifest["revisoes"] = revisoes
+        print(f"[OK] manifesto {manifest['versao']} → {write_manifest(manifest)}")
+
+    if to_postgres:
+        from src.db.cepea_indicadores import atualizar_indicadores
+        from src.db.cepea_load_postgres import carregar_precos
+        t0 = time.perf_counter()
+        # Incremental: só o que mudou (mais o que o banco ainda não tem);
+        # completo: tudo, como upsert
+        carga = pendentes if incremental else df_all.assign(operacao="U")
+        with metrics.span("carga_postgres", modo=modo) as s:
+            stats = carregar_precos(carga, engine=engine, execucao=manifest["versao"] if manifest else None)
+            s.linhas = stats["linhas"]
+        with metrics.span("indicadores"):
+            # Preços antigos revisados ou removidos invalidam as janelas seguintes
+            desde = None
+            if stats["atualizadas"] or stats["removidas"]:
+                revisadas = carga.loc[carga["operacao"] != "I", "data"]
+                desde = (revisadas if not revisadas.empty else carga["data"]).min().date()
+            atualizar_indicadores(engine=engine, desde=desde)
+        tempos["carga_postgres"] = time.perf_counter() - t0
+        if manifest is not None:
+            manifest["postgres"] = {
+                k: stats[k] for k in ("linhas", "inseridas", "atualizadas", "removidas", "ignoradas")
+            }
+
+    tempos["total"] = time.perf_counter() - t_inicio
+    if manifest is not None:
+        manifest["tempos_s"] = {k: round(v, 3) for k, v in tempos.items()}
+        write_manifest(manifest)  # mesma versão: só acrescenta carga e tempo total
+    metrics.record("total", tempos["total"], linhas=len(df_all), labels={"modo": modo})
+    metrics.finish()
 
-    print(f"[INFO] Total de registros: {len(df_all)}")
+    print(f"[INFO] Total de registros ({modo}): {len(df_all)}")
     print(f"[INFO] Período: {df_all['data'].min()} a {df_all['data'].max()}")
     print("🚀 ETL concluído com sucesso (com decimal correto).")
+    return manifest
 
 # =====================
 if __name__ == "__main__":
     parser = argparse.ArgumentParser()
     parser.add_argument("--to-postgres", type=str, default="false")
+    parser.add_argument("--incremental", action="store_true",
+                        help="grava/carrega só o que mudou em relação ao snapshot publicado")
+    parser.add_argument("--workers", type=int, default=ETL_WORKERS,
+                        help="processos na leitura das planilhas (padrão: nº de CPUs)")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="ignora o cache de planilhas já parseadas (SHA-256)")
+    parser.add_argument("--reader", choices=sorted(READERS), default=ETL_READER,
+                        help="leitor das planilhas (padrão: streaming)")
+    parser.add_argument("--dq", choices=["block", "warn", "off"], default=ETL_DQ,
+                        help="validação de qualidade: block reprova a execução (padrão), warn só registra")
+    parser.add_argument("--metrics", action="store_true", default=ETL_METRICS,
+                        help="grava tempo/CPU/memória por etapa em ETL_METRICS_PATH (JSON lines)")
+    parser.add_argument("--metrics-prom", default=ETL_METRICS_PROM or None,
+                        help="arquivo .prom (formato texto do Prometheus) gerado ao fim da execução")
     args = parser.parse_args()
-    main(to_postgres=str(args.to_postgres).lower() == "true")
\ No newline at end of file
+    main(
+        to_postgres=str(args.to_postgres).lower() == "true",
+        incremental=args.incremental,
+        workers=args.workers,
+        use_cache=not args.no_cache,
+        reader=args.reader,
+        dq=args.dq,
+        metrics=Metrics("etl", enabled=args.metrics or bool(args.metrics_prom), prom_path=args.metrics_prom),
+    )
@@ -0,0 +1,112 @@
+# -*- coding: utf-8 -*-
+"""
+Escrita atômica das saídas do ETL e manifesto da execução
+
+Toda saída é gravada em um arquivo temporário na mesma pasta e publicada
+com os.replace: quem lê (dashboard, scripts) vê o arquivo antigo inteiro ou
+o novo inteiro, nunca um arquivo ausente ou pela metade.
+
+O manifesto (data/curated/cepea/_manifest.json) é gravado por último e é o
+ponto de "commit" da execução: linhas por saída e por série, período,
+SHA-256 das planilhas de entrada e tempos. O campo `versao` é derivado do
+conteúdo (entradas + linhas + período): reprocessar as mesmas planilhas
+mantém a versão, e o dashboard só recarrega quando ela muda.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parents[2]
+MANIFEST_PATH = ROOT / "data" / "curated" / "cepea" / "_manifest.json"
+
+# No Windows, os.replace falha enquanto outro processo mantém o destino aberto
+REPLACE_RETRIES = int(os.getenv("ETL_REPLACE_RETRIES", "10"))
+REPLACE_WAIT_S = float(os.getenv("ETL_REPLACE_WAIT_S", "0.5"))
+
+
+# ===================== Escrita atômica =====================
+def temp_path(path: Path) -> Path:
+    """Temporário oculto na mesma pasta (mesmo filesystem → rename atômico)."""
+    return path.with_name(f".{path.name}.{os.getpid()}-{threading.get_ident()}.tmp")
+
+
+def publish(tmp: Path, path: Path):
+    """os.replace com retentativas; em falha definitiva remove o temporário."""
+    for attempt in range(REPLACE_RETRIES + 1):
+        try:
+            os.replace(tmp, path)
+            return
+        except PermissionError:
+            if attempt == REPLACE_RETRIES:
+                Path(tmp).unlink(missing_ok=True)
+                raise
+            print(f"[AVISO] {path.name} em uso, nova tentativa em {REPLACE_WAIT_S}s")
+            time.sleep(REPLACE_WAIT_S)
+
+
+def atomic_write_text(path: Path, text: str):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = temp_path(path)
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(text)
+        f.flush()
+        os.fsync(f.fileno())
+    publish(tmp, path)
+
+
+# ===================== Manifesto =====================
+def read_manifest(path: Path = MANIFEST_PATH) -> dict | None:
+    try:
+        return json.loads(Path(path).read_text(encoding="utf-8"))
+    except (FileNotFoundError, ValueError):
+        return None
+
+
+def manifest_version(path: Path = MANIFEST_PATH) -> str | None:
+    manifest = read_manifest(path)
+    return manifest.get("versao") if manifest else None
+
+
+def build_manifest(base: pd.DataFrame, modo: str, entradas: dict, saidas: dict, tempos: dict) -> dict:
+    """
+    base: histórico completo publicado (curated); entradas: {arquivo: {sha256, ...}};
+    saidas: {arquivo: linhas}; tempos: {etapa: segundos}.
+    """
+    series = {}
+    if not base.empty:
+        agg = base.groupby(["commodity", "regiao"], observed=True)["data"].agg(["count", "min", "max"])
+        series = {
+            f"{c}|{r}": {"linhas": int(row["count"]), "inicio": str(row["min"].date()), "fim": str(row["max"].date())}
+            for (c, r), row in agg.iterrows()
+        }
+    periodo = [str(base["data"].min().date()), str(base["data"].max().date())] if not base.empty else None
+    conteudo = {
+        "entradas": sorted(e["sha256"] for e in entradas.values()),
+        "linhas": len(base),
+        "periodo": periodo,
+        "series": series,
+    }
+    versao = hashlib.sha256(json.dumps(conteudo, sort_keys=True).encode("utf-8")).hexdigest()[:16]
+    return {
+        "versao": versao,
+        "gerado_em": datetime.now().isoformat(timespec="seconds"),
+        "modo": modo,
+        "linhas": len(base),
+        "periodo": periodo,
+        "series": series,
+        "entradas": entradas,
+        "saidas": saidas,
+        "tempos_s": {k: round(v, 3) for k, v in tempos.items()},
+    }
+
+
+def write_manifest(manifest: dict, path: Path = MANIFEST_PATH) -> Path:
+    atomic_write_text(path, json.dumps(manifest, indent=2, ensure_ascii=False))
+    return path
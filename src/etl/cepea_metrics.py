@@ -0,0 +1,206 @@
+# -*- coding: utf-8 -*-
+"""
+Instrumentação do scraper e do ETL (tempo, CPU, memória, linhas)
+
+Cada etapa roda dentro de um span:
+
+    metrics = Metrics("etl")
+    with metrics.span("escrita.csv", arquivo="cepea_curated.csv") as s:
+        ...
+        s.linhas = len(df)
+
+Ao fechar, o span registra tempo de relógio, CPU do processo (e dos
+processos filhos já encerrados, como o pool de leitura), pico de RSS e
+linhas, e acrescenta uma linha em ETL_METRICS_PATH (JSON lines). Etapas
+medidas em outro processo (parse de cada planilha) entram com record().
+Com ETL_METRICS_PROM, o fim da execução grava também um arquivo no formato
+texto do Prometheus (para o textfile collector do node_exporter).
+
+Desligado (padrão, ETL_METRICS=false), span() devolve sempre o mesmo objeto
+inerte: o custo é uma chamada de função por etapa.
+"""
+
+import json
+import os
+import sys
+import threading
+import time
+import uuid
+from datetime import datetime
+from pathlib import Path
+
+try:
+    import resource
+except ImportError:  # Windows: sem getrusage, o pico de RSS fica de fora
+    resource = None
+
+ROOT = Path(__file__).resolve().parents[2]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from src.etl.cepea_manifest import atomic_write_text  # noqa: E402
+
+ETL_METRICS = os.getenv("ETL_METRICS", "false").lower() == "true"
+ETL_METRICS_PATH = ROOT / os.getenv("ETL_METRICS_PATH", "data/logs/cepea_metrics.jsonl")
+ETL_METRICS_PROM = os.getenv("ETL_METRICS_PROM", "")  # vazio = sem dump Prometheus
+
+# ru_maxrss vem em KiB no Linux e em bytes no macOS
+RSS_UNIT = 1 if sys.platform == "darwin" else 1024
+
+
+def peak_rss_bytes() -> int | None:
+    if resource is None:
+        return None
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * RSS_UNIT
+
+
+def _cpu() -> tuple[float, float]:
+    """CPU (usuário + sistema) do processo e dos filhos encerrados."""
+    t = os.times()
+    return t.user + t.system, t.children_user + t.children_system
+
+
+# ===================== Spans =====================
+class Span:
+    __slots__ = ("nome", "labels", "linhas", "_t0", "_cpu0", "_rss0", "_metrics")
+
+    def __init__(self, metrics, nome: str, labels: dict):
+        self._metrics = metrics
+        self.nome = nome
+        self.labels = labels
+        self.linhas = None
+
+    def __enter__(self):
+        self._rss0 = peak_rss_bytes()
+        self._cpu0 = _cpu()
+        self._t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        wall = time.perf_counter() - self._t0
+        cpu, cpu_filhos = _cpu()
+        rss = peak_rss_bytes()
+        self._metrics.record(
+            self.nome,
+            wall_s=wall,
+            cpu_s=cpu - self._cpu0[0],
+            cpu_filhos_s=cpu_filhos - self._cpu0[1],
+            rss_pico_bytes=rss,
+            rss_pico_delta_bytes=None if rss is None else rss - self._rss0,
+            linhas=self.linhas,
+            labels=self.labels,
+            erro=None if exc_type is None else exc_type.__name__,
+        )
+        return False
+
+
+class _NullSpan:
+    """Span inerte (métricas desligadas): aceita os mesmos atributos."""
+
+    linhas = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+    def __setattr__(self, name, value):
+        pass
+
+
+NULL_SPAN = _NullSpan()
+
+
+class Metrics:
+    """
+    Coletor de uma execução (job = "etl" ou "scraper"). Cada registro vai
+    para o JSONL ao fechar; os últimos valores por span ficam em memória
+    para o dump Prometheus.
+    """
+
+    def __init__(self, job: str, enabled: bool = ETL_METRICS, path: Path = ETL_METRICS_PATH,
+                 prom_path: str | Path | None = ETL_METRICS_PROM or None):
+        self.job = job
+        self.enabled = enabled
+        self.path = Path(path)
+        self.prom_path = Path(prom_path) if prom_path else None
+        self.run_id = uuid.uuid4().hex[:12]
+        self.records: list[dict] = []
+        self._lock = threading.Lock()
+
+    def span(self, nome: str, **labels):
+        if not self.enabled:
+            return NULL_SPAN
+        return Span(self, nome, labels)
+
+    def record(self, nome: str, wall_s: float, cpu_s: float | None = None, linhas: int | None = None,
+               labels: dict | None = None, **campos):
+        """
+        Registra uma etapa medida externamente (ex.: parse em processo filho).
+        labels identificam a série no Prometheus; campos extras só vão ao JSONL.
+        """
+        if not self.enabled:
+            return
+        rec = {
+            "ts": datetime.now().isoformat(timespec="milliseconds"),
+            "job": self.job,
+            "run": self.run_id,
+            "span": nome,
+            "labels": labels or {},
+            "wall_s": round(wall_s, 6),
+            "cpu_s": None if cpu_s is None else round(cpu_s, 6),
+            "linhas": linhas,
+        }
+        for k, v in campos.items():
+            rec[k] = round(v, 6) if isinstance(v, float) else v
+        line = json.dumps(rec, ensure_ascii=False, default=str)
+        with self._lock:
+            self.records.append(rec)
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+
+    # ===================== Prometheus =====================
+    def prometheus_text(self) -> str:
+        prefix = f"cepea_{self.job}"
+        series = {
+            "span_duration_seconds": ("gauge", "Tempo de relógio da etapa", "wall_s"),
+            "span_cpu_seconds": ("gauge", "CPU do processo na etapa", "cpu_s"),
+            "span_rows": ("gauge", "Linhas processadas na etapa", "linhas"),
+            "span_peak_rss_bytes": ("gauge", "Pico de RSS ao fim da etapa", "rss_pico_bytes"),
+        }
+        latest = {}
+        for rec in self.records:  # último valor por (span, rótulos)
+            labels = {"span": rec["span"], **rec["labels"]}
+            latest[tuple(sorted(labels.items()))] = rec
+
+        lines = []
+        for metric, (kind, help_text, field) in series.items():
+            name = f"{prefix}_{metric}"
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}"]
+            for labels, rec in latest.items():
+                if rec.get(field) is None:
+                    continue
+                rendered = ",".join(f'{k}="{_escape(v)}"' for k, v in labels)
+                lines.append(f"{name}{{{rendered}}} {rec[field]}")
+        name = f"{prefix}_last_run_timestamp_seconds"
+        lines += [f"# HELP {name} Fim da última execução", f"# TYPE {name} gauge", f"{name} {time.time():.3f}"]
+        return "\n".join(lines) + "\n"
+
+    def finish(self):
+        """Fecha a execução: grava o dump Prometheus, se configurado."""
+        if not self.enabled:
+            return
+        if self.prom_path is not None:
+            atomic_write_text(self.prom_path, self.prometheus_text())
+            print(f"[OK] métricas Prometheus → {self.prom_path}")
+        print(f"[OK] métricas ({len(self.records)} spans) → {self.path}")
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+# Coletor desligado, padrão dos parâmetros opcionais
+NULL_METRICS = Metrics("etl", enabled=False)
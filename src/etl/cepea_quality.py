@@ -0,0 +1,187 @@
+# -*- coding: utf-8 -*-
+"""
+Validação de qualidade dos dados CEPEA (data quality)
+
+Roda sobre o df_all do ETL em uma única passada vetorizada (NumPy, sem
+groupby.apply nem laços por linha), depois de uma ordenação por série:
+- chaves (data, commodity, regiao) duplicadas
+- preços nulos (valores que o parsing converteu para NaN)
+- preços zero/negativos
+- câmbio implícito (valor_brl / valor_usd) fora da faixa ou com salto
+  acima de DQ_FX_SIGMA desvios
+- variação diária do preço em R$ acima de DQ_JUMP_SIGMA desvios
+- lacunas de calendário maiores que DQ_GAP_DAYS dias corridos
+
+O relatório (JSON) vai para data/processed/cepea/_quality_report.json.
+Checagens marcadas como bloqueantes (DQ_BLOCK) que passam do limite
+reprovam a execução; com o modo "block" o ETL não grava nem carrega nada.
+"""
+
+import json
+import os
+import time
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parents[2]
+REPORT_PATH = ROOT / "data" / "processed" / "cepea" / "_quality_report.json"
+
+# Parâmetros das checagens
+DQ_JUMP_SIGMA = float(os.getenv("DQ_JUMP_SIGMA", "6"))
+DQ_FX_SIGMA = float(os.getenv("DQ_FX_SIGMA", "6"))
+DQ_FX_MIN = float(os.getenv("DQ_FX_MIN", "1.0"))
+DQ_FX_MAX = float(os.getenv("DQ_FX_MAX", "10.0"))
+DQ_GAP_DAYS = int(os.getenv("DQ_GAP_DAYS", "7"))
+DQ_MAX_NAN_PCT = float(os.getenv("DQ_MAX_NAN_PCT", "1.0"))
+DQ_EXAMPLES = int(os.getenv("DQ_EXAMPLES", "10"))
+
+# Limite de ocorrências por checagem (None = só informativo); sobrescreva
+# com DQ_MAX_<CHECAGEM>, ex.: DQ_MAX_SALTOS_DIARIOS=5
+LIMITS = {
+    "chaves_duplicadas": 0,
+    "precos_nulos": None,  # limite percentual (DQ_MAX_NAN_PCT), calculado na hora
+    "precos_nao_positivos": 0,
+    "cambio_outlier": None,
+    "saltos_diarios": None,
+    "lacunas_calendario": None,
+}
+for _name in LIMITS:
+    if os.getenv(f"DQ_MAX_{_name.upper()}"):
+        LIMITS[_name] = int(os.environ[f"DQ_MAX_{_name.upper()}"])
+BLOCKING = set(filter(None, os.getenv(
+    "DQ_BLOCK", "chaves_duplicadas,precos_nulos,precos_nao_positivos"
+).split(",")))
+
+
+class QualityError(RuntimeError):
+    """Checagem bloqueante reprovada."""
+
+
+# ===================== Estatística por série =====================
+def _group_zscore(values: np.ndarray, sid: np.ndarray, valid: np.ndarray, n_series: int) -> np.ndarray:
+    """z-score de `values` dentro de cada série (média/desvio por bincount)."""
+    w = valid.astype(np.float64)
+    v = np.where(valid, values, 0.0)
+    n = np.bincount(sid, weights=w, minlength=n_series)
+    s1 = np.bincount(sid, weights=v, minlength=n_series)
+    s2 = np.bincount(sid, weights=v * v, minlength=n_series)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = s1 / n
+        std = np.sqrt(np.maximum(s2 / n - mean ** 2, 0.0) * n / np.maximum(n - 1, 1))
+        z = (values - mean[sid]) / std[sid]
+    return np.where(valid & np.isfinite(z), z, 0.0)
+
+
+def _diff(a: np.ndarray) -> np.ndarray:
+    out = np.empty_like(a)
+    out[0] = np.nan
+    out[1:] = a[1:] - a[:-1]
+    return out
+
+
+# ===================== Validação =====================
+def validate(df: pd.DataFrame, descartadas: dict | None = None, modo: str = "completo") -> dict:
+    """Executa todas as checagens e devolve o relatório (dict serializável)."""
+    t0 = time.perf_counter()
+    d = df.sort_values(["commodity", "regiao", "data"], kind="stable", ignore_index=True)
+    n = len(d)
+
+    checks: dict[str, np.ndarray] = {}
+    extra: dict[str, tuple[str, np.ndarray]] = {}
+    if n:
+        sid = d.groupby(["commodity", "regiao"], sort=False, observed=True).ngroup().to_numpy()
+        n_series = int(sid.max()) + 1
+        dates = d["data"].to_numpy(dtype="datetime64[ns]")
+        brl = d["valor_brl"].to_numpy(dtype=np.float64)
+        usd = d["valor_usd"].to_numpy(dtype=np.float64)
+
+        # linha i tem antecessora na mesma série
+        same = np.zeros(n, dtype=bool)
+        same[1:] = sid[1:] == sid[:-1]
+        gap_days = np.zeros(n, dtype=np.int64)
+        gap_days[1:] = (dates[1:] - dates[:-1]).astype("timedelta64[D]").astype(np.int64)
+
+        positive = (brl > 0) & (usd > 0)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            log_brl = np.log(np.where(positive, brl, np.nan))
+            log_fx = np.log(np.where(positive, brl / usd, np.nan))
+        ret = _diff(log_brl)
+        ret_fx = _diff(log_fx)
+        z_ret = _group_zscore(ret, sid, same & np.isfinite(ret), n_series)
+        z_fx = _group_zscore(ret_fx, sid, same & np.isfinite(ret_fx), n_series)
+        fx = np.exp(log_fx)
+
+        checks["chaves_duplicadas"] = same & (gap_days == 0)
+        checks["precos_nulos"] = np.isnan(brl) | np.isnan(usd)
+        checks["precos_nao_positivos"] = (brl <= 0) | (usd <= 0)
+        checks["cambio_outlier"] = positive & ((fx < DQ_FX_MIN) | (fx > DQ_FX_MAX) | (np.abs(z_fx) > DQ_FX_SIGMA))
+        checks["saltos_diarios"] = np.abs(z_ret) > DQ_JUMP_SIGMA
+        checks["lacunas_calendario"] = same & (gap_days > DQ_GAP_DAYS)
+        extra = {
+            "cambio_outlier": ("cambio", np.round(fx, 4)),
+            "saltos_diarios": ("zscore", np.round(z_ret, 2)),
+            "lacunas_calendario": ("dias", gap_days),
+        }
+    else:
+        checks = {name: np.zeros(0, dtype=bool) for name in LIMITS}
+
+    limits = dict(LIMITS)
+    if limits["precos_nulos"] is None:
+        limits["precos_nulos"] = int(n * DQ_MAX_NAN_PCT / 100)
+    results = {}
+    for name, mask in checks.items():
+        count = int(mask.sum())
+        limit = limits[name]
+        failed = limit is not None and count > limit
+        status = "ok" if not count else ("falha" if failed and name in BLOCKING else "aviso")
+        idx = np.flatnonzero(mask)[:DQ_EXAMPLES]
+        examples = d.iloc[idx][["data", "commodity", "regiao", "valor_brl", "valor_usd"]].astype(
+            {"data": str, "commodity": str, "regiao": str}
+        )
+        if name in extra:
+            col, values = extra[name]
+            examples[col] = values[idx]
+        results[name] = {
+            "ocorrencias": count,
+            "limite": limit,
+            "bloqueia": name in BLOCKING,
+            "status": status,
+            "exemplos": json.loads(examples.to_json(orient="records", force_ascii=False)),
+        }
+
+    report = {
+        "gerado_em": datetime.now().isoformat(timespec="seconds"),
+        "modo": modo,
+        "linhas": n,
+        "periodo": [str(d["data"].min().date()), str(d["data"].max().date())] if n else None,
+        "descartadas": descartadas or {},
+        "parametros": {
+            "jump_sigma": DQ_JUMP_SIGMA, "fx_sigma": DQ_FX_SIGMA, "fx_faixa": [DQ_FX_MIN, DQ_FX_MAX],
+            "gap_dias": DQ_GAP_DAYS, "max_nulos_pct": DQ_MAX_NAN_PCT,
+        },
+        "checagens": results,
+        "status": "reprovado" if any(r["status"] == "falha" for r in results.values()) else "aprovado",
+        "tempo_s": round(time.perf_counter() - t0, 4),
+    }
+    return report
+
+
+def write_report(report: dict, path: Path = REPORT_PATH) -> Path:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(json.dumps(report, indent=2, ensure_ascii=False), encoding="utf-8")
+    os.replace(tmp, path)
+    return path
+
+
+def summarize(report: dict):
+    """Resumo no console no padrão de logs do ETL."""
+    for name, r in report["checagens"].items():
+        if r["status"] != "ok":
+            tag = "[ERRO]" if r["status"] == "falha" else "[AVISO]"
+            limite = "" if r["limite"] is None else f" (limite {r['limite']})"
+            print(f"{tag} DQ {name}: {r['ocorrencias']} ocorrência(s){limite}")
+    print(f"[DQ] {report['status']} — {report['linhas']} linhas em {report['tempo_s']}s")
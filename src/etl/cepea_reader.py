@@ -0,0 +1,207 @@
+# -*- coding: utf-8 -*-
+"""
+Leitor em streaming das planilhas CEPEA
+
+Em vez de carregar o workbook inteiro (pd.read_excel + várias passadas de
+string em valor_brl/valor_usd), percorre as linhas uma única vez:
+- python-calamine quando instalado (mais rápido, lê .xls e .xlsx);
+  senão openpyxl read_only (.xlsx) ou xlrd (.xls, formato baixado do CEPEA)
+- datas (dd/mm/aaaa ou data nativa do Excel) e números pt-BR ("1.234,56")
+  convertidos na mesma passada para arrays NumPy pré-alocados
+- memória do leitor não cresce com o tamanho da planilha: só os arrays finais
+
+Benchmark contra o caminho pandas:
+    python src/etl/cepea_reader.py --bench data/raw/cepea/milho/*.xlsx
+"""
+
+import argparse
+import math
+import sys
+import time
+import tracemalloc
+from datetime import date, datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+try:
+    from python_calamine import CalamineWorkbook
+except ImportError:  # backend opcional
+    CalamineWorkbook = None
+
+HEADER = {"Data": "data", "À vista R$": "valor_brl", "À vista US$": "valor_usd"}
+HEADER_SCAN_ROWS = 10  # o cabeçalho CEPEA fica na 4ª linha (3 linhas de título)
+EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+NAT = np.iinfo(np.int64).min  # sentinela de data inválida
+
+
+# ===================== Conversões =====================
+def _to_number(v) -> float:
+    """Valor de célula → float (aceita número do Excel ou texto pt-BR)."""
+    if v is None:
+        return math.nan
+    if isinstance(v, (int, float)):
+        return float(v)
+    s = str(v).strip()
+    if not s:
+        return math.nan
+    try:
+        return float(s.replace(".", "").replace(",", "."))
+    except ValueError:
+        return math.nan
+
+
+def _to_day(v) -> int:
+    """Valor de célula → dias desde 1970-01-01 (NAT se inválido)."""
+    if isinstance(v, datetime):
+        return v.date().toordinal() - EPOCH_ORDINAL
+    if isinstance(v, date):
+        return v.toordinal() - EPOCH_ORDINAL
+    if v is None:
+        return NAT
+    s = str(v).strip()
+    try:
+        d, m, y = s.split("/")
+        return date(int(y), int(m), int(d)).toordinal() - EPOCH_ORDINAL
+    except ValueError:
+        return NAT
+
+
+# ===================== Backends =====================
+def _rows_calamine(path: Path):
+    sheet = CalamineWorkbook.from_path(str(path)).get_sheet_by_index(0)
+    return sheet.iter_rows(), getattr(sheet, "height", None)
+
+
+def _rows_openpyxl(path: Path):
+    import openpyxl
+
+    wb = openpyxl.load_workbook(path, read_only=True, data_only=True)
+    ws = wb.worksheets[0]
+
+    def rows():
+        try:
+            yield from ws.iter_rows(values_only=True)
+        finally:
+            wb.close()  # read_only mantém o arquivo aberto até aqui
+
+    return rows(), ws.max_row
+
+
+def _rows_xlrd(path: Path):
+    import xlrd
+
+    book = xlrd.open_workbook(str(path), on_demand=True)
+    sheet = book.sheet_by_index(0)
+
+    def cell(c):
+        if c.ctype == xlrd.XL_CELL_DATE:
+            return xlrd.xldate_as_datetime(c.value, book.datemode)
+        if c.ctype in (xlrd.XL_CELL_EMPTY, xlrd.XL_CELL_BLANK, xlrd.XL_CELL_ERROR):
+            return None
+        return c.value
+
+    def rows():
+        try:
+            for i in range(sheet.nrows):
+                yield tuple(cell(c) for c in sheet.row(i))
+        finally:
+            book.release_resources()
+
+    return rows(), sheet.nrows
+
+
+def _iter_rows(path: Path):
+    if CalamineWorkbook is not None:
+        return _rows_calamine(path)
+    if path.suffix.lower() == ".xls":
+        return _rows_xlrd(path)
+    return _rows_openpyxl(path)
+
+
+# ===================== Leitura =====================
+def read_streaming(path: Path) -> pd.DataFrame:
+    """Planilha CEPEA → DataFrame (data, valor_brl, valor_usd), uma passada."""
+    rows, height = _iter_rows(Path(path))
+
+    idx = None
+    for _, row in zip(range(HEADER_SCAN_ROWS), rows):
+        names = [str(c).strip() if c is not None else "" for c in row]
+        if all(h in names for h in HEADER):
+            idx = [names.index(h) for h in HEADER]
+            break
+    if idx is None:
+        raise ValueError(f"Cabeçalho CEPEA não encontrado em {path}")
+    i_data, i_brl, i_usd = idx
+    width = max(idx) + 1
+
+    cap = max(int(height or 0), 1024)
+    days = np.empty(cap, dtype=np.int64)
+    brl = np.empty(cap, dtype=np.float64)
+    usd = np.empty(cap, dtype=np.float64)
+
+    n = 0
+    for row in rows:
+        if len(row) < width:
+            continue
+        day = _to_day(row[i_data])
+        if day == NAT:
+            continue
+        if n == cap:  # a dimensão declarada na planilha pode estar errada
+            cap *= 2
+            days, brl, usd = (np.resize(a, cap) for a in (days, brl, usd))
+        days[n] = day
+        brl[n] = _to_number(row[i_brl])
+        usd[n] = _to_number(row[i_usd])
+        n += 1
+
+    return pd.DataFrame({
+        "data": days[:n].astype("datetime64[D]").astype("datetime64[ns]"),
+        "valor_brl": np.round(brl[:n], 2),
+        "valor_usd": np.round(usd[:n], 2),
+    })
+
+
+# ===================== Benchmark =====================
+def _measure(fn, path: Path) -> tuple[float, float, int]:
+    """(tempo em s, pico de memória alocada em MB, linhas) — medidos em passadas separadas."""
+    t0 = time.perf_counter()
+    df = fn(path)
+    elapsed = time.perf_counter() - t0
+    tracemalloc.start()
+    fn(path)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak / (1024 * 1024), len(df)
+
+
+def bench(paths: list[Path], repeat: int = 3):
+    """Compara tempo e pico de memória: pd.read_excel (ETL atual) × streaming."""
+    root = Path(__file__).resolve().parents[2]
+    if str(root) not in sys.path:
+        sys.path.insert(0, str(root))
+    from src.etl.cepea_etl import _parse_file
+
+    backend = "calamine" if CalamineWorkbook is not None else "openpyxl read_only"
+    print(f"[BENCH] backend streaming: {backend}")
+    for path in paths:
+        a = _parse_file(path)
+        b = read_streaming(path)
+        same = a.reset_index(drop=True).astype(b.dtypes.to_dict()).equals(b)
+        for name, fn in (("pandas", _parse_file), ("streaming", read_streaming)):
+            runs = [_measure(fn, path) for _ in range(repeat)]
+            best = min(r[0] for r in runs)
+            peak = max(r[1] for r in runs)
+            print(f"[BENCH] {path.name} {name:<9}: {best:.3f}s | pico {peak:.1f} MB | {runs[0][2]} linhas")
+        print(f"[BENCH] {path.name} resultados idênticos: {'sim' if same else 'NÃO'}")
+
+
+# =====================
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--bench", nargs="+", type=Path, required=True,
+                        help="planilhas CEPEA para comparar os leitores")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    bench(args.bench, args.repeat)
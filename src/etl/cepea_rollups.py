@@ -0,0 +1,35 @@
+# -*- coding: utf-8 -*-
+"""
+Agregações semanais/mensais das séries CEPEA
+
+Usado pelo dashboard (Periodicidade) e pelo ETL, que grava os rollups
+cepea_semanal.csv e cepea_mensal.csv junto do curated. A média é calculada
+em um único groupby vetorizado por (commodity, regiao, período).
+"""
+
+import pandas as pd
+
+# Regras de reamostragem (rótulo = fim do período, como no resample)
+RULES = {"Semanal": "W", "Mensal": "ME"}
+VALUE_COLUMNS = ["valor_brl", "valor_usd"]
+
+
+def resample_mean(df: pd.DataFrame, rule: str) -> pd.DataFrame:
+    """Média por (commodity, regiao, período); períodos sem preço são descartados."""
+    if df.empty:
+        return df
+    agg = (
+        df.groupby(["commodity", "regiao", pd.Grouper(key="data", freq=rule)], observed=True, sort=False)
+        [VALUE_COLUMNS]
+        .mean()
+        .dropna()
+        .reset_index()
+    )
+    return agg[["data", *VALUE_COLUMNS, "commodity", "regiao"]].sort_values(
+        ["commodity", "regiao", "data"], ignore_index=True
+    )
+
+
+def rollups(df: pd.DataFrame) -> dict[str, pd.DataFrame]:
+    """{"Semanal": ..., "Mensal": ...} a partir da série diária."""
+    return {nome: resample_mean(df, rule) for nome, rule in RULES.items()}
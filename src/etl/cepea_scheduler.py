@@ -0,0 +1,234 @@
+# -*- coding: utf-8 -*-
+"""
+Agendador do pipeline CEPEA (scraper → ETL → carga) em um processo só
+
+Em vez de um `python cepea_etl.py` a frio a cada execução (imports de
+pandas/openpyxl, parse de todas as planilhas, engine nova), o agendador
+mantém entre os ciclos:
+- as planilhas já parseadas em memória (WarmParseCache, por SHA-256)
+- a engine SQLAlchemy com o pool de conexões (com --to-postgres)
+
+A cada ciclo:
+1. baixa as séries (scraper HTTP; --no-scrape pula)
+2. compara o SHA-256 das planilhas com as entradas do último manifesto;
+   se nada mudou, ETL e carga são pulados
+3. roda o ETL incremental (que já faz a carga com --to-postgres)
+
+Um lock de arquivo (data/cache/cepea_pipeline.lock) impede execuções
+simultâneas entre agendadores (um daemon e um cron com --once, por
+exemplo). O lock é do sistema operacional: se o processo morrer, ele é
+liberado. Tempos e resultado de cada ciclo vão para
+data/logs/cepea_scheduler.jsonl.
+
+    python src/etl/cepea_scheduler.py --interval 60 --to-postgres true
+    python src/etl/cepea_scheduler.py --at 09:30,18:00
+    python src/etl/cepea_scheduler.py --once
+"""
+
+import argparse
+import os
+import signal
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+ROOT = Path(__file__).resolve().parents[2]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from src.etl import cepea_etl as etl  # noqa: E402
+from src.etl.cepea_cache import WarmParseCache, file_hash  # noqa: E402
+from src.etl.cepea_manifest import read_manifest  # noqa: E402
+from src.etl.cepea_metrics import ETL_METRICS, Metrics  # noqa: E402
+
+SCHED_INTERVAL_MIN = float(os.getenv("SCHED_INTERVAL_MIN", "60"))
+SCHED_AT = os.getenv("SCHED_AT", "")  # "HH:MM,HH:MM" — tem precedência sobre o intervalo
+LOCK_PATH = ROOT / "data" / "cache" / "cepea_pipeline.lock"
+RUNS_PATH = ROOT / "data" / "logs" / "cepea_scheduler.jsonl"
+
+
+class LockBusy(RuntimeError):
+    """Outra execução do pipeline está em andamento."""
+
+
+# ===================== Lock =====================
+@contextmanager
+def run_lock(path: Path = LOCK_PATH):
+    """Lock exclusivo e não bloqueante; LockBusy se já estiver em uso."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    f = open(path, "a+")
+    try:
+        f.seek(0)
+        try:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            else:
+                msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)
+        except OSError as exc:
+            f.seek(0)
+            raise LockBusy(f"pipeline em execução ({f.read().strip() or 'pid desconhecido'})") from exc
+        f.seek(0)
+        f.truncate()
+        f.write(f"pid {os.getpid()} desde {datetime.now().isoformat(timespec='seconds')}")
+        f.flush()
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+    finally:
+        f.close()
+
+
+# ===================== Agenda =====================
+def parse_at(value: str) -> list[tuple[int, int]]:
+    return sorted(tuple(int(x) for x in item.split(":")) for item in value.split(",") if item.strip())
+
+
+def next_run(now: datetime, interval_min: float, at: list[tuple[int, int]]) -> datetime:
+    """Próximo horário: o primeiro de `at` ainda não passado hoje (senão amanhã) ou now + intervalo."""
+    if not at:
+        return now + timedelta(minutes=interval_min)
+    for h, m in at:
+        candidate = now.replace(hour=h, minute=m, second=0, microsecond=0)
+        if candidate > now:
+            return candidate
+    h, m = at[0]
+    return (now + timedelta(days=1)).replace(hour=h, minute=m, second=0, microsecond=0)
+
+
+# ===================== Pipeline =====================
+def raw_signature() -> dict:
+    """{planilha: sha256} das séries do ETL, no formato das entradas do manifesto."""
+    return {
+        etl._relpath(xlsx): file_hash(xlsx)
+        for folder, _, _ in etl.SERIES
+        for xlsx in etl._raw_files(folder)
+    }
+
+
+def _manifest_signature(to_postgres: bool) -> dict | None:
+    """Entradas do último manifesto; com carga no banco, só se ela concluiu."""
+    manifest = read_manifest()
+    if not manifest or (to_postgres and "postgres" not in manifest):
+        return None
+    return {path: e["sha256"] for path, e in manifest.get("entradas", {}).items()}
+
+
+class Pipeline:
+    """Estado mantido entre ciclos: cache de parse, engine e última assinatura."""
+
+    def __init__(self, scrape: bool = True, scraper_engine: str = "http",
+                 to_postgres: bool = False, metrics: bool = ETL_METRICS):
+        self.scrape = scrape
+        self.scraper_engine = scraper_engine
+        self.to_postgres = to_postgres
+        self.metrics = metrics
+        self.cache = WarmParseCache()
+        self.engine = None
+        if to_postgres:
+            from src.db.cepea_load_postgres import get_engine
+            self.engine = get_engine()
+        self.signature = _manifest_signature(to_postgres)
+
+    def run_once(self) -> str:
+        """Um ciclo completo; retorna o status ("ok", "inalterado", "ocupado" ou "erro")."""
+        runs = Metrics("scheduler", enabled=True, path=RUNS_PATH)
+        t0 = time.perf_counter()
+        campos = {}
+        try:
+            with run_lock():
+                status = self._cycle(runs, campos)
+        except LockBusy as exc:
+            print(f"[AVISO] {exc}; ciclo pulado")
+            status = "ocupado"
+        except Exception as exc:
+            print(f"[ERRO] ciclo falhou: {exc.__class__.__name__}: {exc}")
+            status, campos["erro"] = "erro", f"{exc.__class__.__name__}: {exc}"
+        runs.record("ciclo", time.perf_counter() - t0, labels={"status": status}, **campos)
+        print(f"[TEMPO] ciclo {status}: {time.perf_counter() - t0:.2f}s")
+        return status
+
+    def _cycle(self, runs: Metrics, campos: dict) -> str:
+        if self.scrape:
+            from src.scraping.cepea_scraper import baixar_todas
+
+            with runs.span("scraper", engine=self.scraper_engine):
+                resultados = baixar_todas(self.scraper_engine)
+            campos["downloads"] = {k: r["status"] for k, r in resultados.items()}
+
+        with runs.span("assinatura") as s:
+            signature = raw_signature()
+            s.linhas = len(signature)
+        if signature == self.signature:
+            print("[INFO] Planilhas inalteradas desde a última carga; ETL e carga pulados")
+            return "inalterado"
+
+        with runs.span("etl", to_postgres=str(self.to_postgres).lower()):
+            manifest = etl.main(
+                to_postgres=self.to_postgres,
+                incremental=True,
+                cache=self.cache,
+                engine=self.engine,
+                metrics=Metrics("etl", enabled=self.metrics),
+            )
+        self.signature = signature  # só depois do sucesso: com erro, o próximo ciclo tenta de novo
+        if manifest is not None:
+            campos["versao"] = manifest["versao"]
+            campos["etl_tempos_s"] = manifest["tempos_s"]
+        return "ok"
+
+
+def serve(pipeline: Pipeline, interval_min: float, at: list[tuple[int, int]]):
+    """Roda um ciclo agora e depois segundo a agenda, até SIGINT/SIGTERM."""
+    stop = threading.Event()
+
+    def _stop(signum, frame):
+        print(f"[INFO] sinal {signum} recebido; encerrando após o ciclo atual")
+        stop.set()
+
+    signal.signal(signal.SIGINT, _stop)
+    signal.signal(signal.SIGTERM, _stop)
+    while not stop.is_set():
+        pipeline.run_once()
+        proximo = next_run(datetime.now(), interval_min, at)
+        print(f"[INFO] próximo ciclo em {proximo:%d/%m/%Y %H:%M:%S}")
+        stop.wait(max((proximo - datetime.now()).total_seconds(), 0))
+
+
+# =====================
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--interval", type=float, default=SCHED_INTERVAL_MIN,
+                        help="minutos entre ciclos (padrão: 60)")
+    parser.add_argument("--at", default=SCHED_AT,
+                        help="horários fixos HH:MM separados por vírgula (substituem --interval)")
+    parser.add_argument("--once", action="store_true", help="roda um ciclo e sai (cron, n8n)")
+    parser.add_argument("--to-postgres", type=str, default="false")
+    parser.add_argument("--no-scrape", action="store_true", help="não baixa; só processa data/raw")
+    parser.add_argument("--scraper-engine", choices=["http", "selenium"], default="http")
+    parser.add_argument("--metrics", action="store_true", default=ETL_METRICS,
+                        help="métricas por etapa do ETL em ETL_METRICS_PATH")
+    args = parser.parse_args()
+
+    pipeline = Pipeline(
+        scrape=not args.no_scrape,
+        scraper_engine=args.scraper_engine,
+        to_postgres=str(args.to_postgres).lower() == "true",
+        metrics=args.metrics,
+    )
+    if args.once:
+        sys.exit(1 if pipeline.run_once() == "erro" else 0)
+    serve(pipeline, args.interval, parse_at(args.at))
@@ -0,0 +1,182 @@
+# -*- coding: utf-8 -*-
+"""
+Download HTTP concorrente das séries CEPEA
+
+Busca as URLs "SÉRIE DE PREÇOS" diretamente (mesmo fluxo do n8n em
+docs/n8n/CEPEA_Downloader.json), sem abrir navegador:
+- séries em paralelo (asyncio) em um pool de CEPEA_HTTP_CONCURRENCY threads
+  (o registro pode ter dezenas); cada thread usa a sua própria
+  requests.Session, que não é thread-safe, e reaproveita a conexão
+  keep-alive entre as séries que baixa
+- requisições condicionais (ETag / Last-Modified): 304 mantém o arquivo atual
+- retentativas com backoff exponencial para falhas de rede, 429 e 5xx
+- escrita atômica (arquivo .part + os.replace) na pasta de destino
+
+A URL base pode ser trocada por CEPEA_BASE_URL (ex.: servidor HTTP local
+para testes).
+"""
+
+import asyncio
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+
+import requests
+from requests.adapters import HTTPAdapter
+
+BASE_URL = os.getenv("CEPEA_BASE_URL", "https://www.cepea.org.br/br")
+TIMEOUT = float(os.getenv("CEPEA_HTTP_TIMEOUT", "60"))
+RETRIES = int(os.getenv("CEPEA_HTTP_RETRIES", "3"))
+BACKOFF = float(os.getenv("CEPEA_HTTP_BACKOFF", "1.0"))
+CONCURRENCY = int(os.getenv("CEPEA_HTTP_CONCURRENCY", "8"))
+
+STATE_FILE = ".http_cache.json"  # ETag/Last-Modified do último download por pasta
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
+# Assinaturas de planilha: OLE2 (.xls) e ZIP (.xlsx). Qualquer outra coisa
+# (ex.: página HTML de erro) é tratada como falha para acionar o fallback.
+SIGNATURES = {b"\xd0\xcf\x11\xe0": ".xls", b"PK\x03\x04": ".xlsx"}
+
+HEADERS = {"User-Agent": "Mozilla/5.0 (agromercantil-cepea-etl)"}
+
+
+# ----------------------------------------------------------------------
+def series_url(href_sub: str, base_url: str = BASE_URL) -> str:
+    return base_url.rstrip("/") + href_sub
+
+
+def _session(pool_size: int = 1) -> requests.Session:
+    s = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    s.mount("http://", adapter)
+    s.mount("https://", adapter)
+    s.headers.update(HEADERS)
+    return s
+
+
+def _load_state(dest: Path) -> dict:
+    try:
+        return json.loads((dest / STATE_FILE).read_text(encoding="utf-8"))
+    except (FileNotFoundError, ValueError):
+        return {}
+
+
+def _save_state(dest: Path, state: dict):
+    tmp = dest / f"{STATE_FILE}.part"
+    tmp.write_text(json.dumps(state, indent=2), encoding="utf-8")
+    os.replace(tmp, dest / STATE_FILE)
+
+
+def _conditional_headers(dest: Path, state: dict) -> dict:
+    """Só envia validadores se o arquivo que eles descrevem ainda existe."""
+    if not state.get("file") or not (dest / state["file"]).exists():
+        return {}
+    headers = {}
+    if state.get("etag"):
+        headers["If-None-Match"] = state["etag"]
+    if state.get("last_modified"):
+        headers["If-Modified-Since"] = state["last_modified"]
+    return headers
+
+
+def _extension(content: bytes) -> str | None:
+    for magic, ext in SIGNATURES.items():
+        if content.startswith(magic):
+            return ext
+    return None
+
+
+def _write_atomic(dest: Path, content: bytes, ext: str) -> Path:
+    final = dest / f"CEPEA_{datetime.now().strftime('%Y%m%d%H%M%S')}{ext}"
+    tmp = dest / f".{final.name}.part"
+    with open(tmp, "wb") as f:
+        f.write(content)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, final)
+    return final
+
+
+def _fetch(session: requests.Session, nome: str, url: str, dest: Path,
+           retries: int = RETRIES, backoff: float = BACKOFF, timeout: float = TIMEOUT) -> dict:
+    """Baixa uma série (síncrono; executado em thread pelo asyncio)."""
+    dest.mkdir(parents=True, exist_ok=True)
+    state = _load_state(dest)
+    headers = _conditional_headers(dest, state)
+    t0 = time.perf_counter()
+    last_error = None
+
+    for attempt in range(retries + 1):
+        if attempt:
+            time.sleep(backoff * 2 ** (attempt - 1))
+        try:
+            resp = session.get(url, headers=headers, timeout=timeout)
+        except requests.RequestException as exc:
+            last_error = f"{exc.__class__.__name__}: {exc}"
+            continue
+        if resp.status_code in RETRY_STATUS:
+            last_error = f"HTTP {resp.status_code}"
+            continue
+        if resp.status_code == 304:
+            return {"nome": nome, "status": "inalterado", "path": dest / state["file"],
+                    "tempo_s": round(time.perf_counter() - t0, 3)}
+        if resp.status_code != 200:
+            last_error = f"HTTP {resp.status_code}"
+            break
+        ext = _extension(resp.content)
+        if ext is None:
+            last_error = "resposta não é uma planilha"
+            break
+
+        path = _write_atomic(dest, resp.content, ext)
+        _save_state(dest, {
+            "url": url,
+            "file": path.name,
+            "etag": resp.headers.get("ETag"),
+            "last_modified": resp.headers.get("Last-Modified"),
+        })
+        return {"nome": nome, "status": "baixado", "path": path, "bytes": len(resp.content),
+                "tempo_s": round(time.perf_counter() - t0, 3)}
+
+    return {"nome": nome, "status": "erro", "erro": last_error,
+            "tempo_s": round(time.perf_counter() - t0, 3)}
+
+
+async def _baixar_todas(pages: dict, dests: dict, base_url: str,
+                        concurrency: int = CONCURRENCY, **kwargs) -> dict:
+    limit = max(min(len(pages), concurrency), 1)
+    local, sessions, lock = threading.local(), [], threading.Lock()
+
+    def fetch_na_thread(nome: str, url: str, dest: Path) -> dict:
+        # uma sessão por thread do pool, criada no primeiro download dela
+        session = getattr(local, "session", None)
+        if session is None:
+            session = local.session = _session()
+            with lock:
+                sessions.append(session)
+        return _fetch(session, nome, url, dest, **kwargs)
+
+    loop = asyncio.get_running_loop()
+    executor = ThreadPoolExecutor(max_workers=limit, thread_name_prefix="cepea-http")
+    try:
+        results = await asyncio.gather(*(
+            loop.run_in_executor(executor, fetch_na_thread, nome, series_url(meta["href_sub"], base_url), dests[nome])
+            for nome, meta in pages.items()
+        ))
+    finally:
+        executor.shutdown(wait=True)
+        for session in sessions:
+            session.close()
+    return {r["nome"]: r for r in results}
+
+
+def baixar_http(pages: dict, dests: dict, base_url: str = BASE_URL, **kwargs) -> dict:
+    """
+    Baixa todas as séries em paralelo. Retorna {nome: resultado}, onde
+    resultado["status"] é "baixado", "inalterado" ou "erro".
+    """
+    return asyncio.run(_baixar_todas(pages, dests, base_url, **kwargs))
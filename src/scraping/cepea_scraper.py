@@ -1,61 +1,64 @@
 # -*- coding: utf-8 -*-
 """
-Baixa séries CEPEA via Selenium, converte .xls -> .xlsx com Excel (win32com),
-remove .xls e mantém apenas o .xlsx mais recente por commodity.
+Baixa séries CEPEA e mantém apenas o CEPEA_*.xls mais recente por commodity.
+
+As séries vêm do registro series.toml (src/series_registry.py).
+Por padrão usa download HTTP direto e concorrente (cepea_http.py); o
+Selenium fica só como fallback para séries que falharem por HTTP.
+O ETL lê o .xls diretamente (xlrd/calamine), sem conversão pelo Excel —
+o fluxo roda headless em Linux.
+
+Com --metrics (ou ETL_METRICS=true), o tempo e o tamanho de cada download
+vão para o mesmo JSONL de métricas do ETL (job "scraper").
 """
 
 from pathlib import Path
 from datetime import datetime
+import argparse
+import sys
 import time
 import shutil
 import os
 import glob
 
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-
-import win32com.client as win32  # Excel automation (win32com)
+try:
+    from selenium import webdriver
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.chrome.options import Options
+    from selenium.webdriver.support.ui import WebDriverWait
+    from selenium.webdriver.support import expected_conditions as EC
+except ImportError:  # Selenium só é necessário no fallback
+    webdriver = None
 
 # ----------------------------------------------------------------------
 # Pastas
 ROOT = Path(__file__).resolve().parents[2]
-RAW_ROOT = ROOT / "data" / "raw" / "cepea"
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from src.etl.cepea_metrics import ETL_METRICS, ETL_METRICS_PROM, NULL_METRICS, Metrics  # noqa: E402
+from src.scraping.cepea_http import baixar_http  # noqa: E402
+from src.series_registry import load_series  # noqa: E402
+
+SERIES = load_series()
 
-DESTS = {
-    "MILHO": RAW_ROOT / "milho",
-    "SOJA_PARANA": RAW_ROOT / "soja" / "parana",
-    "SOJA_PARANAGUA": RAW_ROOT / "soja" / "paranagua",
-}
+# Pasta de destino por série
+DESTS = {s.id: s.raw_dir for s in SERIES}
 
 for p in DESTS.values():
     p.mkdir(parents=True, exist_ok=True)
 
 # Páginas e anchors (href) dos botões "SÉRIE DE PREÇOS"
-PAGES = {
-    "MILHO": {
-        "page": "https://www.cepea.org.br/br/indicador/milho.aspx",
-        "href_sub": "/indicador/series/milho.aspx?id=77",
-    },
-    "SOJA_PARANA": {
-        "page": "https://www.cepea.org.br/br/indicador/soja.aspx",
-        "href_sub": "/indicador/series/soja.aspx?id=12",
-    },
-    "SOJA_PARANAGUA": {
-        "page": "https://www.cepea.org.br/br/indicador/soja.aspx",
-        "href_sub": "/indicador/series/soja.aspx?id=92",
-    },
-}
+PAGES = {s.id: {"page": s.pagina, "href_sub": s.href} for s in SERIES}
 
 
 # ----------------------------------------------------------------------
-def _init_driver(download_dir: Path) -> webdriver.Chrome:
+def _init_driver(download_dir: Path) -> "webdriver.Chrome":
     """Configura Chrome para baixar direto na pasta indicada."""
     opts = Options()
-    # Se desejar headless, descomente:
-    # opts.add_argument("--headless=new")
+    # Headless por padrão (workers Linux sem display); SCRAPER_HEADLESS=false abre a janela
+    if os.getenv("SCRAPER_HEADLESS", "true").lower() == "true":
+        opts.add_argument("--headless=new")
     opts.add_argument("--no-sandbox")
     opts.add_argument("--disable-gpu")
     opts.add_experimental_option("prefs", {
@@ -86,34 +89,13 @@ def _wait_for_download(dirpath: Path, pattern: str = "CEPEA_*.xls", timeout: int
     raise TimeoutError(f"Timeout aguardando download em {dirpath}")
 
 
-def _convert_xls_to_xlsx_and_cleanup(xls_path: Path) -> Path:
-    """
-    Abre o .xls no Excel e salva como .xlsx (FileFormat=51).
-    Remove o .xls após conversão. Retorna o caminho do .xlsx.
-    """
-    print(f"[CONVERTER] {xls_path.name} -> .xlsx (Excel)")
-    excel = win32.Dispatch("Excel.Application")
-    excel.DisplayAlerts = False
-    try:
-        wb = excel.Workbooks.Open(str(xls_path))
-        xlsx_path = xls_path.with_suffix(".xlsx")
-        wb.SaveAs(str(xlsx_path), FileFormat=51)  # 51 = xlOpenXMLWorkbook (.xlsx)
-        wb.Close(SaveChanges=False)
-    finally:
-        excel.Quit()
-
-    # Remove o .xls original
-    try:
-        xls_path.unlink(missing_ok=True)
-    except Exception:
-        pass
-
-    return xlsx_path
-
-
-def _keep_only_latest_xlsx(dirpath: Path):
-    """Mantém somente o CEPEA_*.xlsx mais recente; remove os demais."""
-    files = sorted(dirpath.glob("CEPEA_*.xlsx"), key=lambda p: p.stat().st_mtime, reverse=True)
+def _keep_only_latest(dirpath: Path):
+    """Mantém somente a planilha CEPEA_* mais recente (.xls ou .xlsx); remove as demais."""
+    files = sorted(
+        (p for p in dirpath.glob("CEPEA_*.xls*") if p.suffix.lower() in (".xls", ".xlsx")),
+        key=lambda p: p.stat().st_mtime,
+        reverse=True,
+    )
     if len(files) > 1:
         for f in files[1:]:
             try:
@@ -123,7 +105,7 @@ def _keep_only_latest_xlsx(dirpath: Path):
                 pass
 
 
-def _click_series_and_download(driver: webdriver.Chrome, page_url: str, href_sub: str, download_dir: Path) -> Path:
+def _click_series_and_download(driver: "webdriver.Chrome", page_url: str, href_sub: str, download_dir: Path) -> Path:
     """Abre a página, clica no anchor de 'SÉRIE DE PREÇOS' (pelo href) e aguarda o .xls."""
     driver.get(page_url)
     # Aguarda anchor com o href específico
@@ -147,8 +129,10 @@ def _clean_folder(dirpath: Path):
 
 
 def baixar_serie(nome: str, page_url: str, href_sub: str, destino: Path):
-    """Executa fluxo completo: limpa pasta, baixa .xls, converte para .xlsx e mantém só o mais recente."""
-    print(f"\n⏬ Baixando {nome} ...")
+    """Executa fluxo completo: limpa pasta, baixa .xls e mantém só o mais recente."""
+    if webdriver is None:
+        raise RuntimeError("Selenium não instalado — fallback indisponível")
+    print(f"\n⏬ Baixando {nome} (Selenium) ...")
     _clean_folder(destino)
     driver = _init_driver(destino)
     try:
@@ -160,16 +144,52 @@ def baixar_serie(nome: str, page_url: str, href_sub: str, destino: Path):
         except Exception:
             pass
 
-    # Converte .xls -> .xlsx via Excel (win32com) e remove .xls
-    xlsx_path = _convert_xls_to_xlsx_and_cleanup(xls_path)
-    print(f"✔️  Convertido: {xlsx_path}")
+    # Mantém só a planilha mais recente
+    _keep_only_latest(destino)
+
 
-    # Mantém só o mais recente .xlsx
-    _keep_only_latest_xlsx(destino)
+def baixar_todas(engine: str = "http", metrics: Metrics = NULL_METRICS) -> dict:
+    """
+    Baixa todas as séries. Com engine="http" busca tudo em paralelo e usa o
+    Selenium apenas para as séries que falharem.
+    """
+    if engine == "selenium":
+        for key, meta in PAGES.items():
+            with metrics.span("download.serie", serie=key, engine="selenium"):
+                baixar_serie(key, meta["page"], meta["href_sub"], DESTS[key])
+        metrics.finish()
+        return {key: {"nome": key, "status": "baixado"} for key in PAGES}
+
+    t0 = time.perf_counter()
+    with metrics.span("download", engine=engine):
+        resultados = baixar_http(PAGES, DESTS)
+    for key, res in resultados.items():
+        # Downloads rodam em threads: o tempo de cada um vem do próprio resultado
+        metrics.record("download.serie", res["tempo_s"], labels={"serie": key, "engine": "http"},
+                       status=res["status"], bytes=res.get("bytes"))
+        if res["status"] == "erro":
+            print(f"[AVISO] {key}: HTTP falhou ({res['erro']}), usando Selenium")
+            with metrics.span("download.serie", serie=key, engine="selenium"):
+                baixar_serie(key, PAGES[key]["page"], PAGES[key]["href_sub"], DESTS[key])
+            res["status"] = "baixado (selenium)"
+            continue
+        print(f"✔️  {key}: {res['status']} → {res['path'].name} ({res['tempo_s']}s)")
+        _keep_only_latest(DESTS[key])
+    print(f"[TEMPO] Download de {len(PAGES)} série(s): {time.perf_counter() - t0:.2f}s")
+    metrics.finish()
+    return resultados
 
 
 if __name__ == "__main__":
-    print("🚀 Iniciando coleta CEPEA (Selenium + Excel)...")
-    for key, meta in PAGES.items():
-        baixar_serie(key, meta["page"], meta["href_sub"], DESTS[key])
-    print("\n✅ DOWNLOAD + CONVERSÃO CONCLUÍDOS — 1 arquivo .xlsx por commodity mantido.")
\ No newline at end of file
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--engine", choices=["http", "selenium"], default="http",
+                        help="http (padrão, paralelo) ou selenium (navegador)")
+    parser.add_argument("--metrics", action="store_true", default=ETL_METRICS,
+                        help="grava tempo/CPU/memória por download em ETL_METRICS_PATH (JSON lines)")
+    parser.add_argument("--metrics-prom", default=ETL_METRICS_PROM or None,
+                        help="arquivo .prom (formato texto do Prometheus) gerado ao fim da coleta")
+    args = parser.parse_args()
+    print(f"🚀 Iniciando coleta CEPEA ({args.engine})...")
+    metrics = Metrics("scraper", enabled=args.metrics or bool(args.metrics_prom), prom_path=args.metrics_prom)
+    baixar_todas(args.engine, metrics=metrics)
+    print("\n✅ DOWNLOAD CONCLUÍDO — 1 arquivo .xls por commodity mantido.")
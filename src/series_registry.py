@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+"""
+Registro declarativo das séries CEPEA (series.toml)
+
+Fonte única para o scraper (o que baixar), o ETL (onde ler e como nomear)
+e o dashboard (nome exibido das regiões). O arquivo pode ser trocado por
+CEPEA_SERIES (caminho relativo à raiz do projeto ou absoluto).
+"""
+
+import os
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+
+try:
+    import tomllib
+except ImportError:  # Python < 3.11
+    import tomli as tomllib
+
+ROOT = Path(__file__).resolve().parents[1]
+SERIES_PATH = ROOT / os.getenv("CEPEA_SERIES", "series.toml")
+RAW_DIR = ROOT / "data" / "raw" / "cepea"
+
+REQUIRED = ("id", "commodity", "regiao", "pagina", "href", "pasta")
+MAX_CODE_LEN = 20  # VARCHAR(20) de commodity/regiao em cepea_preco_diario
+
+
+@dataclass(frozen=True)
+class Serie:
+    id: str
+    commodity: str
+    regiao: str
+    pagina: str
+    href: str
+    pasta: str
+    regiao_nome: str = ""
+    ativa: bool = True
+
+    @property
+    def key(self) -> str:
+        """Chave commodity|regiao (watermarks, manifesto, métricas)."""
+        return f"{self.commodity}|{self.regiao}"
+
+    @property
+    def raw_dir(self) -> Path:
+        return RAW_DIR / self.pasta
+
+    @property
+    def nome_regiao(self) -> str:
+        return self.regiao_nome or self.regiao
+
+
+def _parse(path: Path) -> list[Serie]:
+    with open(path, "rb") as f:
+        blocos = tomllib.load(f).get("serie", [])
+    series, ids, chaves = [], set(), set()
+    for i, bloco in enumerate(blocos, start=1):
+        faltando = [c for c in REQUIRED if not bloco.get(c)]
+        if faltando:
+            raise ValueError(f"{path.name}: série #{i} sem {', '.join(faltando)}")
+        serie = Serie(**{k: v for k, v in bloco.items() if k in Serie.__dataclass_fields__})
+        if serie.id in ids:
+            raise ValueError(f"{path.name}: id repetido {serie.id!r}")
+        if serie.key in chaves:
+            raise ValueError(f"{path.name}: commodity/regiao repetidas {serie.key!r}")
+        if max(len(serie.commodity), len(serie.regiao)) > MAX_CODE_LEN:
+            raise ValueError(f"{path.name}: {serie.id} com commodity/regiao acima de {MAX_CODE_LEN} caracteres")
+        ids.add(serie.id)
+        chaves.add(serie.key)
+        series.append(serie)
+    return series
+
+
+@lru_cache(maxsize=None)
+def _load(path: Path) -> tuple[Serie, ...]:
+    return tuple(_parse(path))
+
+
+def load_series(path: Path = SERIES_PATH, ativas: bool = True) -> list[Serie]:
+    """Séries do registro (por padrão só as ativas), na ordem do arquivo."""
+    return [s for s in _load(Path(path)) if s.ativa or not ativas]
+
+
+def regioes_nomes(path: Path = SERIES_PATH) -> dict[str, str]:
+    """Código da região → nome exibido (só as que têm nome próprio)."""
+    return {s.regiao: s.regiao_nome for s in load_series(path, ativas=False) if s.regiao_nome}
@@ -0,0 +1,45 @@
+# -*- coding: utf-8 -*-
+"""Cache de parsing: entradas separadas por leitor e por versão do parser."""
+
+import pandas as pd
+
+from conftest import ROOT
+from src.etl.cepea_cache import PARSER_VERSION, ParseCache, cache_key, file_hash
+from src.etl.cepea_etl import _read_all
+
+PASTA = ROOT / "data" / "raw" / "cepea" / "milho"
+TASKS = [(PASTA, "MILHO", "BRASIL")]
+
+
+def _ler(cache, reader):
+    inputs = {}
+    df = _read_all(TASKS, workers=1, cache=cache, reader=reader, inputs=inputs)
+    return df, next(iter(inputs.values()))
+
+
+def test_leitores_nao_compartilham_entradas(tmp_path):
+    cache = ParseCache(root=tmp_path)
+    _, entrada = _ler(cache, "pandas")
+    assert not entrada["cache"]
+
+    _, entrada = _ler(cache, "streaming")
+    assert not entrada["cache"]  # não reaproveita o frame do leitor pandas
+
+    _, entrada = _ler(cache, "streaming")
+    assert entrada["cache"]
+    assert {p.stem.split("-")[0] for p in tmp_path.glob("*.parquet")} == {"pandas", "streaming"}
+
+
+def test_entradas_de_outra_versao_sao_ignoradas(tmp_path):
+    cache = ParseCache(root=tmp_path)
+    digest = file_hash(next(PASTA.glob("*.xlsx")))
+    velho = pd.DataFrame({
+        "data": pd.to_datetime(["2024-01-02"]), "valor_brl": [float("nan")], "valor_usd": [float("nan")],
+    })
+    cache.put(digest, velho)  # formato antigo: só o SHA-256
+    cache.put(f"pandas-v{PARSER_VERSION - 1}-{digest}", velho)
+
+    df, entrada = _ler(cache, "pandas")
+    assert not entrada["cache"]
+    assert len(df) > 1 and df["valor_brl"].notna().all()
+    assert cache.get(cache_key(digest, "pandas")) is not None
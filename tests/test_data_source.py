@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+"""
+Fonte PostgreSQL do dashboard contra uma engine falsa: versão com
+revisões, banco vazio (meta vazia e fallback para os arquivos em "auto")
+e projeção do SELECT.
+"""
+
+from contextlib import contextmanager
+
+import pandas as pd
+
+from src.app import data_source
+from src.app.data_source import ArquivoSource, PostgresSource
+
+
+class _Result:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def one(self):
+        return self.rows[0]
+
+    def scalar(self):
+        return self.rows[0][0] if self.rows else None
+
+    def all(self):
+        return self.rows
+
+
+class _Banco:
+    """Engine falsa: responde às consultas da fonte a partir do estado."""
+
+    def __init__(self, auditada=True, series=None):
+        self.linhas, self.ultima, self.auditada, self.revisao = 100, "2025-10-17", auditada, None
+        self.series = [] if series is None else series  # (commodity, regiao, min, max)
+
+    @contextmanager
+    def connect(self):
+        banco = self
+
+        class _Conn:
+            def execute(self, sql):
+                sql = str(sql)
+                if "EXISTS" in sql:
+                    return _Result([(bool(banco.series),)])
+                if "GROUP BY commodity, regiao" in sql:
+                    return _Result(banco.series)
+                if "cepea_preco_revisao" in sql and "MAX(id)" in sql:
+                    assert banco.auditada
+                    return _Result([(banco.revisao,)])
+                return _Result([(banco.linhas, banco.ultima, banco.auditada)])
+
+        yield _Conn()
+
+
+def test_versao_muda_com_revisao_sem_novas_linhas():
+    banco = _Banco()
+    fonte = PostgresSource(banco)
+    antes = fonte.version()
+    banco.revisao = 7  # preço antigo revisado: mesma contagem, mesma última data
+    assert fonte.version() != antes
+
+
+def test_versao_sem_tabela_de_auditoria():
+    assert PostgresSource(_Banco(auditada=False)).version() == "pg-100-2025-10-17-0"
+
+
+def test_meta_de_banco_vazio():
+    assert PostgresSource(_Banco()).meta() == {"min": None, "max": None, "commodities": [], "regioes": []}
+
+
+def test_meta_com_dados():
+    banco = _Banco(series=[("MILHO", "BRASIL", pd.Timestamp("2006-03-13").date(), pd.Timestamp("2025-10-17").date())])
+    meta = PostgresSource(banco).meta()
+    assert (str(meta["min"]), str(meta["max"]), meta["commodities"]) == ("2006-03-13", "2025-10-17", ["MILHO"])
+
+
+def test_auto_com_banco_vazio_usa_arquivos(monkeypatch):
+    monkeypatch.setattr(data_source, "create_engine_pool", lambda: _Banco())
+    assert isinstance(data_source.get_source("auto"), ArquivoSource)
+    assert isinstance(data_source.get_source("postgres"), PostgresSource)
+
+
+def test_auto_com_dados_usa_postgres(monkeypatch):
+    banco = _Banco(series=[("MILHO", "BRASIL", None, None)])
+    monkeypatch.setattr(data_source, "create_engine_pool", lambda: banco)
+    assert isinstance(data_source.get_source("auto"), PostgresSource)
+
+
+def test_fetch_projeta_chaves_sem_colunas_de_preco(monkeypatch):
+    consultas = []
+
+    def read_sql(sql, conn, params=None):
+        consultas.append(str(sql))
+        return pd.DataFrame({"data": pd.to_datetime(["2025-10-17"]), "commodity": ["MILHO"], "regiao": ["BRASIL"]})
+
+    monkeypatch.setattr(data_source.pd, "read_sql", read_sql)
+    fonte = PostgresSource(_Banco())
+    df = fonte.fetch(None, None, ["MILHO"], ["BRASIL"], cols=())
+    assert "SELECT data, commodity, regiao\n" in consultas[-1]
+    assert df.columns.tolist() == ["data", "commodity", "regiao"]
+
+    fonte.fetch(None, None, ["MILHO"], ["BRASIL"], cols=("valor_usd",))
+    assert "SELECT data, commodity, regiao, valor_usd::float8 AS valor_usd\n" in consultas[-1]
@@ -0,0 +1,122 @@
+# -*- coding: utf-8 -*-
+"""
+Atualização de cepea_indicadores sem banco: parâmetros enviados por
+atualizar_indicadores (engine falsa), janelas coerentes com LOOKBACK e a
+data `desde` que o ETL passa depois de uma carga com revisões.
+"""
+
+from contextlib import contextmanager
+from datetime import date
+
+import pandas as pd
+import pytest
+
+from benchmarks.synthetic import gerar_raw
+from src.db import cepea_indicadores, cepea_load_postgres
+from src.etl import cepea_etl, cepea_manifest
+
+
+class _Engine:
+    def __init__(self, linhas=3):
+        self.execucoes, self.linhas, self.transacoes = [], linhas, 0
+
+    @contextmanager
+    def begin(self):
+        engine = self
+        self.transacoes += 1
+
+        class _Conn:
+            def execute(self, sql, params=None):
+                engine.execucoes.append((str(sql), params))
+
+                class _Result:
+                    def scalar_one(self):
+                        return engine.linhas
+
+                return _Result()
+
+        yield _Conn()
+
+
+@pytest.mark.parametrize("desde", [None, date(2024, 5, 2)])
+def test_atualizar_indicadores_envia_desde(desde):
+    engine = _Engine(linhas=7)
+    assert cepea_indicadores.atualizar_indicadores(engine=engine, desde=desde) == 7
+    assert engine.transacoes == 1
+    (ddl, _), (refresh, params) = engine.execucoes
+    assert ddl == cepea_indicadores.DDL
+    assert refresh == cepea_indicadores.REFRESH_SQL
+    assert params == {"desde": desde}
+
+
+def test_lookback_fecha_a_maior_janela():
+    sql = cepea_indicadores.REFRESH_SQL
+    # recua LOOKBACK pregões antes da 1ª data nova: o OFFSET é zero-based
+    assert f"OFFSET {cepea_indicadores.LOOKBACK - 1} LIMIT 1" in sql
+    # a maior janela (MM90 / z-score 90) usa exatamente LOOKBACK pregões anteriores
+    precedentes = [int(n) for n in pd.Series([sql]).str.findall(r"(\d+)\s+PRECEDING").iloc[0]]
+    assert max(precedentes) == cepea_indicadores.LOOKBACK
+    # datas novas, posteriores ao último indicador, ou a partir de :desde
+    assert "p.data >= CAST(:desde AS DATE)" in sql and "p.data > u.ult" in sql
+
+
+# ===================== ETL → desde =====================
+@pytest.fixture
+def etl(monkeypatch, tmp_path):
+    """ETL apontado para planilhas sintéticas e saídas em tmp_path, carga falsa."""
+    raw = gerar_raw(tmp_path / "raw", n_series=2, anos=1, seed=3)
+    monkeypatch.setattr(cepea_etl, "SERIES", raw)
+    monkeypatch.setattr(cepea_etl, "PROC_DIR", tmp_path / "processed")
+    monkeypatch.setattr(cepea_etl, "CURATED_DIR", tmp_path / "curated")
+    monkeypatch.setattr(cepea_etl, "PARQUET_DIR", tmp_path / "curated" / "parquet")
+    (tmp_path / "processed").mkdir()
+    (tmp_path / "curated").mkdir()
+    manifest_path = tmp_path / "curated" / "_manifest.json"
+    monkeypatch.setattr(cepea_etl, "write_manifest",
+                        lambda m, path=manifest_path: cepea_manifest.write_manifest(m, path))
+    monkeypatch.setattr(cepea_etl, "_db_watermarks", lambda engine=None: None)
+
+    chamadas = {}
+
+    def carregar_precos(df, engine=None, execucao=None):
+        chamadas["carga"] = df
+        revisadas = int((df["operacao"] == "U").sum()) if "operacao" in df else 0
+        return {"linhas": len(df), "inseridas": len(df) - revisadas, "atualizadas": revisadas,
+                "removidas": int((df["operacao"] == "D").sum()), "ignoradas": 0}
+
+    monkeypatch.setattr(cepea_load_postgres, "carregar_precos", carregar_precos)
+    monkeypatch.setattr(cepea_indicadores, "atualizar_indicadores",
+                        lambda engine=None, desde=None: chamadas.setdefault("desde", desde))
+
+    def rodar(**kwargs):
+        chamadas.clear()
+        cepea_etl.main(use_cache=False, dq="off", workers=1, **kwargs)
+        return chamadas
+
+    return rodar, tmp_path / "curated" / "cepea_curated.csv"
+
+
+def test_etl_recalcula_indicadores_desde_a_revisao(etl):
+    rodar, curated = etl
+    rodar(to_postgres=False)
+
+    snapshot = pd.read_csv(curated)
+    revisada = snapshot.index[40]
+    snapshot.loc[revisada, "valor_brl"] += 1.0  # o CEPEA "corrigiu" este preço
+    snapshot.to_csv(curated, index=False)
+
+    chamadas = rodar(to_postgres=True, incremental=True)
+    assert chamadas["carga"]["operacao"].tolist() == ["U"]
+    assert chamadas["desde"] == pd.Timestamp(snapshot.loc[revisada, "data"]).date()
+
+
+def test_etl_sem_revisao_nao_recalcula_historico(etl):
+    rodar, curated = etl
+    rodar(to_postgres=False)
+    snapshot = pd.read_csv(curated)
+    ultima = snapshot["data"].max()
+    snapshot[snapshot["data"] < ultima].to_csv(curated, index=False)
+
+    chamadas = rodar(to_postgres=True, incremental=True)
+    assert set(chamadas["carga"]["operacao"]) == {"I"}
+    assert chamadas["desde"] is None
@@ -0,0 +1,128 @@
+# -*- coding: utf-8 -*-
+"""
+Carga no PostgreSQL sem banco: o COPY passa pelo código real do pg8000
+(handle_COPY_IN_RESPONSE, que lê o stream com readinto) e pelo
+copy_expert do psycopg2; o que chega ao "servidor" é comparado com o
+DataFrame de origem.
+"""
+
+import io
+import struct
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.db import cepea_load_postgres as loader
+
+
+def _precos(n: int = 1200) -> pd.DataFrame:
+    return pd.DataFrame({
+        "data": pd.bdate_range("2024-01-01", periods=n),
+        "commodity": "MILHO",
+        "regiao": "BRASIL",
+        "valor_brl": np.round(np.linspace(50, 80, n), 2),
+        "valor_usd": np.round(np.linspace(10, 15, n), 2),
+    })
+
+
+class _Engine:
+    def __init__(self, cursor):
+        self.cursor = cursor
+        self.committed = False
+
+    def raw_connection(self):
+        engine = self
+
+        class _Conn:
+            def cursor(self):
+                return engine.cursor
+
+            def commit(self):
+                engine.committed = True
+
+            def rollback(self):
+                pass
+
+            def close(self):
+                pass
+
+        return _Conn()
+
+
+class _Pg8000Cursor:
+    """Cursor sem copy_expert: o COPY recebe stream=, como no pg8000."""
+
+    def __init__(self):
+        self.sql = []
+        self.sock = io.BytesIO()
+
+    def execute(self, sql, args=(), stream=None):
+        core = pytest.importorskip("pg8000.core")
+        self.sql.append(sql)
+        if stream is not None:
+            conn = SimpleNamespace(_sock=self.sock, _client_encoding="utf8")
+            context = core.Context(sql, stream=stream)
+            core.CoreConnection.handle_COPY_IN_RESPONSE(conn, struct.pack("!bh", 0, 6), context)
+
+    def fetchone(self):
+        return (len(self.copied().splitlines()), 0, 0)
+
+    def close(self):
+        pass
+
+    def copied(self) -> bytes:
+        """Junta o conteúdo das mensagens CopyData ('d' + int32 + dados) até o CopyDone ('c')."""
+        raw, out, pos = self.sock.getvalue(), [], 0
+        while raw[pos:pos + 1] != b"c":
+            assert raw[pos:pos + 1] == b"d"
+            size = struct.unpack("!i", raw[pos + 1:pos + 5])[0]
+            out.append(raw[pos + 5:pos + 1 + size])
+            pos += 1 + size
+        return b"".join(out)
+
+
+class _Psycopg2Cursor(_Pg8000Cursor):
+    def copy_expert(self, sql, stream):
+        self.sql.append(sql)
+        self.sock.write(stream.read())
+
+    def copied(self) -> bytes:
+        return self.sock.getvalue()
+
+
+def _staged(cursor) -> pd.DataFrame:
+    return pd.read_csv(
+        io.BytesIO(cursor.copied()),
+        names=[*loader.COLS, "operacao"],
+        parse_dates=["data"],
+    )
+
+
+@pytest.mark.parametrize("cursor_cls", [_Pg8000Cursor, _Psycopg2Cursor])
+def test_carregar_precos_copy(cursor_cls):
+    df = _precos()
+    cursor = cursor_cls()
+    engine = _Engine(cursor)
+
+    stats = loader.carregar_precos(df, engine=engine)
+
+    staged = _staged(cursor)
+    pd.testing.assert_frame_equal(staged[loader.COLS], df, check_dtype=False)
+    assert (staged["operacao"] == "U").all()
+    assert stats["linhas"] == stats["inseridas"] == len(df)
+    assert engine.committed
+    assert loader.COPY_SQL in cursor.sql
+    # um comando por execute (pg8000 usa o protocolo estendido com parâmetros)
+    assert all(sql.strip().rstrip(";").count(";") == 0 for sql in cursor.sql)
+    assert cursor.sql.index(loader.AUDIT_DDL) < cursor.sql.index(loader.AUDIT_INDEX_DDL)
+
+
+def test_csv_stream_readinto_em_blocos():
+    df = _precos(300)
+    esperado = loader._CsvStream(df, chunk_rows=7).read()
+    stream, buf, partes = loader._CsvStream(df, chunk_rows=7), bytearray(100), []
+    while n := stream.readinto(buf):
+        partes.append(bytes(buf[:n]))
+    assert b"".join(partes) == esperado
@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+"""
+Leitores das planilhas CEPEA: o caminho pandas (_parse_file) e o leitor
+em streaming devem produzir o mesmo frame para as amostras de
+data/raw/cepea (.xlsx) e para um .xls no formato do download direto
+(tests/fixtures, lido via xlrd), inclusive com preços em texto pt-BR.
+"""
+
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from conftest import ROOT
+from src.etl import cepea_reader
+from src.etl.cepea_etl import READERS, _parse_file
+
+FIXTURES = Path(__file__).resolve().parent / "fixtures"
+XLS = FIXTURES / "cepea_milho_amostra.xls"
+XLS_TEXTO = FIXTURES / "cepea_texto_pt_br.xls"
+AMOSTRAS = sorted((ROOT / "data" / "raw" / "cepea").rglob("*.xlsx")) + [XLS]
+
+
+def _ids(path: Path) -> str:
+    return path.relative_to(ROOT).as_posix()
+
+
+def _mesmo_frame(a: pd.DataFrame, b: pd.DataFrame):
+    # a resolução do datetime (us/ns) depende do leitor, não do conteúdo
+    b = b.assign(data=b["data"].astype(a["data"].dtype))
+    pd.testing.assert_frame_equal(a, b)
+
+
+@pytest.mark.parametrize("path", AMOSTRAS, ids=_ids)
+def test_leitores_identicos(path):
+    a, b = READERS["pandas"](path), READERS["streaming"](path)
+    assert len(a) > 0
+    assert a["valor_brl"].notna().all() and a["valor_usd"].notna().all()
+    _mesmo_frame(a, b)
+
+
+def test_xls_via_xlrd(monkeypatch):
+    monkeypatch.setattr(cepea_reader, "CalamineWorkbook", None)
+    df = cepea_reader.read_streaming(XLS)
+    _mesmo_frame(_parse_file(XLS), df)
+    assert len(df) == 25
+    assert df["data"].iloc[-1] == pd.Timestamp("2025-10-17")
+    assert (df["valor_brl"].iloc[-1], df["valor_usd"].iloc[-1]) == (65.53, 12.12)
+
+
+@pytest.mark.parametrize("calamine", [True, False], ids=["calamine", "xlrd"])
+def test_xls_com_texto_pt_br(monkeypatch, calamine):
+    # preços gravados como texto pt-BR ("1.234,56") em vez de números
+    if calamine:
+        pytest.importorskip("python_calamine")
+    else:
+        monkeypatch.setattr(cepea_reader, "CalamineWorkbook", None)
+    for reader in READERS.values():
+        df = reader(XLS_TEXTO)
+        assert df["data"].dt.strftime("%Y-%m-%d").tolist() == ["2024-01-02", "2024-01-03", "2024-01-04"]
+        assert df["valor_brl"].tolist() == [1234.56, 65.53, 66.1]
+        assert df["valor_usd"].tolist() == [250.10, 13.37, 13.4]
@@ -0,0 +1,35 @@
+# -*- coding: utf-8 -*-
+"""As DDLs executadas pelo código são as mesmas de docs/sql/schema.sql."""
+
+import re
+
+from conftest import ROOT
+from src.db import cepea_indicadores, cepea_load_postgres
+
+SCHEMA = (ROOT / "docs" / "sql" / "schema.sql").read_text(encoding="utf-8")
+
+
+def _normalize(sql: str) -> str:
+    sql = re.sub(r"--[^\n]*", "", sql)
+    return " ".join(sql.split())
+
+
+def _statement(sql: str, start: str) -> str:
+    """Comando de `sql` que começa com `start`, sem o ';' final."""
+    sql = _normalize(sql)
+    i = sql.index(start)
+    fim = sql.find(";", i)
+    return sql[i:len(sql) if fim < 0 else fim].rstrip()
+
+
+def test_ddl_de_cepea_indicadores_igual_ao_schema():
+    inicio = "CREATE TABLE IF NOT EXISTS cepea_indicadores"
+    assert _statement(cepea_indicadores.DDL, inicio) == _statement(SCHEMA, inicio)
+
+
+def test_ddl_de_auditoria_igual_ao_schema():
+    for ddl, inicio in (
+        (cepea_load_postgres.AUDIT_DDL, "CREATE TABLE IF NOT EXISTS cepea_preco_revisao"),
+        (cepea_load_postgres.AUDIT_INDEX_DDL, "CREATE INDEX IF NOT EXISTS ix_cepea_preco_revisao_serie"),
+    ):
+        assert _statement(ddl, inicio) == _statement(SCHEMA, inicio)
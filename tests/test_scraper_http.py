@@ -0,0 +1,115 @@
+# -*- coding: utf-8 -*-
+"""
+Download HTTP contra um servidor local (http.server) no lugar do CEPEA:
+200 com gravação da planilha, retentativa após 503 e 304 na segunda
+execução usando o ETag/Last-Modified guardados; cada thread do pool
+usa a sua própria sessão.
+"""
+
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from conftest import ROOT
+from src.scraping import cepea_http
+from src.scraping.cepea_http import STATE_FILE, baixar_http
+
+PLANILHA = (ROOT / "data" / "raw" / "cepea" / "milho" / "CEPEA_20251020085115.xlsx").read_bytes()
+ETAG = '"milho-v1"'
+LAST_MODIFIED = "Mon, 20 Oct 2025 08:51:15 GMT"
+
+
+class _Cepea(BaseHTTPRequestHandler):
+    falhas = {}  # caminho → nº de 503 ainda a responder
+    requisicoes = []
+
+    def do_GET(self):
+        type(self).requisicoes.append((self.path, dict(self.headers)))
+        if self.falhas.get(self.path, 0) > 0:
+            self.falhas[self.path] -= 1
+            self.send_response(503)
+            self.end_headers()
+            return
+        if self.headers.get("If-None-Match") == ETAG:
+            self.send_response(304)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "application/vnd.ms-excel")
+        self.send_header("Content-Length", str(len(PLANILHA)))
+        self.send_header("ETag", ETAG)
+        self.send_header("Last-Modified", LAST_MODIFIED)
+        self.end_headers()
+        self.wfile.write(PLANILHA)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def servidor():
+    _Cepea.falhas, _Cepea.requisicoes = {}, []
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), _Cepea)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def _baixar(base_url, tmp_path, **kwargs):
+    pages = {"MILHO": {"href_sub": "/series/milho.aspx"}}
+    dests = {"MILHO": tmp_path / "milho"}
+    return baixar_http(pages, dests, base_url=base_url, backoff=0, **kwargs)["MILHO"]
+
+
+def test_download_200_e_304_na_segunda_execucao(servidor, tmp_path):
+    primeiro = _baixar(servidor, tmp_path)
+    assert primeiro["status"] == "baixado"
+    assert primeiro["path"].suffix == ".xlsx"
+    assert primeiro["path"].read_bytes() == PLANILHA
+    assert (tmp_path / "milho" / STATE_FILE).exists()
+
+    segundo = _baixar(servidor, tmp_path)
+    assert segundo["status"] == "inalterado"
+    assert segundo["path"] == primeiro["path"]
+    _, headers = _Cepea.requisicoes[-1]
+    assert headers["If-None-Match"] == ETAG
+    assert headers["If-Modified-Since"] == LAST_MODIFIED
+    assert len(list((tmp_path / "milho").glob("CEPEA_*"))) == 1
+
+
+def test_retentativa_apos_503(servidor, tmp_path):
+    _Cepea.falhas["/series/milho.aspx"] = 2
+    resultado = _baixar(servidor, tmp_path, retries=3)
+    assert resultado["status"] == "baixado"
+    assert len(_Cepea.requisicoes) == 3
+
+
+def test_503_esgota_retentativas(servidor, tmp_path):
+    _Cepea.falhas["/series/milho.aspx"] = 10
+    resultado = _baixar(servidor, tmp_path, retries=2)
+    assert resultado == {**resultado, "status": "erro", "erro": "HTTP 503"}
+    assert len(_Cepea.requisicoes) == 3
+    assert not list((tmp_path / "milho").glob("CEPEA_*"))
+
+
+def test_uma_sessao_por_thread(servidor, tmp_path, monkeypatch):
+    criar, usos = cepea_http._session, {}
+
+    def session():
+        s = criar()
+        get = s.get
+        s.get = lambda *a, **k: usos.setdefault(id(s), set()).add(threading.get_ident()) or get(*a, **k)
+        return s
+
+    monkeypatch.setattr(cepea_http, "_session", session)
+    nomes = [f"S{i}" for i in range(6)]
+    pages = {n: {"href_sub": f"/series/{n}.aspx"} for n in nomes}
+    dests = {n: tmp_path / n for n in nomes}
+    resultados = baixar_http(pages, dests, base_url=servidor, backoff=0, concurrency=2)
+
+    assert {r["status"] for r in resultados.values()} == {"baixado"}
+    assert 1 <= len(usos) <= 2
+    assert all(len(threads) == 1 for threads in usos.values())
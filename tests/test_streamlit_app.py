@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+"""
+Dashboard renderizado com AppTest (sem servidor), a partir dos CSVs em
+data/curated: anexos e exportação usam download com dados sob demanda e o
+zoom dos gráficos reconsulta a janela escolhida.
+"""
+
+import datetime as dt
+import importlib
+import io
+import json
+
+import pandas as pd
+import pytest
+
+from conftest import ROOT
+
+APP = ROOT / "src" / "app" / "streamlit_app.py"
+
+
+@pytest.fixture
+def app(monkeypatch, tmp_path):
+    pytest.importorskip("streamlit")
+    from streamlit.testing.v1 import AppTest
+
+    monkeypatch.setenv("DASHBOARD_SOURCE", "arquivo")
+    monkeypatch.setenv("ATTACHMENTS_DIR", str(tmp_path / "attachments"))
+    attachments = importlib.reload(importlib.import_module("src.app.attachments"))
+    return AppTest.from_file(str(APP), default_timeout=120), attachments
+
+
+def test_app_com_anexo_renderiza_download(app):
+    at, attachments = app
+    digest, size = attachments.AttachmentStore().put(io.BytesIO(b"%PDF-1.4 anexo de teste"))
+    at.session_state["attachments_meta"] = [
+        {"name": "relatorio.pdf", "mime": "application/pdf", "size": size, "hash": digest}
+    ]
+    at.session_state["attachments_seen"] = set()
+
+    at.run()
+
+    assert not at.exception, [e.value for e in at.exception]
+    downloads = at.get("download_button")
+    assert len(downloads) == 2  # exportação filtrada + anexo
+
+
+def test_zoom_reconsulta_a_janela_em_resolucao_total(app):
+    at, _ = app
+    at.run()
+    janela = (dt.date(2025, 1, 2), dt.date(2025, 3, 31))
+
+    def pontos_na_janela():
+        traco = json.loads(at.get("plotly_chart")[0].proto.spec)["data"][0]
+        x = pd.to_datetime(pd.Series(traco["x"])).dt.date
+        return int(x.between(*janela).sum())
+
+    antes = pontos_na_janela()  # período inteiro: traço reduzido a CHART_MAX_POINTS
+    at.slider[0].set_value(janela).run()
+
+    assert not at.exception, [e.value for e in at.exception]
+    assert pontos_na_janela() > antes